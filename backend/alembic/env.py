@@ -6,7 +6,7 @@ from alembic import context
 from sqlalchemy import engine_from_config, pool
 
 from app.config import settings
-from app.db.models import SavedSearch, TrackedListing  # noqa: F401 — register metadata
+from app.db.models import PriceHistory, SavedSearch, TrackedListing  # noqa: F401 — register metadata
 from app.db.session import Base
 
 config = context.config
@@ -0,0 +1,35 @@
+"""add tracked_listings.ebay_item_id for bulk price refresh
+
+Revision ID: 002_tracked_item_id
+Revises: 001_persistence
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "002_tracked_item_id"
+down_revision: Union[str, None] = "001_persistence"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tracked_listings", sa.Column("ebay_item_id", sa.String(length=64), nullable=True))
+    # Backfill from listing URLs (https://www.ebay.com/itm/[slug/]<legacy id>).
+    op.execute(
+        """
+        UPDATE tracked_listings
+        SET ebay_item_id = 'v1|' || substring(item_web_url from '/itm/(?:[^/?#]*/)?([0-9]+)') || '|0'
+        WHERE ebay_item_id IS NULL
+          AND substring(item_web_url from '/itm/(?:[^/?#]*/)?([0-9]+)') IS NOT NULL
+        """
+    )
+    op.create_index("ix_tracked_listings_ebay_item_id", "tracked_listings", ["ebay_item_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tracked_listings_ebay_item_id", table_name="tracked_listings")
+    op.drop_column("tracked_listings", "ebay_item_id")
@@ -0,0 +1,60 @@
+"""create price_history
+
+Revision ID: 003_price_history
+Revises: 002_tracked_item_id
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "003_price_history"
+down_revision: Union[str, None] = "002_tracked_item_id"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAT_COLUMNS = (
+    "runs",
+    "count",
+    "min_price",
+    "q1_price",
+    "median_price",
+    "q3_price",
+    "max_price",
+    "suggested_min_price",
+    "suggested_max_price",
+    "suggested_coverage",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_history",
+        sa.Column("subject_kind", sa.String(length=16), nullable=False),
+        sa.Column("subject_key", sa.String(length=64), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("bucket_seconds", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("runs", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("min_price", sa.Float(), nullable=True),
+        sa.Column("q1_price", sa.Float(), nullable=True),
+        sa.Column("median_price", sa.Float(), nullable=True),
+        sa.Column("q3_price", sa.Float(), nullable=True),
+        sa.Column("max_price", sa.Float(), nullable=True),
+        sa.Column("suggested_min_price", sa.Float(), nullable=True),
+        sa.Column("suggested_max_price", sa.Float(), nullable=True),
+        sa.Column("suggested_coverage", sa.Float(), nullable=True),
+    )
+    # Covering primary key: a range read for one subject is an index-only scan
+    # over (kind, key, bucket_start) with every stat column in the leaf pages.
+    op.execute(
+        "ALTER TABLE price_history ADD CONSTRAINT pk_price_history "
+        "PRIMARY KEY (subject_kind, subject_key, bucket_start, bucket_seconds) "
+        f"INCLUDE ({', '.join(STAT_COLUMNS)})"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("price_history")
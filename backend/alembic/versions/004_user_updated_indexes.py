@@ -0,0 +1,71 @@
+"""composite (user_id, updated_at DESC, id DESC) indexes for keyset pagination
+
+Revision ID: 004_user_updated_indexes
+Revises: 003_price_history
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004_user_updated_indexes"
+down_revision: Union[str, None] = "003_price_history"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("saved_searches", "tracked_listings")
+
+
+def _drop_if_invalid(name: str, table: str) -> None:
+    """Drop ``name`` if a failed concurrent build left it INVALID.
+
+    ``IF NOT EXISTS`` would otherwise keep the broken index on a re-run.
+    """
+    invalid = op.get_bind().scalar(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    )
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so large tables stay writable; it can't run in a transaction.
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            _drop_if_invalid(f"ix_{table}_user_updated", table)
+            op.create_index(
+                f"ix_{table}_user_updated",
+                table,
+                ["user_id", sa.text("updated_at DESC"), sa.text("id DESC")],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            # The composite index's user_id prefix serves these lookups now.
+            op.drop_index(
+                f"ix_{table}_user_id",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            _drop_if_invalid(f"ix_{table}_user_id", table)
+            op.create_index(
+                f"ix_{table}_user_id",
+                table,
+                ["user_id"],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.drop_index(
+                f"ix_{table}_user_updated",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,81 @@
+"""unique (user_id, item_web_url) on tracked_listings for batch upserts
+
+Revision ID: 005_tracked_user_url_unique
+Revises: 004_user_updated_indexes
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005_tracked_user_url_unique"
+down_revision: Union[str, None] = "004_user_updated_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "uq_tracked_listings_user_url"
+# Builds to try when writes keep adding duplicates during the concurrent build.
+BUILD_ATTEMPTS = 3
+
+
+def _dedupe() -> None:
+    # Keep the most recently updated row per (user, URL); drop older duplicates.
+    op.execute(
+        """
+        DELETE FROM tracked_listings AS t
+        USING tracked_listings AS newer
+        WHERE t.user_id = newer.user_id
+          AND t.item_web_url = newer.item_web_url
+          AND (t.updated_at, t.id) < (newer.updated_at, newer.id)
+        """
+    )
+
+
+def _drop_if_invalid() -> None:
+    """Drop the index if a failed concurrent build left it INVALID.
+
+    ``IF NOT EXISTS`` would otherwise keep the broken index on a re-run.
+    """
+    invalid = op.get_bind().scalar(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": INDEX},
+    )
+    if invalid:
+        op.drop_index(
+            INDEX, table_name="tracked_listings", postgresql_concurrently=True, if_exists=True
+        )
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so large tables stay writable; it can't run in a transaction.
+    # A duplicate written after the dedupe fails the build and leaves an INVALID
+    # index, so each attempt drops that index and dedupes again (no write freeze).
+    with op.get_context().autocommit_block():
+        for attempt in range(1, BUILD_ATTEMPTS + 1):
+            _drop_if_invalid()
+            _dedupe()
+            try:
+                op.create_index(
+                    INDEX,
+                    "tracked_listings",
+                    ["user_id", "item_web_url"],
+                    unique=True,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+                return
+            except sa.exc.IntegrityError:
+                if attempt == BUILD_ATTEMPTS:
+                    raise
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX,
+            table_name="tracked_listings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
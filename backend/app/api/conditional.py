@@ -0,0 +1,54 @@
+"""Strong ETags and ``If-None-Match`` handling for polled GET endpoints.
+
+Routes compute the validator before building the body and answer a match with
+a bare 304, so an unchanged poll skips rendering (and, for lists, the row
+fetch). ``Cache-Control: no-cache`` lets browsers keep the body and revalidate
+on every request, which is what makes them send ``If-None-Match``.
+"""
+
+from fastapi import Response
+
+from app.compression import BROTLI, GZIP
+
+ETAG_HEADER = "ETag"
+# Search results are shared; saved searches and tracked listings are per user.
+PUBLIC_REVALIDATE = "no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+# Appended by app.compression.encoded_etag to tag a compressed representation.
+_ENCODING_SUFFIXES = tuple(f'-{encoding}"' for encoding in (GZIP, BROTLI))
+
+
+def strong_etag(digest: str) -> str:
+    return f'"{digest}"'
+
+
+def _identity_tag(etag: str) -> str:
+    """Opaque part of ``etag`` without ``W/`` or a content-coding suffix."""
+    tag = etag.strip().removeprefix("W/")
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` check; uses weak comparison, as RFC 9110 specifies for it.
+
+    The tags of one body's gzip, brotli and identity forms all match each other:
+    the client's cached copy is the same JSON whichever encoding it arrived in.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = _identity_tag(etag)
+    return any(_identity_tag(tag) == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, cache_control: str, headers: dict[str, str] | None = None) -> Response:
+    # A 304 repeats the validator and caching headers the 200 would have carried.
+    return Response(
+        status_code=304,
+        headers={ETAG_HEADER: etag, "Cache-Control": cache_control, **(headers or {})},
+    )
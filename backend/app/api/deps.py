@@ -1,4 +1,6 @@
-from fastapi import Header
+import hmac
+
+from fastapi import Header, HTTPException
 
 from app.config import settings
 
@@ -12,3 +14,12 @@ def get_current_user_id(x_user_id: str | None = Header(default=None, alias="X-Us
     if x_user_id and x_user_id.strip():
         return x_user_id.strip()[:128]
     return settings.dev_user_id
+
+
+def require_cron_secret(authorization: str | None = Header(default=None)) -> None:
+    """Allow scheduled-job endpoints only for ``Authorization: Bearer $CRON_SECRET``
+    (the header Vercel Cron sends)."""
+    if not settings.cron_secret:
+        raise HTTPException(status_code=503, detail="CRON_SECRET is not configured.")
+    if not hmac.compare_digest(authorization or "", f"Bearer {settings.cron_secret}"):
+        raise HTTPException(status_code=401, detail="Invalid cron credentials.")
@@ -0,0 +1,112 @@
+"""Keyset pagination for per-user lists ordered by ``(updated_at, id)`` desc.
+
+The cursor is the last row's ``(updated_at, id)``, so every page is one index
+range scan on ``(user_id, updated_at DESC, id DESC)`` however deep it is. The
+next page's cursor goes in the ``X-Next-Cursor`` response header (absent on the
+last page), which keeps the response body a plain list.
+
+Pages carry a strong ETag built from the user's ``max(updated_at)`` and row
+count (any insert, update or delete changes one of them) plus the page
+parameters. A request whose ``If-None-Match`` still matches gets a 304 after
+that one aggregate, without fetching the page.
+"""
+
+import base64
+import binascii
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, Response
+from sqlalchemy import func, select, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import (
+    ETAG_HEADER,
+    PRIVATE_REVALIDATE,
+    etag_matches,
+    not_modified,
+    strong_etag,
+)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(updated_at: datetime, row_id: uuid.UUID) -> str:
+    raw = f"{updated_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        updated_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(updated_at), uuid.UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def _page_etag(
+    user_id: str,
+    cursor: str | None,
+    limit: int,
+    last_updated: datetime | None,
+    rows: int,
+) -> str:
+    stamp = last_updated.isoformat() if last_updated is not None else ""
+    raw = f"{user_id}|{cursor or ''}|{limit}|{stamp}|{rows}".encode("utf-8")
+    return strong_etag(hashlib.sha256(raw).hexdigest()[:32])
+
+
+async def fetch_page(
+    db: AsyncSession,
+    model: Any,
+    user_id: str,
+    cursor: str | None,
+    limit: int,
+    response: Response,
+    if_none_match: str | None = None,
+) -> list[Any] | Response:
+    """One page of ``model`` rows for ``user_id``, newest first, or a 304."""
+    version = select(
+        func.max(model.updated_at).label("last_updated"), func.count().label("rows")
+    ).where(model.user_id == user_id)
+    stmt = select(model).where(model.user_id == user_id)
+    if cursor:
+        updated_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(model.updated_at, model.id) < tuple_(updated_at, row_id))
+    # One extra row tells us whether there is a next page.
+    stmt = stmt.order_by(model.updated_at.desc(), model.id.desc()).limit(limit + 1)
+
+    if if_none_match:
+        # Version first: a write landing before the page read only costs the
+        # client a 200 on its next poll, never a stale 304.
+        last_updated, count = (await db.execute(version)).one()
+        etag = _page_etag(user_id, cursor, limit, last_updated, count)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, PRIVATE_REVALIDATE)
+        rows = list((await db.scalars(stmt)).all())
+    else:
+        # No validator to check: read the version alongside the page in one query.
+        agg = version.subquery()
+        result = (
+            await db.execute(
+                stmt.add_columns(agg.c.last_updated, agg.c.rows).join(agg, true())
+            )
+        ).all()
+        rows = [row[0] for row in result]
+        if result:
+            last_updated, count = result[0][1], result[0][2]
+        else:
+            last_updated, count = (await db.execute(version)).one()
+        etag = _page_etag(user_id, cursor, limit, last_updated, count)
+
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = PRIVATE_REVALIDATE
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].updated_at, rows[-1].id)
+    return rows
@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 
-from app.api.routes import saved, search, tracking
+from app.api.routes import jobs, metrics, saved, search, tracking
 
 api_router = APIRouter()
 api_router.include_router(search.router)
 api_router.include_router(saved.router)
 api_router.include_router(tracking.router)
+api_router.include_router(metrics.router)
+api_router.include_router(jobs.router)
@@ -0,0 +1,47 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import require_cron_secret
+from app.db import session as db_session
+from app.jobs.compact_price_history import compact_price_history
+from app.jobs.refresh_saved_searches import refresh_saved_searches
+from app.jobs.refresh_tracked_prices import refresh_tracked_prices
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"],
+    dependencies=[Depends(require_cron_secret)],
+)
+
+
+def _require_database() -> None:
+    if db_session.SessionLocal is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Database not configured. Set DATABASE_URL to your Neon connection string.",
+        )
+
+
+@router.get("/refresh-saved-searches")
+async def run_saved_search_refresh() -> dict[str, Any]:
+    """One incremental cache-warming pass over saved searches (for cron)."""
+    _require_database()
+    report = await refresh_saved_searches()
+    return report.as_dict()
+
+
+@router.get("/refresh-tracked-prices")
+async def run_tracked_price_refresh() -> dict[str, Any]:
+    """Bulk ``last_seen_price`` refresh for every tracked listing (for cron)."""
+    _require_database()
+    report = await refresh_tracked_prices()
+    return report.as_dict()
+
+
+@router.get("/compact-price-history")
+async def run_price_history_compaction() -> dict[str, Any]:
+    """Merge old price-history runs into daily rows and drop expired ones (for cron)."""
+    _require_database()
+    report = await compact_price_history()
+    return report.as_dict()
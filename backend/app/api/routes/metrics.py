@@ -0,0 +1,24 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.clients.ebay_client import ebay_token_manager
+from app.clients.quota import quota_governor
+from app.rate_limit import search_batch_rate_limiter, search_rate_limiter
+from app.redis_client import search_l1_cache
+from app.services.price_history import price_history_writer
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("")
+def get_metrics() -> dict[str, Any]:
+    """Process-local counters for sizing caches and limits on this instance."""
+    return {
+        "searchCacheL1": search_l1_cache.stats(),
+        "searchRateLimit": search_rate_limiter.stats(),
+        "searchBatchRateLimit": search_batch_rate_limiter.stats(),
+        "ebayQuota": quota_governor.stats(),
+        "ebayToken": ebay_token_manager.stats(),
+        "priceHistory": price_history_writer.stats(),
+    }
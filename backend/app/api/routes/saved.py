@@ -1,93 +1,184 @@
 import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user_id
-from app.db.models import SavedSearch
-from app.db.session import get_db
-from app.models.persistence import SavedSearchCreate, SavedSearchOut, SavedSearchUpdate
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page
+from app.db.bulk import chunked, delete_rows, update_rows
+from app.db.models import PriceHistory, SavedSearch
+from app.db.session import get_async_db, get_async_read_db
+from app.models.persistence import (
+    BatchRowStatus,
+    PricePointOut,
+    SavedSearchBatchRequest,
+    SavedSearchBatchResponse,
+    SavedSearchBatchRow,
+    SavedSearchCreate,
+    SavedSearchOut,
+    SavedSearchUpdate,
+)
+from app.redis_client import search_cache_key
+from app.services.price_history import HISTORY_MAX_POINTS, SEARCH, load_range
 
 router = APIRouter(prefix="/api/saved-searches", tags=["saved-searches"])
 
 
+def _new_values(body: SavedSearchCreate, user_id: str) -> dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "name": body.name,
+        "query": body.query.strip(),
+        "category": body.category or None,
+        "condition": body.condition or None,
+        "min_price": body.min_price,
+        "max_price": body.max_price,
+    }
+
+
+def _changes(body: SavedSearchUpdate) -> dict[str, Any]:
+    data = body.model_dump(exclude_unset=True)
+    if "query" in data and data["query"] is not None:
+        data["query"] = data["query"].strip()
+    return data
+
+
 @router.get("", response_model=list[SavedSearchOut])
-def list_saved_searches(
-    db: Session = Depends(get_db),
+async def list_saved_searches(
+    response: Response,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_read_db),
     user_id: str = Depends(get_current_user_id),
-) -> list[SavedSearch]:
-    stmt = (
-        select(SavedSearch)
-        .where(SavedSearch.user_id == user_id)
-        .order_by(SavedSearch.updated_at.desc())
-    )
-    return list(db.scalars(stmt).all())
+) -> list[SavedSearch] | Response:
+    """Most recently updated first; pass ``X-Next-Cursor`` back as ``cursor``."""
+    return await fetch_page(db, SavedSearch, user_id, cursor, limit, response, if_none_match)
 
 
 @router.post("", response_model=SavedSearchOut, status_code=status.HTTP_201_CREATED)
-def create_saved_search(
+async def create_saved_search(
     body: SavedSearchCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id),
 ) -> SavedSearch:
-    row = SavedSearch(
-        user_id=user_id,
-        name=body.name,
-        query=body.query.strip(),
-        category=body.category or None,
-        condition=body.condition or None,
-        min_price=body.min_price,
-        max_price=body.max_price,
-    )
+    row = SavedSearch(**_new_values(body, user_id))
     db.add(row)
-    db.commit()
-    db.refresh(row)
+    await db.commit()
     return row
 
 
+@router.post("/batch", response_model=SavedSearchBatchResponse)
+async def batch_saved_searches(
+    body: SavedSearchBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id),
+) -> SavedSearchBatchResponse:
+    """Create, update and delete many saved searches in one transaction."""
+    # RETURNING in parameter order lines created rows up with the request.
+    stmt = insert(SavedSearch).returning(SavedSearch, sort_by_parameter_order=True)
+    created: list[SavedSearch] = []
+    for chunk in chunked([_new_values(b, user_id) for b in body.create]):
+        created.extend((await db.scalars(stmt, chunk)).all())
+    updated = await update_rows(
+        db, SavedSearch, user_id, ({"id": b.id, **_changes(b)} for b in body.update)
+    )
+    deleted = await delete_rows(db, SavedSearch, user_id, body.delete)
+    await db.commit()
+
+    return SavedSearchBatchResponse(
+        create=[
+            SavedSearchBatchRow(
+                index=index, status="created", id=row.id, item=SavedSearchOut.model_validate(row)
+            )
+            for index, row in enumerate(created)
+        ],
+        update=[
+            SavedSearchBatchRow(
+                index=index,
+                status="updated" if b.id in updated else "notFound",
+                id=b.id,
+                item=SavedSearchOut.model_validate(updated[b.id]) if b.id in updated else None,
+            )
+            for index, b in enumerate(body.update)
+        ],
+        delete=[
+            BatchRowStatus(
+                index=index,
+                status="deleted" if row_id in deleted else "notFound",
+                id=row_id,
+            )
+            for index, row_id in enumerate(body.delete)
+        ],
+    )
+
+
 @router.get("/{saved_id}", response_model=SavedSearchOut)
-def get_saved_search(
+async def get_saved_search(
     saved_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     user_id: str = Depends(get_current_user_id),
 ) -> SavedSearch:
-    row = db.get(SavedSearch, saved_id)
+    row = await db.get(SavedSearch, saved_id)
     if row is None or row.user_id != user_id:
         raise HTTPException(status_code=404, detail="Saved search not found")
     return row
 
 
 @router.patch("/{saved_id}", response_model=SavedSearchOut)
-def update_saved_search(
+async def update_saved_search(
     saved_id: uuid.UUID,
     body: SavedSearchUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id),
 ) -> SavedSearch:
-    row = db.get(SavedSearch, saved_id)
+    row = await db.get(SavedSearch, saved_id)
     if row is None or row.user_id != user_id:
         raise HTTPException(status_code=404, detail="Saved search not found")
 
-    data = body.model_dump(exclude_unset=True)
-    if "query" in data and data["query"] is not None:
-        data["query"] = data["query"].strip()
-    for key, value in data.items():
+    for key, value in _changes(body).items():
         setattr(row, key, value)
 
-    db.commit()
-    db.refresh(row)
+    await db.commit()
     return row
 
 
 @router.delete("/{saved_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_saved_search(
+async def delete_saved_search(
     saved_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id),
 ) -> None:
-    row = db.get(SavedSearch, saved_id)
+    # One DELETE ... RETURNING instead of a SELECT followed by a DELETE.
+    deleted = await db.scalar(
+        delete(SavedSearch)
+        .where(SavedSearch.id == saved_id, SavedSearch.user_id == user_id)
+        .returning(SavedSearch.id)
+    )
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    await db.commit()
+
+
+@router.get("/{saved_id}/history", response_model=list[PricePointOut])
+async def get_saved_search_history(
+    saved_id: uuid.UUID,
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    limit: int = Query(default=HISTORY_MAX_POINTS, ge=1, le=HISTORY_MAX_POINTS),
+    db: AsyncSession = Depends(get_async_read_db),
+    user_id: str = Depends(get_current_user_id),
+) -> list[PriceHistory]:
+    """Price-history points for the search, oldest first (default: last 90 days)."""
+    row = await db.get(SavedSearch, saved_id)
     if row is None or row.user_id != user_id:
         raise HTTPException(status_code=404, detail="Saved search not found")
-    db.delete(row)
-    db.commit()
+    cache_key = search_cache_key(
+        row.query, row.min_price or "", row.max_price or "", row.category, row.condition
+    )
+    since = since or datetime.now(timezone.utc) - timedelta(days=90)
+    return await load_range(db, SEARCH, cache_key, since, until, limit)
@@ -1,22 +1,38 @@
+import asyncio
+import json
 import logging
+from collections.abc import AsyncIterator, Awaitable
+from typing import Any
 
 import httpx
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
+from app.api.conditional import ETAG_HEADER, PUBLIC_REVALIDATE, etag_matches, not_modified
+from app.clients.quota import QuotaExhaustedError
+from app.compression import encoded_etag, negotiate
 from app.config import settings
-from app.models.search import SearchResponse
-from app.redis_client import (
-    cache_get_json,
-    cache_set_json,
-    rate_limit_allow,
-    search_cache_key,
-)
-from app.services.search_service import SearchService
+from app.models.search import ItemSummary, SearchBatchRequest, SearchBatchResponse, SearchResponse
+from app.rate_limit import search_batch_rate_limiter, search_rate_limiter
+from app.redis_client import cache_get_entries, cache_get_entry, search_cache_key
+from app.services.search_cache import fill_search, revalidate_search, search_flight
+from app.services.search_payload import SCHEMA_TAG, SearchPayload
+from app.services.search_service import ListingRecord
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["search"])
 
-_search_service = SearchService()
+CACHE_STATUS_HEADER = "X-Cache"
+# Non-standard "client closed request"; nobody is left to read it.
+CLIENT_CLOSED_STATUS = 499
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_item_list = TypeAdapter(list[ItemSummary])
+
+
+class ClientDisconnectedError(Exception):
+    """The client went away before the response was ready."""
 
 
 def _client_ip(request: Request) -> str:
@@ -31,74 +47,365 @@ def _client_ip(request: Request) -> str:
 @router.get("/search", response_model=SearchResponse)
 async def search(
     request: Request,
+    background_tasks: BackgroundTasks,
     query: str = Query(..., min_length=1, max_length=80),
     min_price: str = Query(default="", alias="minPrice"),
     max_price: str = Query(default="", alias="maxPrice"),
     category: str | None = Query(default=None),
     condition: str | None = Query(default=None),
     filter_strength: int = Query(default=6, alias="filterStrength", ge=1, le=20),
-) -> SearchResponse:
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+) -> Response:
     cleaned = query.strip()
     if not cleaned:
         raise HTTPException(status_code=400, detail="Missing query")
 
-    ip = _client_ip(request)
-    allowed = await rate_limit_allow(
-        f"listinglab:ratelimit:search:{ip}",
-        limit=settings.search_rate_limit,
-        window_seconds=settings.search_rate_window_seconds,
-    )
-    if not allowed:
+    if not await search_rate_limiter.allow(_client_ip(request)):
         raise HTTPException(
             status_code=429,
             detail="Too many searches. Please wait a minute and try again.",
         )
 
-    cache_key = search_cache_key(
-        cleaned, min_price, max_price, category, condition, filter_strength
-    )
-    cached = await cache_get_json(cache_key)
+    cache_key = search_cache_key(cleaned, min_price, max_price, category, condition)
+    search_args: dict[str, Any] = {
+        "query": cleaned,
+        "min_price": min_price,
+        "max_price": max_price,
+        "category": category,
+        "condition": condition,
+    }
+
+    # Hits return the cached bytes as-is (plus the band for this filterStrength):
+    # no JSON parsing, model validation or re-serialization on the hot path.
+    cached = await cache_get_entry(cache_key, SCHEMA_TAG)
     if cached is not None:
-        try:
+        if cached.stale:
+            logger.info("Search cache stale for query=%r; revalidating", cleaned)
+            status = "STALE"
+            background_tasks.add_task(revalidate_search, cache_key, search_args)
+        else:
             logger.info("Search cache hit for query=%r", cleaned)
-            return SearchResponse.model_validate(cached)
-        except Exception:
-            logger.exception("Invalid search cache payload for key=%s", cache_key)
+            status = "HIT"
+        return _json_response(
+            SearchPayload.from_entry(cached), filter_strength, status, if_none_match, accept_encoding
+        )
 
     try:
-        result = await _search_service.process_search(
-            query=cleaned,
-            min_price=min_price,
-            max_price=max_price,
-            category=category,
-            condition=condition,
-            filter_strength=filter_strength,
+        # Upstream calls are cancelled if every client waiting on them disconnects.
+        payload = await _unless_disconnected(
+            request,
+            search_flight.do(
+                cache_key,
+                lambda: fill_search(cache_key, search_args),
+                cancel_abandoned=True,
+            ),
+        )
+        if payload is None:
+            # Joined a background revalidation that yielded to a peer instance.
+            payload = await _unless_disconnected(request, fill_search(cache_key, search_args))
+        return _json_response(payload, filter_strength, "MISS", if_none_match, accept_encoding)
+    except ClientDisconnectedError:
+        logger.info("Client disconnected; abandoned search for query=%r", cleaned)
+        return Response(status_code=CLIENT_CLOSED_STATUS)
+    except Exception as exc:
+        raise _search_error(exc, cleaned) from None
+
+
+@router.get("/search/stream")
+async def search_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    query: str = Query(..., min_length=1, max_length=80),
+    min_price: str = Query(default="", alias="minPrice"),
+    max_price: str = Query(default="", alias="maxPrice"),
+    category: str | None = Query(default=None),
+    condition: str | None = Query(default=None),
+    filter_strength: int = Query(default=6, alias="filterStrength", ge=1, le=20),
+) -> Response:
+    """NDJSON variant of ``/search`` that shows listings before the analysis is done.
+
+    Emits a ``page`` line per eBay page as it arrives (normalized items, item
+    price only), then one ``result`` line with the same body ``/search`` returns,
+    or an ``error`` line. A cache hit is a single ``result`` line.
+    """
+    cleaned = query.strip()
+    if not cleaned:
+        raise HTTPException(status_code=400, detail="Missing query")
+
+    if not await search_rate_limiter.allow(_client_ip(request)):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many searches. Please wait a minute and try again.",
+        )
+
+    cache_key = search_cache_key(cleaned, min_price, max_price, category, condition)
+    search_args: dict[str, Any] = {
+        "query": cleaned,
+        "min_price": min_price,
+        "max_price": max_price,
+        "category": category,
+        "condition": condition,
+    }
+
+    cached = await cache_get_entry(cache_key, SCHEMA_TAG)
+    if cached is not None:
+        status = "STALE" if cached.stale else "HIT"
+        if cached.stale:
+            background_tasks.add_task(revalidate_search, cache_key, search_args)
+        return Response(
+            content=_result_event(SearchPayload.from_entry(cached), filter_strength, status),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={CACHE_STATUS_HEADER: status},
         )
-        response = SearchResponse(
-            itemSummaries=result.items,
-            appliedMinPrice=result.applied_min_price,
-            appliedMaxPrice=result.applied_max_price,
-            suggestedMinPrice=result.suggested_min_price,
-            suggestedMaxPrice=result.suggested_max_price,
-            suggestedCoverage=result.suggested_coverage,
+
+    return StreamingResponse(
+        _stream_search(cache_key, search_args, filter_strength),
+        media_type=NDJSON_MEDIA_TYPE,
+        # Ask proxies not to buffer, or the page lines arrive all at once.
+        headers={
+            CACHE_STATUS_HEADER: "MISS",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+async def _stream_search(
+    cache_key: str,
+    search_args: dict[str, Any],
+    filter_strength: int,
+) -> AsyncIterator[bytes]:
+    lines: asyncio.Queue[bytes] = asyncio.Queue()
+
+    def on_page(page: int, records: list[ListingRecord]) -> None:
+        lines.put_nowait(_page_event(page, records))
+
+    # Joining a fill already in flight yields only the final line. Starlette cancels
+    # this generator on disconnect, which abandons (and cancels) the fill.
+    fill = asyncio.ensure_future(
+        search_flight.do(
+            cache_key,
+            lambda: fill_search(cache_key, search_args, on_page=on_page),
+            cancel_abandoned=True,
+        )
+    )
+    getter: asyncio.Future[bytes] | None = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(lines.get())
+            done, _ = await asyncio.wait({getter, fill}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                break
+            yield getter.result()
+        while not lines.empty():
+            yield lines.get_nowait()
+        try:
+            payload = fill.result()
+            if payload is None:
+                # Joined a background revalidation that yielded to a peer instance.
+                payload = await fill_search(cache_key, search_args)
+        except Exception as exc:
+            error = _search_error(exc, search_args["query"])
+            yield _event_line({"type": "error", "status": error.status_code, "detail": error.detail})
+        else:
+            yield _result_event(payload, filter_strength, "MISS")
+    finally:
+        if getter is not None:
+            getter.cancel()
+        fill.cancel()
+
+
+def _event_line(event: dict[str, Any]) -> bytes:
+    return json.dumps(event).encode("utf-8") + b"\n"
+
+
+def _page_event(page: int, records: list[ListingRecord]) -> bytes:
+    items = _item_list.dump_json([record.to_summary() for record in records], by_alias=True)
+    return b'{"type":"page","page":%d,"items":%s}\n' % (page, items)
+
+
+def _result_event(payload: SearchPayload, filter_strength: int, cache_status: str) -> bytes:
+    return b'{"type":"result","cache":"%s","response":%s}\n' % (
+        cache_status.encode("ascii"),
+        payload.render(filter_strength),
+    )
+
+
+@router.post("/search/batch", response_model=SearchBatchResponse)
+async def search_batch(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    body: SearchBatchRequest,
+) -> Response:
+    """Run many searches in one call: identical searches are fetched once, cached
+    ones come from one multi-key lookup, and misses fan out with bounded concurrency."""
+    keys: list[str | None] = []
+    unique: dict[str, dict[str, Any]] = {}
+    for search in body.searches:
+        cleaned = search.query.strip()
+        if not cleaned:
+            keys.append(None)
+            continue
+        cache_key = search_cache_key(
+            cleaned, search.min_price, search.max_price, search.category, search.condition
         )
-        await cache_set_json(
+        unique.setdefault(
             cache_key,
-            response.model_dump(by_alias=True, mode="json"),
-            ttl_seconds=settings.search_cache_ttl_seconds,
+            {
+                "query": cleaned,
+                "min_price": search.min_price,
+                "max_price": search.max_price,
+                "category": search.category,
+                "condition": search.condition,
+            },
         )
-        return response
-    except httpx.HTTPError:
-        logger.exception("Upstream eBay failure for query=%r", cleaned)
+        keys.append(cache_key)
+
+    found: dict[str, tuple[SearchPayload, str]] = {}
+    for cache_key, cached in (await cache_get_entries(list(unique), SCHEMA_TAG)).items():
+        if cached is None:
+            continue
+        if cached.stale:
+            background_tasks.add_task(revalidate_search, cache_key, unique[cache_key])
+        found[cache_key] = (SearchPayload.from_entry(cached), "STALE" if cached.stale else "HIT")
+
+    misses = [cache_key for cache_key in unique if cache_key not in found]
+    # Cached answers are cheap; charge the batch for the upstream searches it needs.
+    if not await search_batch_rate_limiter.allow(_client_ip(request), cost=max(1, len(misses))):
         raise HTTPException(
+            status_code=429,
+            detail="Too many searches. Please wait a minute and try again.",
+        )
+
+    failed: dict[str, HTTPException] = {}
+    semaphore = asyncio.Semaphore(settings.search_batch_concurrency)
+
+    async def fill(cache_key: str) -> None:
+        search_args = unique[cache_key]
+        async with semaphore:
+            try:
+                payload = await search_flight.do(
+                    cache_key,
+                    lambda: fill_search(cache_key, search_args),
+                    cancel_abandoned=True,
+                )
+                if payload is None:
+                    payload = await fill_search(cache_key, search_args)
+                found[cache_key] = (payload, "MISS")
+            except Exception as exc:
+                failed[cache_key] = _search_error(exc, search_args["query"])
+
+    try:
+        await _unless_disconnected(request, asyncio.gather(*(fill(key) for key in misses)))
+    except ClientDisconnectedError:
+        logger.info("Client disconnected; abandoned batch of %d searches", len(misses))
+        return Response(status_code=CLIENT_CLOSED_STATUS)
+    logger.info(
+        "Search batch: %d requested, %d unique, %d cached, %d failed",
+        len(body.searches),
+        len(unique),
+        len(unique) - len(misses),
+        len(failed),
+    )
+
+    results: list[bytes] = []
+    for search, cache_key in zip(body.searches, keys):
+        if cache_key is None:
+            results.append(_batch_error(400, "Missing query"))
+        elif cache_key in found:
+            payload, cache_status = found[cache_key]
+            results.append(
+                b'{"status":200,"cache":"%s","response":%s}'
+                % (cache_status.encode("ascii"), payload.render(search.filter_strength))
+            )
+        else:
+            error = failed[cache_key]
+            results.append(_batch_error(error.status_code, str(error.detail)))
+    return Response(
+        content=b'{"results":[' + b",".join(results) + b"]}",
+        media_type="application/json",
+    )
+
+
+def _batch_error(status_code: int, detail: str) -> bytes:
+    return json.dumps({"status": status_code, "error": detail}).encode("utf-8")
+
+
+def _search_error(exc: Exception, query: str) -> HTTPException:
+    """Map a failed search to the HTTP error the client sees."""
+    if isinstance(exc, HTTPException):
+        return exc
+    if isinstance(exc, QuotaExhaustedError):
+        logger.warning("eBay call budget exhausted; rejecting query=%r", query)
+        return HTTPException(
+            status_code=503,
+            detail="Search is temporarily at capacity. Please try again shortly.",
+        )
+    if isinstance(exc, TimeoutError):
+        logger.warning("No eBay page within the search deadline for query=%r", query)
+        return HTTPException(
+            status_code=504,
+            detail="Search upstream timed out. Please try again.",
+        )
+    if isinstance(exc, httpx.HTTPError):
+        logger.error("Upstream eBay failure for query=%r", query, exc_info=exc)
+        return HTTPException(
             status_code=502,
             detail="Search upstream failed. Please try again.",
-        ) from None
-    except HTTPException:
-        raise
-    except Exception:
-        logger.exception("Search failed for query=%r", cleaned)
-        raise HTTPException(
-            status_code=500,
-            detail="Search failed. Please try again.",
-        ) from None
+        )
+    logger.error("Search failed for query=%r", query, exc_info=exc)
+    return HTTPException(
+        status_code=500,
+        detail="Search failed. Please try again.",
+    )
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _unless_disconnected(request: Request, work: Awaitable[Any]) -> Any:
+    """Await ``work``, cancelling it and raising if the client disconnects first."""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+    if task not in done:
+        raise ClientDisconnectedError
+    return task.result()
+
+
+def _json_response(
+    payload: SearchPayload,
+    filter_strength: int,
+    cache_status: str,
+    if_none_match: str | None = None,
+    accept_encoding: str | None = None,
+) -> Response:
+    etag = payload.etag(filter_strength)
+    headers = {CACHE_STATUS_HEADER: cache_status}
+    # Cached payloads compress their core once per encoding; CompressionMiddleware
+    # leaves responses that already have a Content-Encoding alone.
+    encoding = negotiate(accept_encoding) if payload.compressible else None
+    if encoding is not None:
+        etag = encoded_etag(etag, encoding)
+        headers["Vary"] = "Accept-Encoding"
+    if etag_matches(if_none_match, etag):
+        # The client already has these bytes: skip rendering the body.
+        return not_modified(etag, PUBLIC_REVALIDATE, headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        content = payload.render_compressed(filter_strength, encoding)
+    else:
+        content = payload.render(filter_strength)
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={**headers, ETAG_HEADER: etag, "Cache-Control": PUBLIC_REVALIDATE},
+    )
@@ -1,98 +1,263 @@
 import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import delete, func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user_id
-from app.db.models import TrackedListing
-from app.db.session import get_db
-from app.models.persistence import TrackedListingCreate, TrackedListingOut, TrackedListingUpdate
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page
+from app.clients.ebay_client import item_id_from_url
+from app.db.bulk import chunked, delete_rows, update_rows
+from app.db.models import PriceHistory, TrackedListing
+from app.db.session import get_async_db, get_async_read_db
+from app.models.persistence import (
+    BatchRowStatus,
+    PricePointOut,
+    TrackedListingBatchRequest,
+    TrackedListingBatchResponse,
+    TrackedListingBatchRow,
+    TrackedListingCreate,
+    TrackedListingOut,
+    TrackedListingUpdate,
+)
+from app.services.price_history import HISTORY_MAX_POINTS, LISTING, load_range
 
 router = APIRouter(prefix="/api/tracked-listings", tags=["tracked-listings"])
 
+# Upserts overwrite these; the rest keep their stored value when the import has none.
+UPSERT_REPLACED = ("title", "ebay_item_id")
+UPSERT_KEPT = (
+    "image_url",
+    "condition",
+    "seller_username",
+    "last_seen_price",
+    "target_min_price",
+    "target_max_price",
+    "notes",
+)
+# Unique index behind the one-row-per-(user, itemWebUrl) rule.
+USER_URL_INDEX = "uq_tracked_listings_user_url"
+UNIQUE_VIOLATION = "23505"
+
+
+def _new_values(body: TrackedListingCreate, user_id: str) -> dict[str, Any]:
+    item_web_url = body.item_web_url.strip()
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "title": body.title.strip(),
+        "item_web_url": item_web_url,
+        "ebay_item_id": item_id_from_url(item_web_url),
+        "image_url": body.image_url,
+        "condition": body.condition,
+        "seller_username": body.seller_username,
+        "last_seen_price": body.last_seen_price,
+        "target_min_price": body.target_min_price,
+        "target_max_price": body.target_max_price,
+        "notes": body.notes,
+    }
+
+
+def _changes(body: TrackedListingUpdate) -> dict[str, Any]:
+    data = body.model_dump(exclude_unset=True)
+    if "title" in data and data["title"] is not None:
+        data["title"] = data["title"].strip()
+    if "item_web_url" in data and data["item_web_url"] is not None:
+        data["item_web_url"] = data["item_web_url"].strip()
+        data["ebay_item_id"] = item_id_from_url(data["item_web_url"])
+    return data
+
+
+def _is_duplicate_url(exc: IntegrityError) -> bool:
+    """Whether ``exc`` hit the (user_id, item_web_url) index rather than another constraint."""
+    diag = getattr(exc.orig, "diag", None)
+    return (
+        getattr(exc.orig, "sqlstate", None) == UNIQUE_VIOLATION
+        and getattr(diag, "constraint_name", None) == USER_URL_INDEX
+    )
+
+
+def _duplicate_url() -> HTTPException:
+    return HTTPException(
+        status_code=409, detail="A tracked listing with this itemWebUrl already exists"
+    )
+
+
+async def _commit(db: AsyncSession) -> None:
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if not _is_duplicate_url(exc):
+            raise
+        raise _duplicate_url() from None
+
 
 @router.get("", response_model=list[TrackedListingOut])
-def list_tracked_listings(
-    db: Session = Depends(get_db),
+async def list_tracked_listings(
+    response: Response,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_read_db),
     user_id: str = Depends(get_current_user_id),
-) -> list[TrackedListing]:
-    stmt = (
-        select(TrackedListing)
-        .where(TrackedListing.user_id == user_id)
-        .order_by(TrackedListing.updated_at.desc())
-    )
-    return list(db.scalars(stmt).all())
+) -> list[TrackedListing] | Response:
+    """Most recently updated first; pass ``X-Next-Cursor`` back as ``cursor``."""
+    return await fetch_page(db, TrackedListing, user_id, cursor, limit, response, if_none_match)
 
 
 @router.post("", response_model=TrackedListingOut, status_code=status.HTTP_201_CREATED)
-def create_tracked_listing(
+async def create_tracked_listing(
     body: TrackedListingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id),
 ) -> TrackedListing:
-    row = TrackedListing(
-        user_id=user_id,
-        title=body.title.strip(),
-        item_web_url=body.item_web_url.strip(),
-        image_url=body.image_url,
-        condition=body.condition,
-        seller_username=body.seller_username,
-        last_seen_price=body.last_seen_price,
-        target_min_price=body.target_min_price,
-        target_max_price=body.target_max_price,
-        notes=body.notes,
-    )
+    row = TrackedListing(**_new_values(body, user_id))
     db.add(row)
-    db.commit()
-    db.refresh(row)
+    await _commit(db)
     return row
 
 
+@router.post("/batch", response_model=TrackedListingBatchResponse)
+async def batch_tracked_listings(
+    body: TrackedListingBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = Depends(get_current_user_id),
+) -> TrackedListingBatchResponse:
+    """Upsert, update and delete many listings in one transaction.
+
+    Upserts are keyed on ``itemWebUrl``: a listing the user already tracks is
+    updated in place (fields missing from the import keep their stored value).
+    """
+    # ON CONFLICT can't touch one row twice per statement: last copy of a URL wins.
+    by_url = {row["item_web_url"]: row for row in (_new_values(b, user_id) for b in body.upsert)}
+    stmt = pg_insert(TrackedListing)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TrackedListing.user_id, TrackedListing.item_web_url],
+        set_={
+            **{name: stmt.excluded[name] for name in UPSERT_REPLACED},
+            **{
+                name: func.coalesce(stmt.excluded[name], getattr(TrackedListing, name))
+                for name in UPSERT_KEPT
+            },
+            "updated_at": func.now(),
+        },
+    ).returning(TrackedListing, literal_column("xmax = 0").label("inserted"))
+    upserted: dict[str, tuple[TrackedListing, bool]] = {}
+    try:
+        for chunk in chunked(list(by_url.values())):
+            for row, inserted in (await db.execute(stmt, chunk)).all():
+                upserted[row.item_web_url] = (row, inserted)
+        updated = await update_rows(
+            db, TrackedListing, user_id, ({"id": b.id, **_changes(b)} for b in body.update)
+        )
+        deleted = await delete_rows(db, TrackedListing, user_id, body.delete)
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if not _is_duplicate_url(exc):
+            raise
+        # An update moved a listing onto a URL the user already tracks.
+        raise _duplicate_url() from None
+
+    upsert_results = []
+    for index, b in enumerate(body.upsert):
+        row, inserted = upserted[b.item_web_url.strip()]
+        upsert_results.append(
+            TrackedListingBatchRow(
+                index=index,
+                status="created" if inserted else "updated",
+                id=row.id,
+                item=TrackedListingOut.model_validate(row),
+            )
+        )
+    return TrackedListingBatchResponse(
+        upsert=upsert_results,
+        update=[
+            TrackedListingBatchRow(
+                index=index,
+                status="updated" if b.id in updated else "notFound",
+                id=b.id,
+                item=TrackedListingOut.model_validate(updated[b.id]) if b.id in updated else None,
+            )
+            for index, b in enumerate(body.update)
+        ],
+        delete=[
+            BatchRowStatus(
+                index=index,
+                status="deleted" if row_id in deleted else "notFound",
+                id=row_id,
+            )
+            for index, row_id in enumerate(body.delete)
+        ],
+    )
+
+
 @router.get("/{tracked_id}", response_model=TrackedListingOut)
-def get_tracked_listing(
+async def get_tracked_listing(
     tracked_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     user_id: str = Depends(get_current_user_id),
 ) -> TrackedListing:
-    row = db.get(TrackedListing, tracked_id)
+    row = await db.get(TrackedListing, tracked_id)
     if row is None or row.user_id != user_id:
         raise HTTPException(status_code=404, detail="Tracked listing not found")
     return row
 
 
 @router.patch("/{tracked_id}", response_model=TrackedListingOut)
-def update_tracked_listing(
+async def update_tracked_listing(
     tracked_id: uuid.UUID,
     body: TrackedListingUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id),
 ) -> TrackedListing:
-    row = db.get(TrackedListing, tracked_id)
+    row = await db.get(TrackedListing, tracked_id)
     if row is None or row.user_id != user_id:
         raise HTTPException(status_code=404, detail="Tracked listing not found")
 
-    data = body.model_dump(exclude_unset=True)
-    if "title" in data and data["title"] is not None:
-        data["title"] = data["title"].strip()
-    if "item_web_url" in data and data["item_web_url"] is not None:
-        data["item_web_url"] = data["item_web_url"].strip()
-    for key, value in data.items():
+    for key, value in _changes(body).items():
         setattr(row, key, value)
 
-    db.commit()
-    db.refresh(row)
+    await _commit(db)
     return row
 
 
 @router.delete("/{tracked_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_tracked_listing(
+async def delete_tracked_listing(
     tracked_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_current_user_id),
 ) -> None:
-    row = db.get(TrackedListing, tracked_id)
+    # One DELETE ... RETURNING instead of a SELECT followed by a DELETE.
+    deleted = await db.scalar(
+        delete(TrackedListing)
+        .where(TrackedListing.id == tracked_id, TrackedListing.user_id == user_id)
+        .returning(TrackedListing.id)
+    )
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Tracked listing not found")
+    await db.commit()
+
+
+@router.get("/{tracked_id}/history", response_model=list[PricePointOut])
+async def get_tracked_listing_history(
+    tracked_id: uuid.UUID,
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    limit: int = Query(default=HISTORY_MAX_POINTS, ge=1, le=HISTORY_MAX_POINTS),
+    db: AsyncSession = Depends(get_async_read_db),
+    user_id: str = Depends(get_current_user_id),
+) -> list[PriceHistory]:
+    """Price-history points for the listing, oldest first (default: last 90 days)."""
+    row = await db.get(TrackedListing, tracked_id)
     if row is None or row.user_id != user_id:
         raise HTTPException(status_code=404, detail="Tracked listing not found")
-    db.delete(row)
-    db.commit()
+    if row.ebay_item_id is None:
+        return []
+    since = since or datetime.now(timezone.utc) - timedelta(days=90)
+    return await load_range(db, LISTING, row.ebay_item_id, since, until, limit)
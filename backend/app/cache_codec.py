@@ -0,0 +1,119 @@
+"""Versioned encoding for cached payloads sent over the Upstash REST API.
+
+``llc3:`` entries are base64(zlib(header JSON + newline + body)), then ``:`` and
+base64 of the entry's already-compressed sections. The body is the final
+serialized response, stored as-is so a hit can be returned without parsing or
+re-serializing it; the small header carries the schema tag, soft expiry and
+whatever metadata the caller needs to finish the response. zlib handles the
+repeated field names and eBay URL prefixes about as well as the earlier columnar
+``llc1:`` layout did (within ~5%). Sections (the search body's gzip and brotli
+cores) would not shrink further, so they skip zlib; the header lists their names
+and lengths.
+
+Only ``llc3`` is written. Entries from before it are still read until they age
+out with their TTL: ``llc2:`` (no sections) as-is, and columnar ``llc1:`` and
+bare JSON as an already-stale entry marked ``legacy``, so they are served once
+and revalidated instead of every popular query missing at the same time on
+deploy.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import zlib
+from typing import Any
+
+CODEC_PREFIX = "llc3:"
+# Header + body only, before sections were stored.
+LLC2_CODEC_PREFIX = "llc2:"
+LEGACY_CODEC_PREFIX = "llc1:"
+_SECTIONS = "sections"
+_COLUMNS = "__columns__"
+_VALUES = "__values__"
+# Appended per request from the band table (see SearchPayload).
+_BAND_FIELDS = ("suggestedMinPrice", "suggestedMaxPrice", "suggestedCoverage")
+
+Decoded = tuple[dict[str, Any], bytes, dict[str, bytes]]
+
+
+def encode_entry(
+    header: dict[str, Any],
+    body: bytes,
+    *,
+    compress: bool = True,
+    sections: dict[str, bytes] | None = None,
+) -> str:
+    """Serialize ``header`` + ``body`` + ``sections``; ``compress=False`` skips zlib (level 0)."""
+    sections = sections or {}
+    header = {**header, _SECTIONS: [[name, len(data)] for name, data in sections.items()]}
+    packed = json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n" + body
+    return "".join(
+        (
+            CODEC_PREFIX,
+            base64.b64encode(zlib.compress(packed, 6 if compress else 0)).decode("ascii"),
+            ":",
+            base64.b64encode(b"".join(sections.values())).decode("ascii"),
+        )
+    )
+
+
+def decode_entry(raw: str) -> Decoded | None:
+    """Inverse of :func:`encode_entry`; older entries are converted, others give None."""
+    if raw.startswith(CODEC_PREFIX):
+        packed, _, blob = raw[len(CODEC_PREFIX) :].partition(":")
+        header, body = _split(zlib.decompress(base64.b64decode(packed)))
+        data = base64.b64decode(blob)
+        sections: dict[str, bytes] = {}
+        offset = 0
+        for name, length in header.pop(_SECTIONS, []):
+            sections[name] = data[offset : offset + length]
+            offset += length
+        return header, body, sections
+    if raw.startswith(LLC2_CODEC_PREFIX):
+        header, body = _split(zlib.decompress(base64.b64decode(raw[len(LLC2_CODEC_PREFIX) :])))
+        return header, body, {}
+    if raw.startswith(LEGACY_CODEC_PREFIX):
+        packed = zlib.decompress(base64.b64decode(raw[len(LEGACY_CODEC_PREFIX) :]))
+        return _from_legacy(_unpack(json.loads(packed)))
+    try:
+        return _from_legacy(json.loads(raw))
+    except ValueError:
+        return None
+
+
+def _split(packed: bytes) -> tuple[dict[str, Any], bytes]:
+    header, _, body = packed.partition(b"\n")
+    return json.loads(header), body
+
+
+def _from_legacy(data: Any) -> Decoded | None:
+    # Written as {"softExpiresAt": ..., "value": response}, or earlier as the bare response.
+    value = data.get("value", data) if isinstance(data, dict) else None
+    if not isinstance(value, dict) or "itemSummaries" not in value:
+        return None
+    bands = [
+        [s["filterStrength"], s["minPrice"], s["maxPrice"], s["coverage"]]
+        for s in value.get("suggestions") or []
+    ]
+    core = {k: v for k, v in value.items() if k not in _BAND_FIELDS}
+    header = {"legacy": True, "softExpiresAt": 0, "bands": bands}
+    return header, json.dumps(core, separators=(",", ":")).encode("utf-8"), {}
+
+
+def _from_columns(table: dict[str, Any]) -> list[dict[str, Any]]:
+    fields: list[str] = table[_COLUMNS]
+    columns: list[list[Any]] = table[_VALUES]
+    if not columns:
+        return []
+    return [dict(zip(fields, row)) for row in zip(*columns)]
+
+
+def _unpack(value: Any) -> Any:
+    if isinstance(value, dict):
+        if _COLUMNS in value and _VALUES in value:
+            return [
+                {k: _unpack(v) for k, v in record.items()} for record in _from_columns(value)
+            ]
+        return {k: _unpack(v) for k, v in value.items()}
+    return value
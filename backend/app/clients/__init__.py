@@ -1,3 +1,4 @@
 from .ebay_client import EbayClient
+from .quota import Priority, QuotaExhaustedError
 
-__all__ = ["EbayClient"]
+__all__ = ["EbayClient", "Priority", "QuotaExhaustedError"]
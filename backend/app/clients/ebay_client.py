@@ -1,24 +1,68 @@
 import asyncio
 import logging
 import random
-import time
+import re
 from urllib.parse import quote
 
 import httpx
 from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
+try:
+    from orjson import loads as _loads
+except ImportError:  # Stdlib parser; same result, roughly 1.5x slower on Browse pages.
+    from json import loads as _loads
+
+from app.clients.http import get_http_client
+from app.clients.oauth import TokenManager
+from app.clients.quota import Priority, QuotaExhaustedError, quota_governor
 from app.config import settings
-from app.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
-TOKEN_URL = "https://api.ebay.com/identity/v1/oauth2/token"
-SEARCH_URL = "https://api.ebay.com/buy/browse/v1/item_summary/search"
-# eBay access tokens last ~2h; refresh early so callers never see an expired token.
-TOKEN_TTL_SECONDS = 6000
-TOKEN_REDIS_KEY = "listinglab:ebay:oauth_token"
-TOKEN_LOCK_KEY = "listinglab:ebay:oauth_lock"
+# EBAY_API_BASE_URL can point at a local fake (see app.dev.fake_ebay).
+TOKEN_URL = f"{settings.ebay_api_base_url.rstrip('/')}/identity/v1/oauth2/token"
+SEARCH_URL = f"{settings.ebay_api_base_url.rstrip('/')}/buy/browse/v1/item_summary/search"
+ITEMS_URL = f"{settings.ebay_api_base_url.rstrip('/')}/buy/browse/v1/item/"
 RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+# getItems accepts at most this many item ids per call.
+GET_ITEMS_MAX_IDS = 20
+_LEGACY_ITEM_ID = re.compile(r"/itm/(?:[^/?#]*/)?(\d+)")
+
+
+def item_id_from_url(url: str | None) -> str | None:
+    """Browse item id (``v1|<legacy id>|0``) for an eBay listing URL, or None."""
+    match = _LEGACY_ITEM_ID.search(url or "")
+    return f"v1|{match.group(1)}|0" if match else None
+
+
+def _project_item(item: dict) -> dict:
+    """Keep only the Browse fields ``SearchService`` reads; drop the rest of the tree
+    (thumbnails, marketing prices, leaf categories, buying options, ...)."""
+    projected: dict = {
+        "itemId": item.get("itemId"),
+        "title": item.get("title"),
+        "price": {"value": (item.get("price") or {}).get("value")},
+        "condition": item.get("condition"),
+        "itemWebUrl": item.get("itemWebUrl"),
+        "itemCreationDate": item.get("itemCreationDate"),
+    }
+    seller = item.get("seller")
+    if seller:
+        projected["seller"] = {
+            "username": seller.get("username"),
+            "feedbackPercentage": seller.get("feedbackPercentage"),
+        }
+    options = item.get("shippingOptions")
+    if options:
+        cost = (options[0] or {}).get("shippingCost") or {}
+        projected["shippingOptions"] = [{"shippingCost": {"value": cost.get("value")}}]
+    categories = item.get("categories")
+    if categories:
+        projected["categories"] = [{"categoryName": categories[0].get("categoryName")}]
+    image = item.get("image")
+    if image:
+        projected["image"] = {"imageUrl": image.get("imageUrl")}
+    return projected
 
 
 def _should_retry(exception: BaseException) -> bool:
@@ -31,14 +75,6 @@ def _should_retry(exception: BaseException) -> bool:
 
 
 class EbayClient:
-    client = httpx.AsyncClient(timeout=30.0)
-
-    def __init__(self) -> None:
-        # L1: process-local (helps warm Vercel instances; lost on cold start).
-        self._token: str | None = None
-        self._token_time: float | None = None
-        self._token_ttl: float = TOKEN_TTL_SECONDS
-
     async def _get_token(self) -> tuple[str, int]:
         settings.require_ebay_credentials()
         body = {
@@ -63,84 +99,24 @@ class EbayClient:
         payload = resp.json()
         token = payload["access_token"]
         expires_in = int(payload.get("expires_in") or 7200)
-        # Refresh a bit early so shared cache never serves a nearly-dead token.
-        ttl = max(60, expires_in - 600)
+        # Small margin for clock skew; TokenManager renews well before this.
+        ttl = max(60, expires_in - 60)
         return token, ttl
 
-    def _memory_token_valid(self) -> bool:
-        return bool(
-            self._token
-            and self._token_time
-            and time.perf_counter() - self._token_time < self._token_ttl
-        )
-
-    def _store_memory_token(self, token: str, ttl: int) -> None:
-        self._token = token
-        self._token_time = time.perf_counter()
-        self._token_ttl = float(ttl)
-
     async def _ensure_token(self) -> str:
-        if self._memory_token_valid():
-            return self._token  # type: ignore[return-value]
-
-        redis = await get_redis()
-        if redis is not None:
-            try:
-                cached = await redis.get(TOKEN_REDIS_KEY)
-                if cached:
-                    token = str(cached)
-                    self._store_memory_token(token, TOKEN_TTL_SECONDS)
-                    return token
-            except Exception:
-                logger.exception("Redis OAuth GET failed")
-
-            got_lock = False
-            try:
-                got_lock = bool(await redis.set(TOKEN_LOCK_KEY, "1", nx=True, ex=20))
-            except Exception:
-                logger.exception("Redis OAuth lock failed")
-
-            if got_lock:
-                try:
-                    cached = await redis.get(TOKEN_REDIS_KEY)
-                    if cached:
-                        token = str(cached)
-                        self._store_memory_token(token, TOKEN_TTL_SECONDS)
-                        return token
-
-                    logger.info("Refreshing eBay OAuth token (shared)")
-                    token, ttl = await self._get_token()
-                    self._store_memory_token(token, ttl)
-                    try:
-                        await redis.set(TOKEN_REDIS_KEY, token, ex=ttl)
-                    except Exception:
-                        logger.exception("Redis OAuth SET failed")
-                    return token
-                finally:
-                    try:
-                        await redis.delete(TOKEN_LOCK_KEY)
-                    except Exception:
-                        logger.exception("Redis OAuth unlock failed")
-            else:
-                # Another instance is refreshing; wait briefly for the shared token.
-                for _ in range(15):
-                    await asyncio.sleep(0.2)
-                    try:
-                        cached = await redis.get(TOKEN_REDIS_KEY)
-                        if cached:
-                            token = str(cached)
-                            self._store_memory_token(token, TOKEN_TTL_SECONDS)
-                            return token
-                    except Exception:
-                        logger.exception("Redis OAuth wait GET failed")
-                        break
-
-        logger.info("Refreshing eBay OAuth token (local)")
-        token, ttl = await self._get_token()
-        self._store_memory_token(token, ttl)
-        return token
-
-    async def fetch_listings(self, params: dict[str, str]) -> list[dict]:
+        return await ebay_token_manager.get()
+
+    async def fetch_listings(
+        self,
+        params: dict[str, str],
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        quota_reserved: bool = False,
+    ) -> list[dict]:
+        """One Browse search page. Draws one call from the quota governor unless
+        the caller already reserved it (see ``SearchService.process_search``)."""
+        if not quota_reserved and not await quota_governor.acquire(1, priority):
+            raise QuotaExhaustedError("eBay Browse call budget exhausted")
         token = await self._ensure_token()
         # contextualLocation improves shippingCost accuracy for CALCULATED rates.
         # Format must be URL-encoded: country=US,zip=60601
@@ -151,7 +127,35 @@ class EbayClient:
             "X-EBAY-C-ENDUSERCTX": f"contextualLocation={quote(location)}",
         }
         resp = await self._request("GET", SEARCH_URL, headers=headers, params=params)
-        return resp.json().get("itemSummaries", [])
+        # Parse the raw bytes (no str decode) and keep only the projected fields, so
+        # the full object tree for a 200-item page is dropped as soon as it's built.
+        items = _loads(resp.content).get("itemSummaries") or []
+        return [_project_item(item) for item in items]
+
+    async def fetch_items(
+        self,
+        item_ids: list[str],
+        *,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> list[dict]:
+        """Batch item lookup (Browse getItems, up to ``GET_ITEMS_MAX_IDS`` ids per call).
+
+        Unknown or ended items are simply missing from the result.
+        """
+        if len(item_ids) > GET_ITEMS_MAX_IDS:
+            raise ValueError(f"getItems takes at most {GET_ITEMS_MAX_IDS} item ids")
+        if not await quota_governor.acquire(1, priority):
+            raise QuotaExhaustedError("eBay Browse call budget exhausted")
+        token = await self._ensure_token()
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "X-EBAY-C-MARKETPLACE-ID": "EBAY_US",
+        }
+        resp = await self._request(
+            "GET", ITEMS_URL, headers=headers, params={"item_ids": ",".join(item_ids)}
+        )
+        items = _loads(resp.content).get("items") or []
+        return [_project_item(item) for item in items]
 
     @retry(
         retry=retry_if_exception(_should_retry),
@@ -170,7 +174,7 @@ class EbayClient:
         auth: tuple[str, str] | None = None,
     ) -> httpx.Response:
         """One HTTP attempt. Raises so Tenacity can retry transient failures."""
-        resp = await self.client.request(
+        resp = await get_http_client().request(
             method,
             url,
             headers=headers,
@@ -193,5 +197,14 @@ class EbayClient:
         except ValueError:
             delay = 1.0
         delay = max(0.0, delay) + random.uniform(0.0, 0.25)
+        # Let other requests/instances degrade or shed instead of piling on.
+        await quota_governor.note_throttled(delay)
         logger.warning("eBay rate limited (429); sleeping %.2fs before retry", delay)
         await asyncio.sleep(delay)
+
+
+# One token per process, shared by every EbayClient and renewed in the background.
+ebay_token_manager = TokenManager(
+    fetch=lambda: EbayClient()._get_token(),
+    refresh_ahead_seconds=settings.ebay_token_refresh_ahead_seconds,
+)
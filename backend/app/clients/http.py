@@ -0,0 +1,94 @@
+"""Shared HTTP connection pool for eBay API calls.
+
+The pool is opened and closed by the FastAPI lifespan (``app.main``); pool
+limits, keep-alive, per-phase timeouts and HTTP/2 come from settings. Startup can
+optionally pre-open TLS connections to api.ebay.com so the first search on a warm
+instance skips the handshake. If the lifespan has not run (scripts, or a runtime
+that skips it), the pool is created lazily on first use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.ebay_http2
+    if http2 and not _http2_available():
+        logger.warning("EBAY_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.ebay_http_max_connections,
+            max_keepalive_connections=settings.ebay_http_max_keepalive_connections,
+            keepalive_expiry=settings.ebay_http_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.ebay_http_read_timeout_seconds,
+            connect=settings.ebay_http_connect_timeout_seconds,
+            pool=settings.ebay_http_pool_timeout_seconds,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared pool; created on first use when the lifespan hasn't opened it."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def _warm_up(client: httpx.AsyncClient, connections: int) -> None:
+    # Any response (eBay answers a bare HEAD with 404) leaves a pooled connection.
+    async def touch() -> None:
+        await client.head(settings.ebay_api_base_url)
+
+    results = await asyncio.gather(*(touch() for _ in range(connections)), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        logger.warning(
+            "eBay connection warm-up: %d/%d failed (%r)", len(failures), connections, failures[0]
+        )
+    else:
+        logger.info("eBay connection warm-up: %d connection(s) opened", connections)
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Open the shared pool at startup, warming it up if configured."""
+    client = get_http_client()
+    connections = min(
+        settings.ebay_http_warmup_connections,
+        settings.ebay_http_max_keepalive_connections,
+    )
+    if connections > 0 and settings.ebay_http2 and _http2_available():
+        # One HTTP/2 connection multiplexes every request; more would sit idle.
+        connections = 1
+    if connections > 0:
+        await _warm_up(client, connections)
+    return client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
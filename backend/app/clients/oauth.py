@@ -0,0 +1,201 @@
+"""eBay application OAuth token, renewed ahead of expiry off the request path.
+
+The token is shared across instances through Redis with its real expiry (read
+back with TTL). A background loop started by the app lifespan renews it
+``refresh_ahead_seconds`` before it expires; one instance wins a short SET NX
+lock and fetches from eBay, the rest adopt the shared token. Requests only wait
+on a refresh when there is no usable token at all (cold start). A token that is
+due but still valid is served immediately, with a refresh started in the
+background, which covers runtimes that freeze the loop between requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from app.redis_client import get_redis
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+TOKEN_REDIS_KEY = "listinglab:ebay:oauth_token"
+TOKEN_LOCK_KEY = "listinglab:ebay:oauth_lock"
+TOKEN_LOCK_SECONDS = 20
+
+
+class TokenManager:
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[tuple[str, int]]],
+        refresh_ahead_seconds: float,
+        retry_seconds: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        # ``fetch`` calls eBay and returns (token, seconds it stays usable).
+        self._fetch = fetch
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._token: str | None = None
+        self._expires_at = 0.0
+        # Earliest time a due-but-valid token is refreshed again after an attempt.
+        self._next_attempt_at = 0.0
+        self._flight = SingleFlight()
+        self._background: asyncio.Task[None] | None = None
+        self._loop_task: asyncio.Task[None] | None = None
+        self.fetched = 0
+        self.adopted = 0
+        self.failures = 0
+        self.blocking_refreshes = 0
+        self.last_refresh_lag_seconds: float | None = None
+        self.max_refresh_lag_seconds = 0.0
+
+    def _valid(self, now: float) -> bool:
+        return self._token is not None and now < self._expires_at
+
+    def _due_at(self) -> float:
+        return self._expires_at - self.refresh_ahead_seconds
+
+    async def get(self) -> str:
+        """Current token; blocks on a refresh only when none is usable."""
+        now = self._clock()
+        if self._valid(now):
+            if now >= self._due_at() and now >= self._next_attempt_at:
+                self._refresh_in_background()
+            return self._token  # type: ignore[return-value]
+        self.blocking_refreshes += 1
+        await self._flight.do("refresh", self._refresh)
+        return self._token  # type: ignore[return-value]
+
+    def _refresh_in_background(self) -> None:
+        if self._flight.inflight("refresh"):
+            return
+        self._background = asyncio.ensure_future(self._refresh_logged())
+
+    async def _refresh_logged(self) -> None:
+        try:
+            await self._flight.do("refresh", self._refresh)
+        except Exception:
+            logger.exception("Background eBay OAuth refresh failed")
+
+    def _adopt(self, token: str, ttl: float, now: float) -> None:
+        self._token = token
+        self._expires_at = now + ttl
+
+    def _record_lag(self, due_at: float | None, now: float) -> None:
+        if due_at is None:
+            return
+        lag = max(0.0, now - due_at)
+        self.last_refresh_lag_seconds = lag
+        self.max_refresh_lag_seconds = max(self.max_refresh_lag_seconds, lag)
+
+    async def _read_shared(self, redis) -> tuple[str | None, int]:
+        pipeline = redis.pipeline()
+        pipeline.get(TOKEN_REDIS_KEY)
+        pipeline.ttl(TOKEN_REDIS_KEY)
+        token, ttl = await pipeline.exec()
+        if not token or ttl is None or int(ttl) <= 0:
+            return None, 0
+        return str(token), int(ttl)
+
+    async def _refresh(self) -> None:
+        started = self._clock()
+        due_at = self._due_at() if self._token is not None else None
+        self._next_attempt_at = started + self.retry_seconds
+        try:
+            await self._refresh_shared(started, due_at)
+        except Exception:
+            self.failures += 1
+            raise
+
+    async def _refresh_shared(self, started: float, due_at: float | None) -> None:
+        redis = await get_redis()
+        if redis is not None:
+            got_lock = False
+            try:
+                token, ttl = await self._read_shared(redis)
+                if token and ttl > self.refresh_ahead_seconds:
+                    self._adopt(token, ttl, started)
+                    self.adopted += 1
+                    self._record_lag(due_at, self._clock())
+                    return
+                got_lock = bool(
+                    await redis.set(TOKEN_LOCK_KEY, "1", nx=True, ex=TOKEN_LOCK_SECONDS)
+                )
+                if not got_lock and token:
+                    # A peer is renewing; keep serving the shared token until it lands.
+                    self._adopt(token, ttl, started)
+                    return
+            except Exception:
+                logger.exception("Redis OAuth read/lock failed; refreshing locally")
+
+            if got_lock:
+                try:
+                    logger.info("Refreshing eBay OAuth token (shared)")
+                    token, ttl = await self._fetch()
+                    self.fetched += 1
+                    self._adopt(token, ttl, self._clock())
+                    self._record_lag(due_at, self._clock())
+                    try:
+                        await redis.set(TOKEN_REDIS_KEY, token, ex=ttl)
+                    except Exception:
+                        logger.exception("Redis OAuth SET failed")
+                    return
+                finally:
+                    try:
+                        await redis.delete(TOKEN_LOCK_KEY)
+                    except Exception:
+                        logger.exception("Redis OAuth unlock failed")
+
+        # No Redis, or a cold start while a peer holds the lock: a second valid
+        # token is cheaper than making the request wait on the peer.
+        logger.info("Refreshing eBay OAuth token (local)")
+        token, ttl = await self._fetch()
+        self.fetched += 1
+        self._adopt(token, ttl, self._clock())
+        self._record_lag(due_at, self._clock())
+
+    async def _run(self) -> None:
+        while True:
+            now = self._clock()
+            # Every attempt pushes _next_attempt_at out, so failures back off too.
+            wake = max(self._due_at() if self._token else now, self._next_attempt_at)
+            await asyncio.sleep(max(0.0, wake - now))
+            try:
+                await self._flight.do("refresh", self._refresh)
+            except Exception:
+                logger.exception(
+                    "Scheduled eBay OAuth refresh failed; retrying in %.0fs", self.retry_seconds
+                )
+
+    def start(self) -> None:
+        """Start the background refresher (idempotent)."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        task, self._loop_task = self._loop_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> dict[str, int | float | bool | None]:
+        now = self._clock()
+        return {
+            "hasToken": self._valid(now),
+            "expiresInSeconds": round(self._expires_at - now, 1) if self._token else None,
+            "refresherRunning": self._loop_task is not None and not self._loop_task.done(),
+            "fetched": self.fetched,
+            "adopted": self.adopted,
+            "failures": self.failures,
+            "blockingRefreshes": self.blocking_refreshes,
+            "lastRefreshLagSeconds": self.last_refresh_lag_seconds,
+            "maxRefreshLagSeconds": self.max_refresh_lag_seconds,
+        }
@@ -0,0 +1,140 @@
+"""Global eBay Browse API call budget, shared across instances via Redis.
+
+Every Browse call draws from a daily counter. Interactive searches get the whole
+budget; background work (cache revalidation, scheduled refreshes) is shed early so
+users keep headroom, and interactive searches degrade to a single page near the
+limit instead of waiting on eBay 429s. After eBay throttles us, a shared cooldown
+applies the same degrade/shed rules on every instance until Retry-After passes.
+
+Falls back to a process-local counter when Redis is unavailable.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from enum import IntEnum
+
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUOTA_KEY_PREFIX = "listinglab:ebay:quota"
+COOLDOWN_KEY = "listinglab:ebay:cooldown"
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class QuotaExhaustedError(RuntimeError):
+    """Raised when the governor grants no Browse calls for a request."""
+
+
+class QuotaGovernor:
+    def __init__(
+        self,
+        daily_limit: int,
+        background_share: float,
+        degrade_share: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.daily_limit = daily_limit
+        self.background_share = background_share
+        self.degrade_share = degrade_share
+        self._clock = clock
+        self._local_day = ""
+        self._local_used = 0
+        self._cooldown_until = 0.0
+        self.granted = 0
+        self.degraded = 0
+        self.shed = 0
+
+    def _day(self) -> str:
+        return datetime.fromtimestamp(self._clock(), tz=timezone.utc).strftime("%Y%m%d")
+
+    def _ceiling(self, priority: Priority) -> int:
+        share = self.background_share if priority is Priority.BACKGROUND else 1.0
+        return int(self.daily_limit * share)
+
+    def _grant(self, used_before: int, calls: int, priority: Priority, cooling: bool) -> int:
+        """How many of ``calls`` to admit given usage before this reservation."""
+        if priority is Priority.BACKGROUND:
+            if cooling or used_before + calls > self._ceiling(priority):
+                return 0
+            return calls
+        if used_before + 1 > self.daily_limit:
+            return 0
+        if cooling or used_before + calls > int(self.daily_limit * self.degrade_share):
+            return 1
+        return min(calls, self.daily_limit - used_before)
+
+    async def acquire(self, calls: int, priority: Priority = Priority.INTERACTIVE) -> int:
+        """Reserve up to ``calls`` Browse calls; returns how many were granted (may be 0)."""
+        day = self._day()
+        cooling = self._clock() < self._cooldown_until
+        client = await get_redis()
+        granted: int | None = None
+        if client is not None:
+            key = f"{QUOTA_KEY_PREFIX}:{day}"
+            try:
+                pipeline = client.pipeline()
+                pipeline.incrby(key, calls)
+                pipeline.expire(key, 2 * 86400, nx=True)
+                pipeline.get(COOLDOWN_KEY)
+                total, _, cooldown = await pipeline.exec()
+                cooling = cooling or cooldown is not None
+                granted = self._grant(int(total) - calls, calls, priority, cooling)
+                if granted < calls:
+                    await client.incrby(key, granted - calls)
+            except Exception:
+                logger.exception("Redis quota reservation failed; using local budget")
+                granted = None
+
+        if granted is None:
+            if day != self._local_day:
+                self._local_day, self._local_used = day, 0
+            granted = self._grant(self._local_used, calls, priority, cooling)
+            self._local_used += granted
+
+        self.granted += granted
+        if granted == 0:
+            self.shed += 1
+            logger.warning("eBay quota: shed %s request for %d call(s)", priority.name, calls)
+        elif granted < calls:
+            self.degraded += 1
+            logger.warning("eBay quota: degraded %s request to %d/%d call(s)", priority.name, granted, calls)
+        return granted
+
+    async def note_throttled(self, retry_after_seconds: float) -> None:
+        """Record an eBay 429 so every instance backs off until Retry-After passes."""
+        seconds = max(1, int(retry_after_seconds + 0.999))
+        self._cooldown_until = max(self._cooldown_until, self._clock() + seconds)
+        client = await get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(COOLDOWN_KEY, "1", ex=seconds)
+        except Exception:
+            logger.exception("Redis quota cooldown SET failed")
+
+    def stats(self) -> dict[str, int | float | bool]:
+        return {
+            "dailyLimit": self.daily_limit,
+            "localUsed": self._local_used,
+            "coolingDown": self._clock() < self._cooldown_until,
+            "granted": self.granted,
+            "degraded": self.degraded,
+            "shed": self.shed,
+        }
+
+
+quota_governor = QuotaGovernor(
+    daily_limit=settings.ebay_daily_call_limit,
+    background_share=settings.ebay_quota_background_share,
+    degrade_share=settings.ebay_quota_degrade_share,
+)
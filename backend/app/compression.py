@@ -0,0 +1,196 @@
+"""Negotiated gzip / brotli response compression.
+
+``CompressionMiddleware`` compresses complete responses of at least
+``response_compression_min_bytes`` for clients that accept it, preferring
+brotli when the optional ``brotli`` package is installed. Streamed bodies (the
+NDJSON search stream) and responses that already carry ``Content-Encoding``
+pass through untouched.
+
+Cached search bodies are compressed once per encoding, when the cache entry is
+written, by :func:`open_object`: the JSON object minus its closing ``}``,
+compressed and flushed to a byte boundary. :func:`close_object` appends the
+per-request members and the ``}`` as a literal (stored) block, so later hits
+cost a few hundred bytes of framing instead of compressing the response again.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # gzip only.
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+GZIP_LEVEL = 6
+
+# Preferred first.
+SUPPORTED_ENCODINGS = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Member, fixed mtime, no flags, unknown OS: identical bodies give identical bytes.
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+# A stored deflate block or brotli meta-block holds at most this many bytes.
+_MAX_LITERAL = 65535
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """The supported coding ``Accept-Encoding`` ranks highest, or None for identity."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=settings.response_brotli_quality)
+    deflate = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data = deflate.compress(body) + deflate.flush()
+    return _GZIP_HEADER + data + struct.pack("<II", zlib.crc32(body), len(body) & 0xFFFFFFFF)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """``etag`` for the body compressed in ``encoding``, e.g. ``"abc-6-gzip"``.
+
+    Compressed bytes differ from the identity body, so each encoding gets its own
+    strong tag; ``app.api.conditional.etag_matches`` accepts any of them.
+    """
+    weak = etag.startswith("W/")
+    tag = f'{etag.removeprefix("W/")[:-1]}-{encoding}"'
+    return f"W/{tag}" if weak else tag
+
+
+def object_compressible(body: bytes) -> bool:
+    """Whether :func:`open_object` applies: a JSON object worth compressing."""
+    return len(body) >= settings.response_compression_min_bytes and body.endswith(b"}")
+
+
+@dataclass(frozen=True)
+class OpenObject:
+    """A JSON object body without its closing ``}``, compressed but not finished."""
+
+    encoding: str
+    data: bytes
+    # CRC-32 and length of the uncompressed bytes, for the gzip trailer.
+    crc: int
+    size: int
+
+
+def open_object(body: bytes, encoding: str) -> OpenObject:
+    """Compress ``body`` (a JSON object) in ``encoding`` for :func:`close_object`."""
+    if not object_compressible(body):
+        raise ValueError("Body is not a JSON object worth compressing")
+    head = body[:-1]
+    if encoding == GZIP:
+        deflate = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        # Sync flush: ends on a byte boundary without marking the last block.
+        data = _GZIP_HEADER + deflate.compress(head) + deflate.flush(zlib.Z_SYNC_FLUSH)
+        return OpenObject(encoding=GZIP, data=data, crc=zlib.crc32(head), size=len(head))
+    if encoding == BROTLI and brotli is not None:
+        compressor = brotli.Compressor(quality=settings.response_brotli_quality)
+        data = compressor.process(head) + compressor.flush()
+        return OpenObject(encoding=BROTLI, data=data, crc=0, size=len(head))
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def close_object(opened: OpenObject, members: bytes) -> bytes:
+    """The finished ``opened.encoding`` body with ``members`` and ``}`` appended."""
+    tail = members + b"}"
+    if len(tail) > _MAX_LITERAL:
+        raise ValueError(f"Appended members exceed {_MAX_LITERAL} bytes")
+    if opened.encoding == GZIP:
+        # Final stored block (BFINAL=1, BTYPE=00): LEN, its complement, bytes.
+        block = struct.pack("<BHH", 1, len(tail), len(tail) ^ 0xFFFF) + tail
+        trailer = struct.pack(
+            "<II", zlib.crc32(tail, opened.crc), (opened.size + len(tail)) & 0xFFFFFFFF
+        )
+        return opened.data + block + trailer
+    # Uncompressed meta-block: ISLAST=0, MNIBBLES=4, MLEN-1, ISUNCOMPRESSED=1,
+    # padded to a byte; then an empty last meta-block (ISLAST=1, ISLASTEMPTY=1).
+    header = ((len(tail) - 1) << 3) | (1 << 19)
+    return opened.data + header.to_bytes(3, "little") + tail + b"\x03"
+
+
+class CompressionMiddleware:
+    """Compress single-message responses for clients that accept gzip or brotli."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held until the first body message shows whether it's complete.
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            held, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(held["headers"]))
+            if held["status"] == 304 and "etag" in headers:
+                # Repeat the tag the client got with the compressed 200.
+                variant = encoded_etag(headers["etag"], encoding)
+                sent = request_headers.get("if-none-match", "").split(",")
+                if variant.removeprefix("W/") in (tag.strip().removeprefix("W/") for tag in sent):
+                    headers["ETag"] = variant
+                    headers.add_vary_header("Accept-Encoding")
+                    held = {**held, "headers": headers.raw}
+            if message.get("more_body", False) or not self._compressible(headers, body):
+                await send(held)
+                await send(message)
+                return
+            data = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(data))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            await send({**held, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": data})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compressible(self, headers: MutableHeaders, body: bytes) -> bool:
+        if len(body) < self.minimum_size or "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
@@ -13,6 +13,20 @@ class Settings(BaseSettings):
     client_secret: str = ""
     cors_origins: str = "http://localhost:4200"
     database_url: str = ""
+    # Connection pool per instance (see app.db.session). Recycling before Neon's
+    # idle timeout replaces a pre-ping query on every checkout.
+    database_pool_size: int = 5
+    database_max_overflow: int = 5
+    database_pool_timeout_seconds: float = 10.0
+    database_pool_recycle_seconds: int = 240
+    database_pool_pre_ping: bool = False
+    # No client-side pool; use with a PgBouncer (Neon "-pooler") DATABASE_URL.
+    database_null_pool: bool = False
+    # psycopg prepares a query after this many executions; unset disables
+    # prepared statements (required behind transaction-mode PgBouncer).
+    database_prepare_threshold: int | None = None
+    # Bearer secret for /api/jobs/* (Vercel Cron sends it automatically).
+    cron_secret: str = ""
     # Temporary until Clerk JWT auth is wired. Frontend/API can send X-User-Id.
     dev_user_id: str = "dev-user"
     # Default US hub for shipping estimates (Chicago Loop).
@@ -25,17 +39,86 @@ class Settings(BaseSettings):
     kv_rest_api_url: str = ""
     kv_rest_api_token: str = ""
 
-    # Shared search response cache TTL.
+    # Shared search response cache. Entries older than the soft TTL are served
+    # stale while one background refresh runs; the hard TTL bounds staleness.
+    search_cache_soft_ttl_seconds: int = 120
     search_cache_ttl_seconds: int = 600
-    # Per-IP search rate limit (fixed window).
+    # zlib-compress cached bodies (app.cache_codec); uncompressed entries are
+    # always readable, so this can be flipped during a rollout.
+    search_cache_compress: bool = True
+    # In-process L1 in front of Upstash (per warm instance). 0 bytes disables it.
+    search_l1_cache_max_bytes: int = 32 * 1024 * 1024
+    search_l1_cache_ttl_seconds: int = 60
+    # Negotiated gzip / brotli for responses of at least this many bytes
+    # (app.compression; brotli needs the optional ``brotli`` package).
+    response_compression_min_bytes: int = 1024
+    response_brotli_quality: int = 5
+    # Cross-instance fill lock: one instance calls eBay for a cold key, others wait
+    # (up to search_fill_wait_seconds) for the cached result instead of racing.
+    search_fill_lock_enabled: bool = False
+    search_fill_lock_seconds: int = 20
+    search_fill_wait_seconds: float = 8.0
+    # Latency budget for a search's eBay page fetches. Pages still running at the
+    # deadline are cancelled and the response is marked partial (and not cached).
+    # A page still running after search_hedge_after_seconds gets one duplicate
+    # request (costs an extra call; 0 disables hedging).
+    search_deadline_seconds: float = 10.0
+    search_hedge_after_seconds: float = 0.0
+    # Per-IP search rate limit: token bucket with a burst of search_rate_limit,
+    # refilled evenly over the window. Buckets live in process and are reconciled
+    # with Redis at most every rate_limit_sync_interval_seconds.
     search_rate_limit: int = 8
     search_rate_window_seconds: int = 60
+    rate_limit_sync_interval_seconds: float = 2.0
+    # POST /api/search/batch: tokens per window (one per uncached search) and how
+    # many of a batch's uncached searches run at once.
+    search_batch_rate_limit: int = 60
+    search_batch_concurrency: int = 4
+
+    # Saved-search cache warming (app.jobs.refresh_saved_searches). A search saved
+    # by N users is refreshed about every interval / N seconds.
+    saved_search_refresh_interval_seconds: int = 6 * 3600
+    saved_search_refresh_max_per_run: int = 20
+    saved_search_refresh_time_budget_seconds: float = 25.0
+    # Tracked-listing price refresh (app.jobs.refresh_tracked_prices): concurrent
+    # getItems calls of 20 ids each.
+    tracked_price_refresh_concurrency: int = 4
+    # Price history (app.services.price_history): refresh runs are recorded in
+    # batches, kept raw for price_history_raw_days, then merged into daily rows
+    # kept for price_history_retention_days.
+    price_history_enabled: bool = True
+    price_history_batch_size: int = 50
+    price_history_raw_days: int = 14
+    price_history_retention_days: int = 365
+
+    # eBay API origin; point at a local fake (app.dev.fake_ebay) for offline runs.
+    ebay_api_base_url: str = "https://api.ebay.com"
+    # eBay Browse daily call budget shared by all instances. Background work stops
+    # at background_share of it; interactive searches drop to one page past
+    # degrade_share.
+    ebay_daily_call_limit: int = 5000
+    ebay_quota_background_share: float = 0.7
+    ebay_quota_degrade_share: float = 0.9
+    # Shared eBay connection pool, opened/closed by the app lifespan. HTTP/2 needs
+    # the optional h2 package. Warm-up pre-opens this many TLS connections at
+    # startup (0 disables it).
+    ebay_http_max_connections: int = 20
+    ebay_http_max_keepalive_connections: int = 10
+    ebay_http_keepalive_expiry_seconds: float = 60.0
+    ebay_http2: bool = False
+    ebay_http_connect_timeout_seconds: float = 5.0
+    ebay_http_read_timeout_seconds: float = 20.0
+    ebay_http_pool_timeout_seconds: float = 5.0
+    ebay_http_warmup_connections: int = 2
+    # Renew the shared eBay OAuth token this long before it expires (tokens last ~2h).
+    ebay_token_refresh_ahead_seconds: int = 600
 
     @field_validator(
         "client_id",
         "client_secret",
         "database_url",
         "dev_user_id",
+        "cron_secret",
         "upstash_redis_rest_url",
         "upstash_redis_rest_token",
         "kv_rest_api_url",
@@ -48,6 +131,13 @@ class Settings(BaseSettings):
             return value.strip().strip('"').strip("'")
         return value
 
+    @field_validator("database_prepare_threshold", mode="before")
+    @classmethod
+    def empty_as_none(cls, value: object) -> object:
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
     @property
     def cors_origin_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
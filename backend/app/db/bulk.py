@@ -0,0 +1,83 @@
+"""Multi-row UPDATE / DELETE for the per-user tables' batch endpoints.
+
+Updates are grouped by the set of fields they change, and each group is one
+``UPDATE ... FROM (VALUES ...) RETURNING``. An importer that always sends the
+same fields therefore costs one statement per chunk. Every statement is scoped
+to the acting user, so ids belonging to someone else come back as not found.
+"""
+
+from collections.abc import Iterable, Iterator
+from typing import Any, TypeVar
+
+from sqlalchemy import column, delete, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+# Rows per statement; keeps bind parameters well under Postgres's 65535 limit.
+CHUNK_ROWS = 1000
+
+
+def chunked(rows: list[T], size: int = CHUNK_ROWS) -> Iterator[list[T]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+async def update_rows(
+    db: AsyncSession,
+    model: Any,
+    user_id: str,
+    changes: Iterable[dict[str, Any]],
+) -> dict[Any, Any]:
+    """Apply ``{"id": ..., field: value, ...}`` changes; returns updated rows by id."""
+    # One change per id (later fields win): a VALUES list joining the same row
+    # twice would apply only one of them.
+    merged: dict[Any, dict[str, Any]] = {}
+    for change in changes:
+        merged.setdefault(change["id"], {}).update(change)
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for change in merged.values():
+        fields = tuple(sorted(key for key in change if key != "id"))
+        groups.setdefault(fields, []).append(change)
+
+    table = model.__table__
+    updated: dict[Any, Any] = {}
+    for fields, rows in groups.items():
+        for chunk in chunked(rows):
+            if not fields:
+                # Nothing to change: report the rows as they are.
+                stmt = select(model).where(
+                    model.user_id == user_id, model.id.in_([row["id"] for row in chunk])
+                )
+                for row in (await db.scalars(stmt)).all():
+                    updated[row.id] = row
+                continue
+            new = values(
+                *(column(name, table.c[name].type) for name in ("id", *fields)),
+                name="new",
+            ).data([tuple(row[name] for name in ("id", *fields)) for row in chunk])
+            stmt = (
+                update(model)
+                .where(model.id == new.c.id, model.user_id == user_id)
+                .values({name: new.c[name] for name in fields})
+                .returning(model)
+                # Refresh rows the session already holds (e.g. from an upsert
+                # earlier in the same batch) with the values RETURNING sent back.
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            for row in (await db.scalars(stmt)).all():
+                updated[row.id] = row
+    return updated
+
+
+async def delete_rows(db: AsyncSession, model: Any, user_id: str, ids: list[Any]) -> set[Any]:
+    """Delete the user's rows among ``ids``; returns the ids actually deleted."""
+    deleted: set[Any] = set()
+    for chunk in chunked(list(dict.fromkeys(ids))):
+        stmt = (
+            delete(model)
+            .where(model.user_id == user_id, model.id.in_(chunk))
+            .returning(model.id)
+        )
+        deleted.update((await db.scalars(stmt)).all())
+    return deleted
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, String, Text, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -10,9 +10,16 @@ from app.db.session import Base
 
 class SavedSearch(Base):
     __tablename__ = "saved_searches"
+    # Keyset pagination (app.api.pagination); also serves plain user_id lookups.
+    __table_args__ = (
+        Index("ix_saved_searches_user_updated", "user_id", text("updated_at DESC"), text("id DESC")),
+    )
+    # INSERT/UPDATE ... RETURNING the server-side timestamps, so a write needs no
+    # follow-up SELECT.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[str] = mapped_column(String(128), index=True, nullable=False)
+    user_id: Mapped[str] = mapped_column(String(128), nullable=False)
     name: Mapped[str | None] = mapped_column(String(120), nullable=True)
     query: Mapped[str] = mapped_column(String(80), nullable=False)
     category: Mapped[str | None] = mapped_column(String(32), nullable=True)
@@ -29,11 +36,22 @@ class SavedSearch(Base):
 
 class TrackedListing(Base):
     __tablename__ = "tracked_listings"
+    # Keyset pagination (app.api.pagination); also serves plain user_id lookups.
+    __table_args__ = (
+        Index("ix_tracked_listings_user_updated", "user_id", text("updated_at DESC"), text("id DESC")),
+        # Batch upserts key on it (migration 005 removed older duplicates).
+        Index("uq_tracked_listings_user_url", "user_id", "item_web_url", unique=True),
+    )
+    # INSERT/UPDATE ... RETURNING the server-side timestamps, so a write needs no
+    # follow-up SELECT.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[str] = mapped_column(String(128), index=True, nullable=False)
+    user_id: Mapped[str] = mapped_column(String(128), nullable=False)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     item_web_url: Mapped[str] = mapped_column(String(1000), nullable=False)
+    # Browse item id (v1|<legacy id>|0) parsed from item_web_url; drives price refresh.
+    ebay_item_id: Mapped[str | None] = mapped_column(String(64), index=True, nullable=True)
     image_url: Mapped[str | None] = mapped_column(String(1000), nullable=True)
     condition: Mapped[str | None] = mapped_column(String(64), nullable=True)
     seller_username: Mapped[str | None] = mapped_column(String(128), nullable=True)
@@ -47,3 +65,32 @@ class TrackedListing(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+
+class PriceHistory(Base):
+    """Per-run price aggregates for a saved search or tracked listing.
+
+    Raw rows (``bucket_seconds == 0``) are one refresh run each; older runs are
+    downsampled into daily buckets by ``app.jobs.compact_price_history``. The
+    primary key index also INCLUDEs every stat column (see migration 003), so
+    range reads are index-only scans.
+    """
+
+    __tablename__ = "price_history"
+
+    # "search" (key: search cache key) or "listing" (key: eBay item id).
+    subject_kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    subject_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    bucket_seconds: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+    # Runs merged into this row (1 for a raw row).
+    runs: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    q1_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    median_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    q3_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    max_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    suggested_min_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    suggested_max_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    suggested_coverage: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -1,7 +1,22 @@
-from collections.abc import Generator
+"""Database engines and sessions.
+
+API routes use the async engine (psycopg 3 async), so a Neon round trip doesn't
+hold a threadpool worker. Jobs, migrations and scripts keep the sync engine.
+Both share the pool settings below, which are sized for serverless instances:
+a small pool, recycled before Neon drops idle connections instead of a
+``SELECT 1`` pre-ping on every checkout. ``DATABASE_NULL_POOL`` hands pooling to
+a PgBouncer endpoint (Neon's ``-pooler`` host). Prepared statements stay off
+unless ``DATABASE_PREPARE_THRESHOLD`` is set, since transaction-mode PgBouncer
+can't route them reliably.
+"""
+
+from collections.abc import AsyncGenerator
+from typing import Any
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.config import settings
 
@@ -10,7 +25,7 @@ class Base(DeclarativeBase):
     pass
 
 
-def _make_engine():
+def database_url() -> str | None:
     url = settings.database_url
     if not url:
         return None
@@ -19,23 +34,89 @@ def _make_engine():
         url = url.replace("postgres://", "postgresql+psycopg://", 1)
     elif url.startswith("postgresql://") and "+psycopg" not in url:
         url = url.replace("postgresql://", "postgresql+psycopg://", 1)
-    return create_engine(url, pool_pre_ping=True)
+    return url
+
+
+def _engine_options() -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        # None disables server-side prepared statements (psycopg's default is 5).
+        "connect_args": {"prepare_threshold": settings.database_prepare_threshold},
+    }
+    if settings.database_null_pool:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout_seconds,
+            pool_recycle=settings.database_pool_recycle_seconds,
+        )
+    return options
+
+
+def _make_engine():
+    url = database_url()
+    if not url:
+        return None
+    return create_engine(url, **_engine_options())
+
+
+def _make_async_engine():
+    url = database_url()
+    if not url:
+        return None
+    # The same postgresql+psycopg URL selects psycopg's async connection here.
+    return create_async_engine(url, **_engine_options())
 
 
 engine = _make_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False) if engine else None
 
+async_engine = _make_async_engine()
+# expire_on_commit=False: rows stay readable after commit without another SELECT.
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine
+    else None
+)
+# Reads run in autocommit: no BEGIN / ROLLBACK round trips around the SELECT.
+AsyncReadSessionLocal = (
+    async_sessionmaker(
+        bind=async_engine.execution_options(isolation_level="AUTOCOMMIT"),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    if async_engine
+    else None
+)
 
-def get_db() -> Generator[Session, None, None]:
-    if SessionLocal is None:
+
+def _require_async_engine() -> None:
+    if async_engine is None:
         from fastapi import HTTPException
 
         raise HTTPException(
             status_code=503,
             detail="Database not configured. Set DATABASE_URL to your Neon connection string.",
         )
-    db = SessionLocal()
-    try:
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    _require_async_engine()
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for handlers that only read."""
+    _require_async_engine()
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
@@ -0,0 +1,115 @@
+"""Minimal stand-in for the eBay OAuth and Browse search endpoints.
+
+For running searches and jobs locally without credentials or quota:
+
+    uvicorn app.dev.fake_ebay:app --port 8001
+    EBAY_API_BASE_URL=http://localhost:8001 CLIENT_ID=x CLIENT_SECRET=x ...
+
+Listings are generated deterministically from the query and offset, so repeated
+runs return the same prices (item lookups drift slightly so refreshes see
+changes). ``FAKE_EBAY_LATENCY_SECONDS`` adds a delay per call.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+
+from fastapi import FastAPI, Query
+
+app = FastAPI(title="Fake eBay API")
+
+LATENCY_SECONDS = float(os.environ.get("FAKE_EBAY_LATENCY_SECONDS", "0.2"))
+TOTAL_RESULTS = 400
+
+
+@app.post("/identity/v1/oauth2/token")
+def token() -> dict[str, str | int]:
+    return {
+        "access_token": "fake-token",
+        "expires_in": 7200,
+        "token_type": "Application Access Token",
+    }
+
+
+@app.get("/buy/browse/v1/item/")
+async def get_items(item_ids: str = Query(...)) -> dict:
+    await asyncio.sleep(LATENCY_SECONDS)
+    items = []
+    for item_id in item_ids.split(","):
+        seed = int(hashlib.sha256(item_id.encode("utf-8")).hexdigest()[:8], 16)
+        # Prices drift a little between calls so refreshes see changes.
+        price = round(20 + seed % 300 + random.uniform(-2, 2), 2)
+        items.append(
+            {
+                "itemId": item_id,
+                "title": f"Fake item {item_id}",
+                "price": {"value": f"{price:.2f}", "currency": "USD"},
+                "shippingOptions": [{"shippingCost": {"value": "4.99"}}],
+            }
+        )
+    return {"items": items}
+
+
+@app.get("/buy/browse/v1/item_summary/search")
+async def search(
+    q: str = Query(...),
+    limit: int = Query(default=50),
+    offset: int = Query(default=0),
+) -> dict:
+    await asyncio.sleep(LATENCY_SECONDS)
+    return search_page(q, limit, offset)
+
+
+def search_page(q: str, limit: int = 50, offset: int = 0) -> dict:
+    """The search response body; also used directly by the benchmark scripts."""
+    seed = int(hashlib.sha256(q.lower().encode("utf-8")).hexdigest()[:8], 16)
+    rng = random.Random(seed + offset)
+    base = 20 + seed % 200
+    items = []
+    for index in range(offset, min(offset + limit, TOTAL_RESULTS)):
+        price = round(max(1.0, rng.lognormvariate(0, 0.35) * base), 2)
+        legacy_id = f"{seed}{index:04d}"
+        image_url = f"https://i.ebayimg.com/images/g/fake{index}/s-l225.jpg"
+        item = {
+            "itemId": f"v1|{legacy_id}|0",
+            "title": f"{q} listing {index}",
+            "price": {"value": f"{price:.2f}", "currency": "USD"},
+            "condition": rng.choice(["New", "Used", "Open box"]),
+            "itemWebUrl": f"https://www.ebay.com/itm/{legacy_id}",
+            "itemCreationDate": "2026-01-01T00:00:00.000Z",
+            "seller": {
+                "username": f"seller{rng.randint(1, 40)}",
+                "feedbackPercentage": "99.1",
+                "feedbackScore": 1200,
+            },
+            "categories": [
+                {"categoryId": "183454", "categoryName": "Fake Category"},
+                {"categoryId": "2536", "categoryName": "Fake Parent Category"},
+            ],
+            "image": {"imageUrl": image_url},
+            # Fields the app ignores, so the page is the size of a real one.
+            "itemHref": f"https://api.ebay.com/buy/browse/v1/item/v1%7C{legacy_id}%7C0",
+            "legacyItemId": legacy_id,
+            "leafCategoryIds": ["183454"],
+            "thumbnailImages": [{"imageUrl": image_url.replace("s-l225", "s-l1600")}],
+            "additionalImages": [{"imageUrl": image_url}] * 3,
+            "buyingOptions": ["FIXED_PRICE", "BEST_OFFER"],
+            "itemLocation": {"postalCode": "606**", "country": "US"},
+            "adultOnly": False,
+            "availableCoupons": False,
+            "topRatedBuyingExperience": False,
+            "priorityListing": False,
+            "listingMarketplaceId": "EBAY_US",
+        }
+        if rng.random() < 0.8:
+            shipping = 0.0 if rng.random() < 0.5 else round(rng.uniform(3, 15), 2)
+            item["shippingOptions"] = [
+                {
+                    "shippingCostType": "FIXED",
+                    "shippingCost": {"value": f"{shipping:.2f}", "currency": "USD"},
+                    "minEstimatedDeliveryDate": "2026-01-05T08:00:00.000Z",
+                }
+            ]
+        items.append(item)
+    return {"total": TOTAL_RESULTS, "limit": limit, "offset": offset, "itemSummaries": items}
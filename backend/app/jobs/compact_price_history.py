@@ -0,0 +1,30 @@
+"""Downsample and expire price history (see ``app.services.price_history``).
+
+Runs from cron via ``GET /api/jobs/compact-price-history`` or locally:
+
+    python -m app.jobs.compact_price_history
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from app.config import settings
+from app.db import session as db_session
+from app.services.price_history import CompactionReport, compact
+
+logger = logging.getLogger(__name__)
+
+
+async def compact_price_history() -> CompactionReport:
+    if db_session.SessionLocal is None:
+        settings.require_database_url()
+    report = await asyncio.to_thread(compact)
+    logger.info("Price history compaction: %s", report.as_dict())
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    print(asyncio.run(compact_price_history()).as_dict())
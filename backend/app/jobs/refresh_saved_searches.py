@@ -0,0 +1,228 @@
+"""Warm the shared search cache with users' saved searches.
+
+Saved searches are collapsed across users by search cache key (query, price
+range, category, condition), so each distinct search runs at most once per pass.
+Scheduling is incremental: a search saved by N users is due every
+``saved_search_refresh_interval_seconds / N`` since its last run (never more
+often than the cache's soft TTL), and due searches run most-overdue first until
+the per-run cap, the time budget or the background share of the eBay quota runs
+out. Searches a user already refreshed recently (fresh cache entry) are skipped.
+Each refreshed search also records a price-history point.
+
+Runs from cron via ``GET /api/jobs/refresh-saved-searches`` or locally:
+
+    python -m app.jobs.refresh_saved_searches
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import func, select
+
+from app.clients.quota import QuotaExhaustedError
+from app.config import settings
+from app.db import session as db_session
+from app.db.models import SavedSearch
+from app.redis_client import cache_get_entries, get_redis, search_cache_key
+from app.services.price_history import price_history_writer
+from app.services.search_cache import fill_search, search_flight
+from app.services.search_payload import SCHEMA_TAG
+
+logger = logging.getLogger(__name__)
+
+# Hash of search cache key -> unix time of its last refresh.
+LAST_RUN_KEY = "listinglab:jobs:saved-search-refresh:last-run"
+
+# Without Redis, last-run times only survive within this process.
+_local_last_run: dict[str, float] = {}
+
+
+@dataclass
+class SavedSearchGroup:
+    cache_key: str
+    search_args: dict[str, Any]
+    # Distinct users who saved this search.
+    popularity: int
+
+
+@dataclass
+class RefreshReport:
+    groups: int = 0
+    due: int = 0
+    refreshed: int = 0
+    already_fresh: int = 0
+    # Another instance held the fill lock for the key.
+    skipped: int = 0
+    failed: int = 0
+    # "quota" or "time" when the pass ended before every due search ran.
+    stopped: str | None = None
+
+    def as_dict(self) -> dict[str, int | str | None]:
+        return {
+            "groups": self.groups,
+            "due": self.due,
+            "refreshed": self.refreshed,
+            "alreadyFresh": self.already_fresh,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "stopped": self.stopped,
+        }
+
+
+def load_groups() -> list[SavedSearchGroup]:
+    """Distinct saved searches with how many users saved each."""
+    if db_session.SessionLocal is None:
+        settings.require_database_url()
+    query = func.lower(func.trim(SavedSearch.query))
+    min_price = func.coalesce(SavedSearch.min_price, "")
+    max_price = func.coalesce(SavedSearch.max_price, "")
+    stmt = select(
+        query,
+        min_price,
+        max_price,
+        SavedSearch.category,
+        SavedSearch.condition,
+        func.count(func.distinct(SavedSearch.user_id)),
+    ).group_by(query, min_price, max_price, SavedSearch.category, SavedSearch.condition)
+
+    with db_session.SessionLocal() as db:
+        rows = db.execute(stmt).all()
+    groups: dict[str, SavedSearchGroup] = {}
+    for query_text, min_value, max_value, category, condition, users in rows:
+        if not query_text:
+            continue
+        cache_key = search_cache_key(query_text, min_value, max_value, category, condition)
+        existing = groups.get(cache_key)
+        if existing is not None:
+            # e.g. category NULL vs "" map to the same cache key.
+            existing.popularity += users
+            continue
+        groups[cache_key] = SavedSearchGroup(
+            cache_key=cache_key,
+            search_args={
+                "query": query_text,
+                "min_price": min_value,
+                "max_price": max_value,
+                "category": category or None,
+                "condition": condition or None,
+            },
+            popularity=users,
+        )
+    return list(groups.values())
+
+
+def _interval(group: SavedSearchGroup) -> float:
+    return max(
+        float(settings.search_cache_soft_ttl_seconds),
+        settings.saved_search_refresh_interval_seconds / max(1, group.popularity),
+    )
+
+
+async def _read_last_runs(keys: list[str]) -> dict[str, float]:
+    client = await get_redis()
+    if client is None or not keys:
+        return {key: _local_last_run.get(key, 0.0) for key in keys}
+    try:
+        values = await client.hmget(LAST_RUN_KEY, *keys)
+        known = set(keys)
+        # Forget searches nobody has saved any more.
+        stale = [field for field in await client.hkeys(LAST_RUN_KEY) if field not in known]
+        if stale:
+            await client.hdel(LAST_RUN_KEY, *stale)
+    except Exception:
+        logger.exception("Redis read of saved-search last runs failed")
+        return {key: _local_last_run.get(key, 0.0) for key in keys}
+    return {key: float(value) if value else 0.0 for key, value in zip(keys, values)}
+
+
+async def _record_runs(runs: dict[str, float]) -> None:
+    if not runs:
+        return
+    _local_last_run.update(runs)
+    client = await get_redis()
+    if client is None:
+        return
+    try:
+        await client.hset(LAST_RUN_KEY, values=runs)
+    except Exception:
+        logger.exception("Redis write of saved-search last runs failed")
+
+
+async def refresh_saved_searches() -> RefreshReport:
+    """One incremental pass over saved searches; see the module docstring."""
+    groups = await asyncio.to_thread(load_groups)
+    report = RefreshReport(groups=len(groups))
+    now = time.time()
+    last_runs = await _read_last_runs([group.cache_key for group in groups])
+
+    def overdue(group: SavedSearchGroup) -> float:
+        return (now - last_runs[group.cache_key]) / _interval(group)
+
+    due = sorted((g for g in groups if overdue(g) >= 1.0), key=overdue, reverse=True)
+    due = due[: settings.saved_search_refresh_max_per_run]
+    report.due = len(due)
+
+    cached = await cache_get_entries([group.cache_key for group in due], SCHEMA_TAG)
+    fresh = {key for key, entry in cached.items() if entry is not None and not entry.stale}
+    report.already_fresh = len(fresh)
+    await _record_runs({key: now for key in fresh})
+
+    started = time.monotonic()
+    for group in due:
+        if group.cache_key in fresh:
+            continue
+        if time.monotonic() - started >= settings.saved_search_refresh_time_budget_seconds:
+            report.stopped = "time"
+            break
+        try:
+            # Background priority: shed once the quota's background share is used.
+            payload = await search_flight.do(
+                group.cache_key,
+                lambda group=group: fill_search(
+                    group.cache_key, group.search_args, revalidate=True, record_history=True
+                ),
+            )
+        except QuotaExhaustedError:
+            report.stopped = "quota"
+            break
+        except Exception:
+            logger.exception("Saved-search refresh failed for query=%r", group.search_args["query"])
+            report.failed += 1
+            continue
+        if payload is None:
+            report.skipped += 1
+            continue
+        if payload.entry is None:
+            # Partial (pages missing or past the deadline): nothing was cached,
+            # so keep the search due for the next pass.
+            logger.warning(
+                "Saved-search refresh was partial for query=%r", group.search_args["query"]
+            )
+            report.failed += 1
+            continue
+        report.refreshed += 1
+        await _record_runs({group.cache_key: time.time()})
+
+    await price_history_writer.flush()
+    logger.info("Saved-search refresh: %s", report.as_dict())
+    return report
+
+
+async def _main() -> None:
+    from app.clients.http import close_http_client
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    try:
+        report = await refresh_saved_searches()
+    finally:
+        await close_http_client()
+    print(report.as_dict())
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
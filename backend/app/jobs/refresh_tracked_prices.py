@@ -0,0 +1,156 @@
+"""Refresh ``last_seen_price`` for every tracked listing in bulk.
+
+Tracked listings are grouped by eBay item id (many users can track the same
+listing), looked up with Browse getItems in batches of 20 with bounded
+concurrency, and every changed price is written back with one
+``UPDATE ... FROM (VALUES ...)``; each price is also recorded as a price-history
+point. Calls draw from the background share of the eBay quota, so a pass stops
+early rather than starve interactive searches.
+
+Runs from cron via ``GET /api/jobs/refresh-tracked-prices`` or locally:
+
+    python -m app.jobs.refresh_tracked_prices
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import Float, String, column, select, update, values
+
+from app.clients.ebay_client import GET_ITEMS_MAX_IDS, EbayClient
+from app.clients.quota import QuotaExhaustedError
+from app.config import settings
+from app.db import session as db_session
+from app.db.models import TrackedListing
+from app.services.price_history import listing_point, price_history_writer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PriceRefreshReport:
+    items: int = 0
+    batches: int = 0
+    priced: int = 0
+    # Rows whose last_seen_price actually changed.
+    updated: int = 0
+    failed_batches: int = 0
+    # "quota" when the background budget ran out before every batch ran.
+    stopped: str | None = None
+
+    def as_dict(self) -> dict[str, int | str | None]:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "priced": self.priced,
+            "updated": self.updated,
+            "failedBatches": self.failed_batches,
+            "stopped": self.stopped,
+        }
+
+
+def _delivered_price(item: dict) -> float | None:
+    """Item price plus listed shipping, matching the search comps' ``price``."""
+    try:
+        price = float((item.get("price") or {}).get("value"))
+    except (TypeError, ValueError):
+        return None
+    options = item.get("shippingOptions") or []
+    shipping = ((options[0] or {}).get("shippingCost") or {}).get("value") if options else None
+    try:
+        price += max(0.0, float(shipping)) if shipping not in (None, "") else 0.0
+    except (TypeError, ValueError):
+        pass
+    return round(price, 2)
+
+
+def load_item_ids() -> list[str]:
+    if db_session.SessionLocal is None:
+        settings.require_database_url()
+    stmt = (
+        select(TrackedListing.ebay_item_id)
+        .where(TrackedListing.ebay_item_id.is_not(None))
+        .distinct()
+    )
+    with db_session.SessionLocal() as db:
+        return list(db.scalars(stmt).all())
+
+
+def write_prices(prices: dict[str, float]) -> int:
+    """One bulk UPDATE for every row whose price changed; returns rows updated."""
+    if not prices:
+        return 0
+    fresh = values(
+        column("item_id", String),
+        column("price", Float),
+        name="fresh",
+    ).data(list(prices.items()))
+    stmt = (
+        update(TrackedListing)
+        .where(TrackedListing.ebay_item_id == fresh.c.item_id)
+        .where(TrackedListing.last_seen_price.is_distinct_from(fresh.c.price))
+        .values(last_seen_price=fresh.c.price)
+    )
+    with db_session.SessionLocal() as db:
+        result = db.execute(stmt)
+        db.commit()
+        return result.rowcount
+
+
+async def refresh_tracked_prices(ebay_client: EbayClient | None = None) -> PriceRefreshReport:
+    client = ebay_client or EbayClient()
+    item_ids = await asyncio.to_thread(load_item_ids)
+    batches = [
+        item_ids[start : start + GET_ITEMS_MAX_IDS]
+        for start in range(0, len(item_ids), GET_ITEMS_MAX_IDS)
+    ]
+    report = PriceRefreshReport(items=len(item_ids), batches=len(batches))
+    prices: dict[str, float] = {}
+    semaphore = asyncio.Semaphore(settings.tracked_price_refresh_concurrency)
+
+    async def run(batch: list[str]) -> None:
+        if report.stopped:
+            return
+        async with semaphore:
+            if report.stopped:
+                return
+            try:
+                items = await client.fetch_items(batch)
+            except QuotaExhaustedError:
+                report.stopped = "quota"
+                return
+            except Exception:
+                logger.exception("getItems failed for a batch of %d ids", len(batch))
+                report.failed_batches += 1
+                return
+        for item in items:
+            price = _delivered_price(item)
+            if item.get("itemId") and price is not None:
+                prices[item["itemId"]] = price
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+    report.priced = len(prices)
+    report.updated = await asyncio.to_thread(write_prices, prices)
+    # Every priced item is a history point, changed or not.
+    await price_history_writer.add(*(listing_point(key, price) for key, price in prices.items()))
+    await price_history_writer.flush()
+    logger.info("Tracked price refresh: %s", report.as_dict())
+    return report
+
+
+async def _main() -> None:
+    from app.clients.http import close_http_client
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    try:
+        report = await refresh_tracked_prices()
+    finally:
+        await close_http_client()
+    print(report.as_dict())
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
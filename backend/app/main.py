@@ -1,25 +1,55 @@
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.conditional import ETAG_HEADER
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.router import api_router
+from app.clients.ebay_client import ebay_token_manager
+from app.clients.http import close_http_client, open_http_client
+from app.compression import CompressionMiddleware
 from app.config import settings
+from app.db.session import dispose_engines
+from app.services.price_history import price_history_writer
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await open_http_client()
+    if settings.client_id and settings.client_secret:
+        ebay_token_manager.start()
+    try:
+        yield
+    finally:
+        await ebay_token_manager.stop()
+        await price_history_writer.flush()
+        await close_http_client()
+        await dispose_engines()
+
+
 app = FastAPI(
     title="ListingLab eBay Listing Analyzer",
     description="Search and analyze eBay listings with statistical price filtering",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.response_compression_min_bytes,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origin_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
 )
 
 app.include_router(api_router)
@@ -1,3 +1,19 @@
-from .search import ItemSummary, SearchRequest, SearchResponse
+from .search import (
+    ItemSummary,
+    PriceSuggestion,
+    SearchBatchRequest,
+    SearchBatchResponse,
+    SearchBatchResult,
+    SearchRequest,
+    SearchResponse,
+)
 
-__all__ = ["SearchRequest", "SearchResponse", "ItemSummary"]
+__all__ = [
+    "SearchRequest",
+    "SearchResponse",
+    "ItemSummary",
+    "PriceSuggestion",
+    "SearchBatchRequest",
+    "SearchBatchResponse",
+    "SearchBatchResult",
+]
@@ -1,7 +1,11 @@
 import uuid
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+# Rows per batch request, across all sections (multi-row statements are chunked).
+PERSISTENCE_BATCH_MAX_SIZE = 5000
 
 
 class SavedSearchCreate(BaseModel):
@@ -68,6 +72,14 @@ class TrackedListingUpdate(BaseModel):
     target_max_price: float | None = Field(default=None, alias="targetMaxPrice")
     notes: str | None = None
 
+    @field_validator("title", "item_web_url")
+    @classmethod
+    def not_null(cls, value: str | None) -> str:
+        # Omit the field to keep the stored value; the column can't be cleared.
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
 
 class TrackedListingOut(BaseModel):
     model_config = ConfigDict(populate_by_name=True, from_attributes=True, ser_json_by_alias=True)
@@ -76,6 +88,7 @@ class TrackedListingOut(BaseModel):
     user_id: str = Field(alias="userId")
     title: str
     item_web_url: str = Field(alias="itemWebUrl")
+    ebay_item_id: str | None = Field(default=None, alias="ebayItemId")
     image_url: str | None = Field(default=None, alias="imageUrl")
     condition: str | None = None
     seller_username: str | None = Field(default=None, alias="sellerUsername")
@@ -85,3 +98,92 @@ class TrackedListingOut(BaseModel):
     notes: str | None = None
     created_at: datetime = Field(alias="createdAt")
     updated_at: datetime = Field(alias="updatedAt")
+
+
+class PricePointOut(BaseModel):
+    """One price-history point: a refresh run, or a daily bucket of older runs."""
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True, ser_json_by_alias=True)
+
+    bucket_start: datetime = Field(alias="bucketStart")
+    # 0 for a single run, 86400 for a daily bucket.
+    bucket_seconds: int = Field(alias="bucketSeconds")
+    runs: int
+    count: int
+    min_price: float | None = Field(default=None, alias="minPrice")
+    q1_price: float | None = Field(default=None, alias="q1Price")
+    median_price: float | None = Field(default=None, alias="medianPrice")
+    q3_price: float | None = Field(default=None, alias="q3Price")
+    max_price: float | None = Field(default=None, alias="maxPrice")
+    suggested_min_price: float | None = Field(default=None, alias="suggestedMinPrice")
+    suggested_max_price: float | None = Field(default=None, alias="suggestedMaxPrice")
+    suggested_coverage: float | None = Field(default=None, alias="suggestedCoverage")
+
+
+class BatchRowStatus(BaseModel):
+    """Outcome of one row of a batch request, in request order within its section."""
+
+    model_config = ConfigDict(populate_by_name=True, ser_json_by_alias=True)
+
+    index: int
+    status: Literal["created", "updated", "deleted", "notFound"]
+    id: uuid.UUID | None = None
+
+
+def _check_batch_size(sections: list[list]) -> None:
+    total = sum(len(section) for section in sections)
+    if total == 0:
+        raise ValueError("Batch is empty")
+    if total > PERSISTENCE_BATCH_MAX_SIZE:
+        raise ValueError(f"At most {PERSISTENCE_BATCH_MAX_SIZE} rows per batch")
+
+
+class SavedSearchBatchUpdate(SavedSearchUpdate):
+    id: uuid.UUID
+
+
+class SavedSearchBatchRequest(BaseModel):
+    create: list[SavedSearchCreate] = Field(default_factory=list)
+    update: list[SavedSearchBatchUpdate] = Field(default_factory=list)
+    delete: list[uuid.UUID] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def bounded(self) -> "SavedSearchBatchRequest":
+        _check_batch_size([self.create, self.update, self.delete])
+        return self
+
+
+class SavedSearchBatchRow(BatchRowStatus):
+    item: SavedSearchOut | None = None
+
+
+class SavedSearchBatchResponse(BaseModel):
+    create: list[SavedSearchBatchRow]
+    update: list[SavedSearchBatchRow]
+    delete: list[BatchRowStatus]
+
+
+class TrackedListingBatchUpdate(TrackedListingUpdate):
+    id: uuid.UUID
+
+
+class TrackedListingBatchRequest(BaseModel):
+    # Created, or merged into the user's existing row for the same itemWebUrl.
+    upsert: list[TrackedListingCreate] = Field(default_factory=list)
+    update: list[TrackedListingBatchUpdate] = Field(default_factory=list)
+    delete: list[uuid.UUID] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def bounded(self) -> "TrackedListingBatchRequest":
+        _check_batch_size([self.upsert, self.update, self.delete])
+        return self
+
+
+class TrackedListingBatchRow(BatchRowStatus):
+    item: TrackedListingOut | None = None
+
+
+class TrackedListingBatchResponse(BaseModel):
+    upsert: list[TrackedListingBatchRow]
+    update: list[TrackedListingBatchRow]
+    delete: list[BatchRowStatus]
@@ -9,7 +9,15 @@ class SearchRequest(BaseModel):
     max_price: str = Field(default="", alias="maxPrice")
     category: str | None = None
     condition: str | None = None
-    filter_strength: int = Field(default=6, alias="filterStrength")
+    filter_strength: int = Field(default=6, alias="filterStrength", ge=1, le=20)
+
+
+# Dashboards compare up to this many queries in one batch call.
+SEARCH_BATCH_MAX_SIZE = 50
+
+
+class SearchBatchRequest(BaseModel):
+    searches: list[SearchRequest] = Field(min_length=1, max_length=SEARCH_BATCH_MAX_SIZE)
 
 
 class ItemSummary(BaseModel):
@@ -31,6 +39,15 @@ class ItemSummary(BaseModel):
     item_creation_date: str | None = Field(default=None, alias="itemCreationDate")
 
 
+class PriceSuggestion(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, ser_json_by_alias=True)
+
+    filter_strength: int = Field(alias="filterStrength")
+    min_price: float = Field(alias="minPrice")
+    max_price: float = Field(alias="maxPrice")
+    coverage: float
+
+
 class SearchResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True, ser_json_by_alias=True)
 
@@ -40,3 +57,21 @@ class SearchResponse(BaseModel):
     suggested_min_price: float | None = Field(default=None, alias="suggestedMinPrice")
     suggested_max_price: float | None = Field(default=None, alias="suggestedMaxPrice")
     suggested_coverage: float | None = Field(default=None, alias="suggestedCoverage")
+    # Suggested band for every filterStrength, so moving the slider needs no new search.
+    suggestions: list[PriceSuggestion] | None = None
+    # Some eBay pages missed the latency budget; items come from the pages that arrived.
+    partial: bool = False
+
+
+class SearchBatchResult(BaseModel):
+    # HTTP status this query would have had on GET /api/search.
+    status: int
+    # HIT, STALE or MISS for successful queries.
+    cache: str | None = None
+    response: SearchResponse | None = None
+    error: str | None = None
+
+
+class SearchBatchResponse(BaseModel):
+    # Same order as the request's ``searches``; duplicates are fetched once.
+    results: list[SearchBatchResult]
@@ -0,0 +1,195 @@
+"""Local-first token-bucket rate limiting, reconciled across instances via Redis.
+
+Each instance keeps per-client buckets in memory and admits most requests with no
+network hop. Consumption is written to a shared per-window Redis counter in
+batches (one pipelined REST call per sync interval); whatever other instances
+consumed in the current window is then charged against the local bucket, so
+limits still hold across instances with at most ``sync_interval_seconds`` of drift.
+
+The clock is injectable so bucket behaviour can be driven deterministically.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+    # Tokens consumed locally and not yet written to Redis.
+    pending: int = 0
+    # Shared window counter after our last sync (includes every instance).
+    seen_total: int = 0
+    seen_window: int = -1
+    synced: bool = False
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        window_seconds: int,
+        sync_interval_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        # Capacity is the burst; refill spreads it evenly over the window.
+        self.capacity = capacity
+        self.window_seconds = max(1, window_seconds)
+        self.refill_per_second = capacity / self.window_seconds
+        self.sync_interval_seconds = sync_interval_seconds
+        self._clock = clock
+        self._buckets: dict[str, _Bucket] = {}
+        self._last_sync = clock()
+        self.allowed = 0
+        self.rejected = 0
+        self.syncs = 0
+
+    def _redis_key(self, key: str, window: int) -> str:
+        return f"listinglab:ratelimit:{self.name}:{key}:{window}"
+
+    def _refill(self, bucket: _Bucket, now: float) -> None:
+        elapsed = max(0.0, now - bucket.updated_at)
+        bucket.tokens = min(self.capacity, bucket.tokens + elapsed * self.refill_per_second)
+        bucket.updated_at = now
+
+    def try_acquire(self, key: str, cost: int = 1) -> bool:
+        """Admit or reject against the local bucket only (no I/O)."""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(tokens=float(self.capacity), updated_at=now)
+        self._refill(bucket, now)
+        if bucket.tokens < cost:
+            self.rejected += 1
+            return False
+        bucket.tokens -= cost
+        bucket.pending += cost
+        self.allowed += 1
+        return True
+
+    async def allow(self, key: str, cost: int = 1) -> bool:
+        """Admit ``cost`` tokens for ``key``. Returns False when the caller should be rejected.
+
+        A key seen for the first time on this instance is synced immediately so
+        usage from other instances is known before we start admitting locally.
+        """
+        first_sighting = key not in self._buckets or not self._buckets[key].synced
+        allowed = self.try_acquire(key, cost)
+        now = self._clock()
+        if first_sighting or now - self._last_sync >= self.sync_interval_seconds:
+            await self.sync(only=key if first_sighting and allowed else None)
+            # Remote usage learned during sync may have exhausted the bucket.
+            bucket = self._buckets[key]
+            if allowed and bucket.tokens < 0:
+                bucket.tokens += cost
+                # Only unpushed tokens come back out; a request the sync already
+                # counted stays in the shared window (errs on the strict side).
+                bucket.pending -= min(cost, bucket.pending)
+                self.allowed -= 1
+                self.rejected += 1
+                allowed = False
+        return allowed
+
+    async def sync(self, only: str | None = None) -> None:
+        """Push pending consumption to Redis and charge other instances' usage locally."""
+        now = self._clock()
+        if only is None:
+            self._last_sync = now
+            self._prune(now)
+            keys = [k for k, b in self._buckets.items() if b.pending or not b.synced]
+        else:
+            keys = [only]
+        if not keys:
+            return
+
+        client = await get_redis()
+        if client is None:
+            for key in keys:
+                bucket = self._buckets[key]
+                bucket.pending = 0
+                bucket.synced = True
+            return
+
+        window = int(now // self.window_seconds)
+        pipeline = client.pipeline()
+        sent: list[tuple[str, int]] = []
+        for key in keys:
+            bucket = self._buckets[key]
+            redis_key = self._redis_key(key, window)
+            # Never negative: INCRBY 0 just reads the window's total.
+            pushed = max(0, bucket.pending)
+            pipeline.incrby(redis_key, pushed)
+            pipeline.expire(redis_key, self.window_seconds * 2, nx=True)
+            sent.append((key, pushed))
+        try:
+            results = await pipeline.exec()
+        except Exception:
+            # Fail open on the shared view; local buckets still enforce per instance.
+            logger.exception("Rate limit sync failed for limiter=%s", self.name)
+            return
+        self.syncs += 1
+
+        for index, (key, pushed) in enumerate(sent):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            total = int(results[index * 2])
+            if bucket.seen_window == window:
+                others = max(0, total - bucket.seen_total - pushed)
+            else:
+                # First contact in this window: charge everything other instances
+                # already counted in it, minus our own contribution.
+                others = max(0, total - pushed)
+            bucket.tokens = max(-float(self.capacity), bucket.tokens - others)
+            bucket.pending = max(0, bucket.pending - pushed)
+            bucket.seen_total = total
+            bucket.seen_window = window
+            bucket.synced = True
+
+    def _prune(self, now: float) -> None:
+        # After a full window idle a bucket has refilled and carries no state.
+        stale = [
+            key
+            for key, bucket in self._buckets.items()
+            if not bucket.pending and now - bucket.updated_at > self.window_seconds
+        ]
+        for key in stale:
+            del self._buckets[key]
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "buckets": len(self._buckets),
+            "capacity": self.capacity,
+            "refillPerSecond": self.refill_per_second,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "syncs": self.syncs,
+        }
+
+
+# One limiter per route, each with its own limit/window settings.
+search_rate_limiter = TokenBucketLimiter(
+    name="search",
+    capacity=settings.search_rate_limit,
+    window_seconds=settings.search_rate_window_seconds,
+    sync_interval_seconds=settings.rate_limit_sync_interval_seconds,
+)
+# Batches are charged one token per search that misses the cache.
+search_batch_rate_limiter = TokenBucketLimiter(
+    name="search-batch",
+    capacity=settings.search_batch_rate_limit,
+    window_seconds=settings.search_rate_window_seconds,
+    sync_interval_seconds=settings.rate_limit_sync_interval_seconds,
+)
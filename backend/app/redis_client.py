@@ -1,16 +1,22 @@
 """Upstash Redis helpers for serverless (HTTP REST, not TCP).
 
 Graceful degrade: if env credentials are missing, all helpers no-op / return None
-so local dev still works with process-local token cache only.
+so local dev still works with process-local token cache only. The search cache
+keeps a small process-local L1 tier either way.
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any
 
+from app.cache_codec import decode_entry, encode_entry
+from app.compression import SUPPORTED_ENCODINGS, OpenObject, object_compressible, open_object
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -50,8 +56,9 @@ def search_cache_key(
     max_price: str,
     category: str | None,
     condition: str | None,
-    filter_strength: int,
 ) -> str:
+    # filterStrength is deliberately absent: responses carry suggestions for every
+    # strength, so moving the slider reuses the same upstream result.
     payload = "|".join(
         [
             query.strip().lower(),
@@ -59,51 +66,262 @@ def search_cache_key(
             max_price or "",
             category or "",
             condition or "",
-            str(filter_strength),
         ]
     )
     digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
     return f"listinglab:search:{digest}"
 
 
-async def cache_get_json(key: str) -> dict[str, Any] | None:
+@dataclass
+class CacheEntry:
+    # Final serialized response, ready to send.
+    body: bytes
+    # Small header stored next to the body (schema tag, soft expiry, caller metadata).
+    header: dict[str, Any]
+    # Body compressed per encoding (app.compression); stored with the entry in Redis.
+    compressed: dict[str, OpenObject] = field(default_factory=dict)
+
+    @property
+    def stale(self) -> bool:
+        """Past its soft expiry: still servable, but due for a background refresh."""
+        return time.time() >= self.header.get("softExpiresAt", 0)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(opened.data) for opened in self.compressed.values())
+
+    def open(self, encoding: str) -> OpenObject:
+        """The body compressed in ``encoding`` for ``close_object``, built on first use."""
+        opened = self.compressed.get(encoding)
+        if opened is None:
+            opened = self.compressed[encoding] = open_object(self.body, encoding)
+        return opened
+
+
+class LocalLRUCache:
+    """Process-local L1 in front of Upstash: LRU by total bytes, with per-entry TTL.
+
+    Holds decoded entries, so a hit skips both the REST round trip and the
+    base64/zlib decode. Sizes cover the body and its compressed forms once each;
+    forms added after insertion are counted at the entry's next lookup.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (entry, expires_at, counted size)
+        self._entries: OrderedDict[str, tuple[CacheEntry, float, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> CacheEntry | None:
+        found = self._entries.get(key)
+        if found is None:
+            self.misses += 1
+            return None
+        entry, expires_at, counted = found
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        size = entry.size
+        if size != counted:
+            # Compressed since it was counted.
+            self._entries[key] = (entry, expires_at, size)
+            self._bytes += size - counted
+            self._evict()
+        return entry
+
+    def set(self, key: str, entry: CacheEntry, ttl_seconds: float | None = None) -> None:
+        # Drop the old copy first, even if the new one is too big to keep.
+        self._remove(key)
+        size = entry.size
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        self._entries[key] = (entry, time.monotonic() + ttl, size)
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        found = self._entries.pop(key, None)
+        if found is not None:
+            self._bytes -= found[2]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+search_l1_cache = LocalLRUCache(
+    max_bytes=settings.search_l1_cache_max_bytes,
+    ttl_seconds=settings.search_l1_cache_ttl_seconds,
+)
+
+
+def _decode_remote(raw: Any, schema: str) -> CacheEntry | None:
+    if not isinstance(raw, str):
+        return None
+    decoded = decode_entry(raw)
+    if decoded is None:
+        return None
+    header, body, sections = decoded
+    # Written by a build with a different response schema: treat as a miss. Legacy
+    # (pre-llc2) entries decode as stale, so they are served once and revalidated.
+    if header.get("schema") != schema and not header.get("legacy"):
+        return None
+    compressed = {
+        encoding: OpenObject(encoding=encoding, data=sections[encoding], crc=crc, size=size)
+        for encoding, (crc, size) in header.pop("cores", {}).items()
+        if encoding in SUPPORTED_ENCODINGS and encoding in sections
+    }
+    return CacheEntry(body=body, header=header, compressed=compressed)
+
+
+async def cache_get_entry(key: str, schema: str) -> CacheEntry | None:
+    """Look up ``key`` in the L1 cache, then in Upstash (populating L1).
+
+    Only entries written with the same ``schema`` tag are returned.
+    """
+    local = search_l1_cache.get(key)
+    # A stale L1 copy may already have been revalidated by a peer; check Redis.
+    if local is not None and not local.stale:
+        return local
+
     client = await get_redis()
     if client is None:
-        return None
+        return local
     try:
-        raw = await client.get(key)
-        if raw is None:
-            return None
-        if isinstance(raw, dict):
-            return raw
-        if isinstance(raw, str):
-            return json.loads(raw)
-        return None
+        entry = _decode_remote(await client.get(key), schema)
     except Exception:
         logger.exception("Redis GET failed for key=%s", key)
-        return None
+        return local
+    if entry is not None:
+        search_l1_cache.set(key, entry)
+    return entry
+
 
+async def cache_get_entries(keys: list[str], schema: str) -> dict[str, CacheEntry | None]:
+    """Batch :func:`cache_get_entry`: L1 first, then one MGET for everything else."""
+    found: dict[str, CacheEntry | None] = {}
+    remote: list[str] = []
+    for key in keys:
+        local = search_l1_cache.get(key)
+        found[key] = local
+        if local is None or local.stale:
+            remote.append(key)
+    if not remote:
+        return found
 
-async def cache_set_json(key: str, value: dict[str, Any], ttl_seconds: int) -> None:
     client = await get_redis()
     if client is None:
-        return
+        return found
+    try:
+        values = await client.mget(*remote)
+    except Exception:
+        logger.exception("Redis MGET failed for %d keys", len(remote))
+        return found
+    for key, raw in zip(remote, values):
+        try:
+            entry = _decode_remote(raw, schema)
+        except Exception:
+            logger.exception("Invalid search cache entry for key=%s", key)
+            entry = None
+        if entry is not None:
+            search_l1_cache.set(key, entry)
+        found[key] = entry
+    return found
+
+
+async def cache_set_entry(
+    key: str,
+    body: bytes,
+    header: dict[str, Any],
+    schema: str,
+    soft_ttl_seconds: int,
+    ttl_seconds: int,
+) -> CacheEntry:
+    """Store a pre-serialized ``body`` with a soft expiry; ``ttl_seconds`` is the hard Redis TTL.
+
+    A JSON object body is compressed in every supported encoding here and stored
+    with it, so hits on any instance get ready-made cores instead of each
+    instance compressing the same body. Returns the in-process entry.
+    """
+    header = {**header, "schema": schema, "softExpiresAt": time.time() + soft_ttl_seconds}
+    entry = CacheEntry(body=body, header=header)
+    if object_compressible(body):
+        for encoding in SUPPORTED_ENCODINGS:
+            entry.open(encoding)
+    search_l1_cache.set(key, entry, ttl_seconds)
+    client = await get_redis()
+    if client is None:
+        return entry
+    cores = entry.compressed
+    raw = encode_entry(
+        {**header, "cores": {encoding: [core.crc, core.size] for encoding, core in cores.items()}},
+        body,
+        compress=settings.search_cache_compress,
+        sections={encoding: core.data for encoding, core in cores.items()},
+    )
     try:
-        await client.set(key, json.dumps(value), ex=ttl_seconds)
+        await client.set(key, raw, ex=ttl_seconds)
     except Exception:
         logger.exception("Redis SET failed for key=%s", key)
+    return entry
 
 
-async def rate_limit_allow(bucket_key: str, limit: int, window_seconds: int) -> bool:
-    """Fixed-window counter. Returns False when the caller should be rejected."""
+async def acquire_lock(key: str, ttl_seconds: int) -> bool:
+    """Short SET NX lock. Returns True when Redis is disabled (nothing to coordinate)."""
     client = await get_redis()
     if client is None:
         return True
     try:
-        count = await client.incr(bucket_key)
-        if count == 1:
-            await client.expire(bucket_key, window_seconds)
-        return int(count) <= limit
+        return bool(await client.set(key, "1", nx=True, ex=ttl_seconds))
     except Exception:
-        logger.exception("Redis rate limit failed for key=%s", bucket_key)
+        logger.exception("Redis lock failed for key=%s", key)
         return True
+
+
+async def release_lock(key: str) -> None:
+    client = await get_redis()
+    if client is None:
+        return
+    try:
+        await client.delete(key)
+    except Exception:
+        logger.exception("Redis unlock failed for key=%s", key)
+
+
+async def wait_for_cache_entry(
+    key: str,
+    schema: str,
+    timeout_seconds: float,
+    poll_seconds: float = 0.25,
+) -> CacheEntry | None:
+    """Poll the shared cache while another instance fills ``key``."""
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_seconds)
+        cached = await cache_get_entry(key, schema)
+        if cached is not None:
+            return cached
+    return None
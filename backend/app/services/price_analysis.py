@@ -1,10 +1,21 @@
+import bisect
 import logging
 import math
 import statistics
+from collections.abc import Iterable
+
+try:
+    from app.services import price_analysis_np
+except ImportError:  # NumPy not installed: pure-Python path only.
+    price_analysis_np = None
 
 logger = logging.getLogger(__name__)
 
 EXCLUDE_KEYWORDS = {"broken"}
+# Below this many prices the list implementation beats array setup overhead.
+ARRAY_MIN_PRICES = 200
+# Every value of the filterStrength slider (the ``alpha`` gap multiplier).
+FILTER_STRENGTHS = range(1, 21)
 
 
 def extract_prices(items: list[dict]) -> list[float]:
@@ -22,6 +33,9 @@ def extract_prices(items: list[dict]) -> list[float]:
 
 
 def apply_iqr(items: list[dict]) -> list[dict]:
+    if price_analysis_np is not None and len(items) >= ARRAY_MIN_PRICES:
+        return price_analysis_np.apply_iqr(items)
+
     prices = extract_prices(items)
     if not prices or len(prices) < 15:
         return items
@@ -109,7 +123,11 @@ def suggest_price_cluster(
 
     Returns ``(lo, hi, coverage)`` where ``coverage`` is in ``[0, 1]`` (fraction of
     listings in the chosen cluster). Returns None when there aren't enough prices.
+    Large cohorts go through the NumPy implementation when it is available.
     """
+    if price_analysis_np is not None and len(prices) >= ARRAY_MIN_PRICES:
+        return price_analysis_np.suggest_price_cluster(prices, alpha)
+
     prices = sorted(p for p in prices if p > 0)
     n = len(prices)
     if n < 5:
@@ -128,3 +146,69 @@ def suggest_price_cluster(
     padded_hi = hi + pad
     coverage = sum(padded_lo <= price <= padded_hi for price in prices) / n
     return padded_lo, padded_hi, coverage
+
+
+def _pad_band(prices: list[float], s: int, e: int) -> tuple[float, float, float]:
+    lo, hi = prices[s], prices[e]
+    pad = max(5.0, 0.15 * (hi - lo))
+    padded_lo = max(0.0, lo - pad)
+    padded_hi = hi + pad
+    inside = bisect.bisect_right(prices, padded_hi) - bisect.bisect_left(prices, padded_lo)
+    return padded_lo, padded_hi, inside / len(prices)
+
+
+def suggest_price_clusters(
+    prices: list[float],
+    alphas: Iterable[float] = FILTER_STRENGTHS,
+) -> dict[float, tuple[float, float, float] | None]:
+    """``suggest_price_cluster`` for every alpha, sharing one sort and one gap scan.
+
+    Sorting, logs, gaps and the median gap don't depend on alpha. Alphas are then
+    visited from loosest to strictest while breaks are added in descending gap
+    order, so each alpha only scores its segments: sizes, widths and medians are
+    O(1) lookups on the sorted prices, and coverage is two binary searches.
+    """
+    alphas = list(alphas)
+    prices = sorted(p for p in prices if p > 0)
+    n = len(prices)
+    if n < 5:
+        return {alpha: None for alpha in alphas}
+
+    log_prices = [math.log(p) for p in prices]
+    gaps = [log_prices[i + 1] - log_prices[i] for i in range(n - 1)]
+    gap_scale = statistics.median(gaps)
+    global_med = statistics.median(prices)
+    by_gap = sorted(range(n - 1), key=gaps.__getitem__, reverse=True)
+
+    def seg_median(s: int, e: int) -> float:
+        mid = (s + e) // 2
+        return prices[mid] if (e - s) % 2 == 0 else (prices[mid] + prices[mid + 1]) / 2
+
+    table: dict[float, tuple[float, float, float] | None] = {}
+    breaks: list[int] = []
+    added = 0
+    for alpha in sorted(set(alphas), reverse=True):
+        threshold = gap_scale * alpha
+        while added < len(by_gap) and gaps[by_gap[added]] > threshold:
+            bisect.insort(breaks, by_gap[added] + 1)
+            added += 1
+
+        best = (0, n - 1)
+        best_score = float("-inf")
+        edges = [0, *breaks, n]
+        for i in range(len(edges) - 1):
+            s, e = edges[i], edges[i + 1] - 1
+            size = e - s + 1
+            if size < 5:
+                continue
+            score = (
+                math.log(size + 1)
+                - 0.6 * math.log(prices[e] - prices[s] + 2)
+                - 0.01 * abs(seg_median(s, e) - global_med)
+            )
+            if score > best_score:
+                best_score = score
+                best = (s, e)
+        table[alpha] = _pad_band(prices, *best)
+
+    return {alpha: table[alpha] for alpha in alphas}
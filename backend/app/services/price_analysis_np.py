@@ -0,0 +1,129 @@
+"""NumPy-backed versions of the ``price_analysis`` algorithms.
+
+Same steps and tie-breaking as the list implementations (inclusive quartiles, log
+gaps against ``median_gap * alpha``, first best-scoring segment), but on sorted
+float64 arrays: segment medians are read straight off the sorted array and
+coverage is two binary searches. Logs come from ``np.log``, which may differ from
+``math.log`` in the last ulp; results only change on exact score/gap ties.
+
+Import is optional: ``price_analysis`` falls back to pure Python without NumPy.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def prices_array(items: list[dict]) -> np.ndarray:
+    """Vector of ``item["price"]`` values; unparsable or missing prices become NaN."""
+
+    def parse(item: dict) -> float:
+        try:
+            return float(item["price"])
+        except (ValueError, TypeError, KeyError):
+            return float("nan")
+
+    return np.fromiter((parse(item) for item in items), dtype=np.float64, count=len(items))
+
+
+def extract_prices(items: list[dict]) -> np.ndarray:
+    prices = prices_array(items)
+    return prices[prices > 0]
+
+
+def _inclusive_quartiles(sorted_prices: np.ndarray) -> tuple[float, float]:
+    """Q1/Q3 exactly as ``statistics.quantiles(n=4, method="inclusive")``."""
+    m = len(sorted_prices) - 1
+    out: list[float] = []
+    for i in (1, 3):
+        j = i * m // 4
+        delta = i * m - j * 4
+        out.append(
+            (float(sorted_prices[j]) * (4 - delta) + float(sorted_prices[j + 1]) * delta) / 4
+        )
+    return out[0], out[1]
+
+
+def apply_iqr(items: list[dict]) -> list[dict]:
+    raw = prices_array(items)
+    prices = raw[raw > 0]
+    if len(prices) < 15:
+        return items
+
+    q1, q3 = _inclusive_quartiles(np.sort(prices))
+    iqr = q3 - q1
+    keep = (raw >= q1 - 1.5 * iqr) & (raw <= q3 + 1.5 * iqr)
+    return [item for item, ok in zip(items, keep.tolist()) if ok]
+
+
+def _segment_bounds(log_prices: np.ndarray, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    n = len(log_prices)
+    gaps = np.diff(log_prices)
+    threshold = float(np.median(gaps)) * alpha
+    breaks = np.flatnonzero(gaps > threshold) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [n])) - 1
+    return starts, ends
+
+
+def find_segments(prices: np.ndarray, alpha: float) -> list[tuple[int, int]]:
+    prices = np.sort(prices[prices > 0])
+    n = len(prices)
+    if n < 5:
+        return [(0, n - 1)]
+    starts, ends = _segment_bounds(np.log(prices), alpha)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _sorted_median(sorted_prices: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    lower = (starts + ends) // 2
+    upper = lower + (ends - starts) % 2
+    return (sorted_prices[lower] + sorted_prices[upper]) / 2
+
+
+def _best_segment(sorted_prices: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple[int, int]:
+    n = len(sorted_prices)
+    sizes = ends - starts + 1
+    eligible = sizes >= 5
+    if not eligible.any():
+        return 0, n - 1
+    global_med = float(np.median(sorted_prices))
+    widths = sorted_prices[ends] - sorted_prices[starts]
+    seg_meds = _sorted_median(sorted_prices, starts, ends)
+    scores = (
+        np.log(sizes + 1)
+        - 0.6 * np.log(widths + 2)
+        - 0.01 * np.abs(seg_meds - global_med)
+    )
+    scores = np.where(eligible, scores, -np.inf)
+    best = int(np.argmax(scores))
+    return int(starts[best]), int(ends[best])
+
+
+def pick_best_segment(prices: np.ndarray, segments: list[tuple[int, int]]) -> tuple[int, int]:
+    """``prices`` must be sorted, as in the list implementation."""
+    if not segments:
+        return 0, len(prices) - 1
+    bounds = np.asarray(segments, dtype=np.intp)
+    return _best_segment(prices, bounds[:, 0], bounds[:, 1])
+
+
+def pad_band(sorted_prices: np.ndarray, s: int, e: int) -> tuple[float, float, float]:
+    lo, hi = float(sorted_prices[s]), float(sorted_prices[e])
+    pad = max(5.0, 0.15 * (hi - lo))
+    padded_lo = max(0.0, lo - pad)
+    padded_hi = hi + pad
+    inside = np.searchsorted(sorted_prices, padded_hi, side="right") - np.searchsorted(
+        sorted_prices, padded_lo, side="left"
+    )
+    return padded_lo, padded_hi, int(inside) / len(sorted_prices)
+
+
+def suggest_price_cluster(prices, alpha: float) -> tuple[float, float, float] | None:
+    prices = np.asarray(prices, dtype=np.float64)
+    prices = np.sort(prices[prices > 0])
+    if len(prices) < 5:
+        return None
+    starts, ends = _segment_bounds(np.log(prices), alpha)
+    s, e = _best_segment(prices, starts, ends)
+    return pad_band(prices, s, e)
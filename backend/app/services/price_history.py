@@ -0,0 +1,251 @@
+"""Compact price-history time series for saved searches and tracked listings.
+
+Each refresh run stores one aggregate row: listing count, min / quartiles /
+median / max of delivered prices, and the suggested band with its coverage (for
+searches). Rows are buffered and inserted in batches. Compaction keeps raw runs
+for ``price_history_raw_days`` and then merges them into one row per subject per
+UTC day: min and max are exact, the other statistics are count-weighted means of
+the runs' values, which is close enough for trend charts. Daily rows are dropped
+after ``price_history_retention_days``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import case, delete, func, insert, literal, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import session as db_session
+from app.db.models import PriceHistory
+
+logger = logging.getLogger(__name__)
+
+SEARCH = "search"
+LISTING = "listing"
+DAY_SECONDS = 86400
+
+# Upper bound on points per range read (a year of daily rows plus raw runs).
+HISTORY_MAX_POINTS = 1000
+
+# Suggested band recorded for searches: the slider's default filterStrength.
+HISTORY_FILTER_STRENGTH = 6
+
+
+def summarize_prices(prices: list[float]) -> dict[str, Any]:
+    """Count, min, inclusive quartiles, median and max of positive prices."""
+    prices = sorted(p for p in prices if p > 0)
+    if not prices:
+        empty = ("min_price", "q1_price", "median_price", "q3_price", "max_price")
+        return {"count": 0, **dict.fromkeys(empty)}
+    if len(prices) == 1:
+        q1 = median = q3 = prices[0]
+    else:
+        q1, median, q3 = statistics.quantiles(prices, n=4, method="inclusive")
+    return {
+        "count": len(prices),
+        "min_price": prices[0],
+        "q1_price": round(q1, 2),
+        "median_price": round(median, 2),
+        "q3_price": round(q3, 2),
+        "max_price": prices[-1],
+    }
+
+
+def _point(
+    subject_kind: str,
+    subject_key: str,
+    prices: list[float],
+    band: tuple[float, float, float] | None = None,
+) -> dict[str, Any]:
+    # Every row carries the same keys so a batch is one executemany.
+    suggested_min, suggested_max, coverage = band if band is not None else (None, None, None)
+    return {
+        "subject_kind": subject_kind,
+        "subject_key": subject_key,
+        "bucket_start": datetime.now(timezone.utc),
+        "bucket_seconds": 0,
+        "runs": 1,
+        **summarize_prices(prices),
+        "suggested_min_price": suggested_min,
+        "suggested_max_price": suggested_max,
+        "suggested_coverage": coverage,
+    }
+
+
+def search_point(
+    cache_key: str,
+    prices: list[float],
+    suggestions: dict[int, tuple[float, float, float]],
+) -> dict[str, Any]:
+    """History row for one search run (``suggestions`` as on ``SearchResult``)."""
+    return _point(SEARCH, cache_key, prices, suggestions.get(HISTORY_FILTER_STRENGTH))
+
+
+def listing_point(item_id: str, price: float) -> dict[str, Any]:
+    return _point(LISTING, item_id, [price])
+
+
+class PriceHistoryWriter:
+    """Buffers history rows and inserts them in batches of ``batch_size``."""
+
+    def __init__(self, batch_size: int) -> None:
+        self.batch_size = batch_size
+        self._rows: list[dict[str, Any]] = []
+        self.written = 0
+        self.dropped = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.price_history_enabled and db_session.SessionLocal is not None
+
+    async def add(self, *rows: dict[str, Any]) -> None:
+        if not rows or not self.enabled():
+            return
+        self._rows.extend(rows)
+        if len(self._rows) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered; returns rows written."""
+        written = 0
+        while self._rows:
+            batch, self._rows = self._rows[: self.batch_size], self._rows[self.batch_size :]
+            try:
+                await asyncio.to_thread(_insert_rows, batch)
+            except Exception:
+                logger.exception("Price history insert of %d rows failed", len(batch))
+                self.dropped += len(batch)
+                continue
+            written += len(batch)
+        self.written += written
+        return written
+
+    def stats(self) -> dict[str, int]:
+        return {"buffered": len(self._rows), "written": self.written, "dropped": self.dropped}
+
+
+def _insert_rows(rows: list[dict[str, Any]]) -> None:
+    with db_session.SessionLocal() as db:
+        db.execute(insert(PriceHistory), rows)
+        db.commit()
+
+
+price_history_writer = PriceHistoryWriter(settings.price_history_batch_size)
+
+
+async def load_range(
+    db: AsyncSession,
+    subject_kind: str,
+    subject_key: str,
+    since: datetime,
+    until: datetime | None,
+    limit: int,
+) -> list[PriceHistory]:
+    """Points for one subject, oldest first; served from the covering primary key."""
+    stmt = select(PriceHistory).where(
+        PriceHistory.subject_kind == subject_kind,
+        PriceHistory.subject_key == subject_key,
+        PriceHistory.bucket_start >= since,
+    )
+    if until is not None:
+        stmt = stmt.where(PriceHistory.bucket_start < until)
+    stmt = stmt.order_by(PriceHistory.bucket_start).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+
+@dataclass
+class CompactionReport:
+    # Raw rows merged into daily buckets (and deleted).
+    compacted: int = 0
+    daily_rows: int = 0
+    # Rows past retention.
+    expired: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "compacted": self.compacted,
+            "dailyRows": self.daily_rows,
+            "expired": self.expired,
+        }
+
+
+def _weighted(column) -> Any:
+    """Count-weighted mean of ``column`` over the rows where it is set."""
+    weight = case((column.is_not(None), PriceHistory.count), else_=0)
+    return func.sum(column * PriceHistory.count) / func.nullif(func.sum(weight), 0)
+
+
+def compact(now: datetime | None = None) -> CompactionReport:
+    """Downsample raw runs older than the raw window into daily rows, then expire.
+
+    The cutoff is aligned to midnight UTC, so a day is always merged in one go
+    and later runs never land in an already-compacted day.
+    """
+    now = now or datetime.now(timezone.utc)
+    raw_days = max(1, settings.price_history_raw_days)
+    cutoff = (now - timedelta(days=raw_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    expire_before = now - timedelta(days=settings.price_history_retention_days)
+    report = CompactionReport()
+
+    raw = PriceHistory.bucket_seconds == 0
+    # Inline constants so the GROUP BY expression matches the select list.
+    utc = literal_column("'UTC'")
+    day = func.date_trunc(literal_column("'day'"), func.timezone(utc, PriceHistory.bucket_start))
+    merged = (
+        select(
+            PriceHistory.subject_kind,
+            PriceHistory.subject_key,
+            func.timezone(utc, day),
+            literal(DAY_SECONDS),
+            func.sum(PriceHistory.runs),
+            # Listings per run, like a raw row.
+            func.round(func.sum(PriceHistory.count) * 1.0 / func.sum(PriceHistory.runs)),
+            func.min(PriceHistory.min_price),
+            _weighted(PriceHistory.q1_price),
+            _weighted(PriceHistory.median_price),
+            _weighted(PriceHistory.q3_price),
+            func.max(PriceHistory.max_price),
+            _weighted(PriceHistory.suggested_min_price),
+            _weighted(PriceHistory.suggested_max_price),
+            _weighted(PriceHistory.suggested_coverage),
+        )
+        .where(raw, PriceHistory.bucket_start < cutoff)
+        .group_by(PriceHistory.subject_kind, PriceHistory.subject_key, day)
+    )
+    columns = [
+        "subject_kind",
+        "subject_key",
+        "bucket_start",
+        "bucket_seconds",
+        "runs",
+        "count",
+        "min_price",
+        "q1_price",
+        "median_price",
+        "q3_price",
+        "max_price",
+        "suggested_min_price",
+        "suggested_max_price",
+        "suggested_coverage",
+    ]
+    # SQLAlchemy only keeps an INSERT's rowcount when asked to.
+    rollup = insert(PriceHistory).from_select(columns, merged).execution_options(
+        preserve_rowcount=True
+    )
+    with db_session.SessionLocal() as db:
+        report.daily_rows = db.execute(rollup).rowcount
+        report.compacted = db.execute(
+            delete(PriceHistory).where(raw, PriceHistory.bucket_start < cutoff)
+        ).rowcount
+        report.expired = db.execute(
+            delete(PriceHistory).where(PriceHistory.bucket_start < expire_before)
+        ).rowcount
+        db.commit()
+    return report
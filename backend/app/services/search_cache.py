@@ -0,0 +1,118 @@
+"""Filling the shared search cache from eBay.
+
+Used by the search routes on a miss or stale hit, and by scheduled jobs that
+warm the cache ahead of users. Every fill goes through one per-process
+single-flight, so a job and a request for the same key share the upstream call.
+"""
+
+import logging
+from typing import Any
+
+from app.clients.quota import Priority
+from app.config import settings
+from app.models.search import PriceSuggestion, SearchResponse
+from app.redis_client import (
+    acquire_lock,
+    cache_set_entry,
+    release_lock,
+    wait_for_cache_entry,
+)
+from app.services.price_history import price_history_writer, search_point
+from app.services.search_payload import SCHEMA_TAG, SearchPayload
+from app.services.search_service import PageCallback, SearchService
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+search_service = SearchService()
+# Identical concurrent cache misses share one eBay round trip per instance.
+search_flight = SingleFlight()
+
+
+async def fill_search(
+    cache_key: str,
+    search_args: dict[str, Any],
+    *,
+    revalidate: bool = False,
+    on_page: PageCallback | None = None,
+    record_history: bool = False,
+) -> SearchPayload | None:
+    """Run the upstream search and populate the shared cache for ``cache_key``.
+
+    With ``revalidate`` the caller already served a stale copy, so when another
+    instance holds the fill lock this returns None instead of waiting on it.
+    With ``record_history`` a complete result is also buffered as a price-history
+    point for the key.
+    """
+    lock_key = f"{cache_key}:lock"
+    locked = False
+    if settings.search_fill_lock_enabled or revalidate:
+        locked = await acquire_lock(lock_key, settings.search_fill_lock_seconds)
+        if not locked:
+            if revalidate:
+                return None
+            # Another instance is filling this key; prefer its result over racing it.
+            cached = await wait_for_cache_entry(
+                cache_key, SCHEMA_TAG, settings.search_fill_wait_seconds
+            )
+            if cached is not None:
+                logger.info("Search cache filled by peer for query=%r", search_args["query"])
+                return SearchPayload.from_entry(cached)
+
+    try:
+        priority = Priority.BACKGROUND if revalidate else Priority.INTERACTIVE
+        result = await search_service.process_search(
+            **search_args, priority=priority, on_page=on_page
+        )
+        response = SearchResponse(
+            itemSummaries=result.items,
+            appliedMinPrice=result.applied_min_price,
+            appliedMaxPrice=result.applied_max_price,
+            suggestedMinPrice=result.suggested_min_price,
+            suggestedMaxPrice=result.suggested_max_price,
+            suggestedCoverage=result.suggested_coverage,
+            partial=result.partial,
+            suggestions=[
+                PriceSuggestion(
+                    filterStrength=strength,
+                    minPrice=lo,
+                    maxPrice=hi,
+                    coverage=coverage,
+                )
+                for strength, (lo, hi, coverage) in sorted(result.suggestions.items())
+            ],
+        )
+        payload = SearchPayload.from_response(response)
+        if result.partial:
+            # Missing pages: serve it, but let the next request try again.
+            return payload
+        entry = await cache_set_entry(
+            cache_key,
+            payload.core,
+            payload.header(),
+            SCHEMA_TAG,
+            # A degraded (single-page) result is served but refreshed on next hit.
+            soft_ttl_seconds=0 if result.degraded else settings.search_cache_soft_ttl_seconds,
+            ttl_seconds=settings.search_cache_ttl_seconds,
+        )
+        if record_history:
+            prices = [float(item.price) for item in result.items]
+            await price_history_writer.add(search_point(cache_key, prices, result.suggestions))
+        # Same bytes, plus the compressed core the cache entry now holds.
+        return SearchPayload.from_entry(entry)
+    finally:
+        if locked:
+            await release_lock(lock_key)
+
+
+async def revalidate_search(cache_key: str, search_args: dict[str, Any]) -> None:
+    """Background refresh of a stale entry; at most one per key per instance."""
+    if search_flight.inflight(cache_key):
+        return
+    try:
+        await search_flight.do(
+            cache_key,
+            lambda: fill_search(cache_key, search_args, revalidate=True),
+        )
+    except Exception:
+        logger.exception("Background revalidation failed for key=%s", cache_key)
@@ -0,0 +1,98 @@
+"""Pre-serialized ``SearchResponse`` bodies for the search cache.
+
+A fill serializes the response once, without the top-level suggested band. A hit
+renders the band for the requested ``filterStrength`` from the small table kept
+in the cache header and appends it to the stored bytes, so serving from cache
+never parses, validates or re-serializes the listings. Compressed responses
+append it to the entry's gzip / brotli core the same way; the cores are built
+when the entry is written and stored with it. A content hash of the
+stored bytes travels in the header too and backs the response's ETag.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from app.compression import close_object, object_compressible
+from app.models.search import SearchResponse
+from app.redis_client import CacheEntry
+
+# Entries are only served by builds whose response schema matches the writer's.
+SCHEMA_TAG = hashlib.sha256(
+    json.dumps(SearchResponse.model_json_schema(by_alias=True), sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
+
+_BAND_FIELDS = {"suggested_min_price", "suggested_max_price", "suggested_coverage"}
+_NO_BAND = b',"suggestedMinPrice":null,"suggestedMaxPrice":null,"suggestedCoverage":null'
+
+
+def _digest(core: bytes) -> str:
+    return hashlib.sha256(core).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class SearchPayload:
+    # SearchResponse JSON without the top-level suggested* fields.
+    core: bytes
+    bands: dict[int, tuple[float, float, float]]
+    # Hash of ``core``. The bands are derived from the suggestions in ``core``,
+    # so (digest, filterStrength) identifies the rendered body.
+    digest: str
+    # The cache entry ``core`` came from; it keeps the compressed forms.
+    entry: CacheEntry | None = None
+
+    @classmethod
+    def from_response(cls, response: SearchResponse) -> "SearchPayload":
+        core = response.model_dump_json(by_alias=True, exclude=_BAND_FIELDS).encode("utf-8")
+        bands = {
+            s.filter_strength: (s.min_price, s.max_price, s.coverage)
+            for s in response.suggestions or []
+        }
+        return cls(core=core, bands=bands, digest=_digest(core))
+
+    @classmethod
+    def from_entry(cls, entry: CacheEntry) -> "SearchPayload":
+        bands = {int(s): (lo, hi, coverage) for s, lo, hi, coverage in entry.header.get("bands", [])}
+        # Entries written before digests were stored get one computed on read.
+        digest = entry.header.get("digest") or _digest(entry.body)
+        return cls(core=entry.body, bands=bands, digest=digest, entry=entry)
+
+    def header(self) -> dict[str, Any]:
+        return {
+            "bands": [[s, *band] for s, band in sorted(self.bands.items())],
+            "digest": self.digest,
+        }
+
+    def etag(self, filter_strength: int) -> str:
+        """Strong ETag of ``render(filter_strength)``, without rendering it."""
+        return f'"{self.digest}-{filter_strength}"'
+
+    def render(self, filter_strength: int) -> bytes:
+        """Response body with the suggested band for ``filter_strength``."""
+        return self.core[:-1] + self._band(filter_strength) + b"}"
+
+    @property
+    def compressible(self) -> bool:
+        """Whether :meth:`render_compressed` applies: cached and large enough."""
+        return self.entry is not None and object_compressible(self.core)
+
+    def render_compressed(self, filter_strength: int, encoding: str) -> bytes:
+        """``render(filter_strength)`` in ``encoding``, from the entry's compressed core."""
+        if self.entry is None:
+            raise ValueError("Payload is not backed by a cache entry")
+        return close_object(self.entry.open(encoding), self._band(filter_strength))
+
+    def _band(self, filter_strength: int) -> bytes:
+        # Appended after the other fields: JSON member order is not significant,
+        # and a suffix keeps the compressed core reusable.
+        band = self.bands.get(filter_strength)
+        if band is None:
+            return _NO_BAND
+        lo, hi, coverage = band
+        return (
+            f',"suggestedMinPrice":{json.dumps(lo)},"suggestedMaxPrice":{json.dumps(hi)},'
+            f'"suggestedCoverage":{json.dumps(coverage)}'
+        ).encode("utf-8")
@@ -1,20 +1,125 @@
+import functools
 import logging
 import statistics
-from dataclasses import dataclass
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 import asyncio
 
 from app.clients.ebay_client import EbayClient
+from app.clients.quota import Priority, QuotaExhaustedError, quota_governor
+from app.config import settings
 from app.models.search import ItemSummary
 from app.services.price_analysis import (
     EXCLUDE_KEYWORDS,
+    FILTER_STRENGTHS,
     apply_iqr,
     extract_prices,
-    suggest_price_cluster,
+    suggest_price_clusters,
 )
 
 logger = logging.getLogger(__name__)
 
 
+class ListingRecord:
+    """One normalized Browse listing on its way to an ``ItemSummary``.
+
+    Slotted and numeric: prices stay floats (rounded to cents like the strings
+    they become) through dedupe, shipping imputation, filtering and sorting, and
+    are formatted once in ``to_summary``.
+    """
+
+    __slots__ = (
+        "item_id",
+        "title",
+        "item_price",
+        "shipping_cost",
+        "shipping_estimated",
+        "price",
+        "condition",
+        "item_web_url",
+        "username",
+        "feedback_percentage",
+        "category_name",
+        "image_url",
+        "item_creation_date",
+    )
+
+    def __init__(
+        self,
+        item_id: str | None,
+        title: str | None,
+        item_price: float,
+        shipping_cost: float | None,
+        condition: str | None,
+        item_web_url: str | None,
+        username: str | None,
+        feedback_percentage: str | None,
+        category_name: str | None,
+        image_url: str | None,
+        item_creation_date: str | None,
+    ) -> None:
+        self.item_id = item_id
+        self.title = title
+        self.item_price = item_price
+        self.shipping_cost = shipping_cost
+        self.shipping_estimated = False
+        # Delivered total; equals item_price until shipping is applied.
+        self.price = item_price
+        self.condition = condition
+        self.item_web_url = item_web_url
+        self.username = username
+        self.feedback_percentage = feedback_percentage
+        self.category_name = category_name
+        self.image_url = image_url
+        self.item_creation_date = item_creation_date
+
+    @classmethod
+    def from_browse_item(cls, item: dict, shipping: float | None) -> "ListingRecord":
+        categories = item.get("categories") or []
+        seller = item.get("seller") or {}
+        try:
+            item_price = round(float((item.get("price") or {}).get("value", "0")), 2)
+        except (TypeError, ValueError):
+            item_price = 0.0
+        return cls(
+            item.get("itemId"),
+            item.get("title"),
+            item_price,
+            shipping,
+            item.get("condition"),
+            item.get("itemWebUrl"),
+            seller.get("username"),
+            seller.get("feedbackPercentage"),
+            categories[0].get("categoryName") if categories else None,
+            (item.get("image") or {}).get("imageUrl"),
+            item.get("itemCreationDate"),
+        )
+
+    def to_summary(self) -> ItemSummary:
+        # One validation per kept listing, from already-normalized values
+        # (pydantic-core validation is cheaper here than model_construct).
+        return ItemSummary.model_validate(
+            {
+                "title": self.title,
+                "price": f"{self.price:.2f}",
+                "itemPrice": f"{self.item_price:.2f}",
+                "shippingCost": self.shipping_cost,
+                "shippingEstimated": self.shipping_estimated,
+                "condition": self.condition,
+                "itemWebUrl": self.item_web_url,
+                "username": self.username,
+                "feedbackPercentage": self.feedback_percentage,
+                "categoryName": self.category_name,
+                "imageUrl": self.image_url,
+                "itemCreationDate": self.item_creation_date,
+            }
+        )
+
+
+# Called with (page number, that page's normalized listings) as each page arrives.
+PageCallback = Callable[[int, list[ListingRecord]], None]
+
+
 @dataclass
 class SearchResult:
     items: list[ItemSummary]
@@ -23,6 +128,12 @@ class SearchResult:
     suggested_min_price: float | None = None
     suggested_max_price: float | None = None
     suggested_coverage: float | None = None
+    # (lo, hi, coverage) per filter strength; the fields above are one row of it.
+    suggestions: dict[int, tuple[float, float, float]] = field(default_factory=dict)
+    # Fewer pages than usual were fetched because the eBay call budget is tight.
+    degraded: bool = False
+    # Some pages missed the request deadline or failed; items are from the rest.
+    partial: bool = False
 
 
 class SearchService:
@@ -36,8 +147,19 @@ class SearchService:
         max_price: str,
         category: str | None,
         condition: str | None,
-        filter_strength: int,
+        filter_strength: int = 6,
+        priority: Priority = Priority.INTERACTIVE,
+        on_page: PageCallback | None = None,
     ) -> SearchResult:
+        """Fetch, clean and analyse listings.
+
+        Suggestions are computed for every filter strength in one pass, so the
+        result (and its cache entry) doesn't depend on ``filter_strength``; it only
+        picks which row fills the top-level ``suggested_*`` fields.
+
+        ``on_page(page, records)`` is called as each page arrives, before dedupe
+        and shipping imputation (``price`` is still the item price).
+        """
         refined = max_price not in ("", None)
         applied_min: float | None = None
         applied_max: float | None = None
@@ -60,23 +182,41 @@ class SearchService:
             min_price, max_price = "", ""
 
         page_size = 200
-        page_tasks = [self._get_listings(query, min_price, max_price, category, condition, page=1, limit=page_size),
-                        self._get_listings(query, min_price, max_price, category, condition, page=2, limit=page_size)]
-        pages: list[list[dict]] = await asyncio.gather(*page_tasks)
+        page_count = 2
+        granted = await quota_governor.acquire(page_count, priority)
+        if not granted:
+            raise QuotaExhaustedError("eBay Browse call budget exhausted")
+        pages, partial = await self._fetch_pages(
+            query,
+            min_price,
+            max_price,
+            category,
+            condition,
+            page_count=granted,
+            limit=page_size,
+            priority=priority,
+            # Near the budget limit a duplicate call is the first thing to give up.
+            hedge=granted == page_count,
+            on_page=on_page,
+        )
 
         final_items = self._dedupe_listings(
             [item for page_items in pages if page_items for item in page_items]
         )
         final_items = self._apply_shipping_totals(final_items)
-        items = self._filter_by_quality(final_items)
+        kept = self._filter_by_quality(final_items)
+        items = [record.to_summary() for record in kept]
 
         suggested_min: float | None = None
         suggested_max: float | None = None
         suggested_coverage: float | None = None
+        suggestions: dict[int, tuple[float, float, float]] = {}
         if not refined:
-            sample = apply_iqr([{"price": item.price} for item in items])
+            sample = apply_iqr([{"price": record.price} for record in kept])
             prices = extract_prices(sample)
-            suggestion = suggest_price_cluster(prices, filter_strength)
+            table = suggest_price_clusters(prices, FILTER_STRENGTHS)
+            suggestions = {strength: band for strength, band in table.items() if band is not None}
+            suggestion = suggestions.get(filter_strength)
             if suggestion is not None:
                 suggested_min, suggested_max, suggested_coverage = suggestion
                 logger.info(
@@ -95,8 +235,112 @@ class SearchService:
             suggested_min_price=suggested_min,
             suggested_max_price=suggested_max,
             suggested_coverage=suggested_coverage,
+            suggestions=suggestions,
+            degraded=granted < page_count,
+            partial=partial,
         )
 
+    async def _fetch_pages(
+        self,
+        query: str,
+        min_price: str,
+        max_price: str,
+        category: str | None,
+        condition: str | None,
+        page_count: int,
+        limit: int,
+        priority: Priority,
+        hedge: bool,
+        on_page: PageCallback | None = None,
+    ) -> tuple[list[list[ListingRecord]], bool]:
+        """Fetch pages concurrently within ``settings.search_deadline_seconds``.
+
+        Pages still running at the deadline are cancelled (retries included) and
+        the pages that arrived are returned with ``partial=True``; a failed page
+        is dropped the same way. Raises only when no page arrived at all.
+        """
+
+        def fetch(page: int) -> Callable[[], Awaitable[list[ListingRecord]]]:
+            return lambda: self._get_listings(
+                query, min_price, max_price, category, condition, page=page, limit=limit, priority=priority
+            )
+
+        tasks = [
+            asyncio.ensure_future(self._hedged(fetch(page), priority) if hedge else fetch(page)())
+            for page in range(1, page_count + 1)
+        ]
+        if on_page is not None:
+
+            def report(page: int, task: asyncio.Future[list[ListingRecord]]) -> None:
+                if not task.cancelled() and task.exception() is None:
+                    on_page(page, task.result())
+
+            for page, task in enumerate(tasks, start=1):
+                task.add_done_callback(functools.partial(report, page))
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=settings.search_deadline_seconds)
+        finally:
+            # Also reached when the caller is cancelled (client went away).
+            for task in tasks:
+                task.cancel()
+
+        pages: list[list[ListingRecord]] = []
+        errors: list[BaseException] = []
+        for task in tasks:
+            if task not in done:
+                continue
+            error = task.exception()
+            if error is None:
+                pages.append(task.result())
+            else:
+                errors.append(error)
+        if not pages:
+            if errors:
+                raise errors[0]
+            raise TimeoutError(f"No eBay page arrived within {settings.search_deadline_seconds}s")
+        if pending or errors:
+            logger.warning(
+                "Partial search for %r: %d/%d page(s) (%d late, %d failed)",
+                query,
+                len(pages),
+                page_count,
+                len(pending),
+                len(errors),
+            )
+        return pages, bool(pending or errors)
+
+    @staticmethod
+    async def _hedged(
+        fetch: Callable[[], Awaitable[list[ListingRecord]]],
+        priority: Priority,
+    ) -> list[ListingRecord]:
+        """Run ``fetch``; if it is still running after ``search_hedge_after_seconds``,
+        race a duplicate (one extra quota call) and keep whichever succeeds first."""
+        hedge_after = settings.search_hedge_after_seconds
+        primary = asyncio.ensure_future(fetch())
+        if hedge_after <= 0:
+            return await primary
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return primary.result()
+            if await quota_governor.acquire(1, priority):
+                logger.info("Hedging slow eBay page after %.2fs", hedge_after)
+                tasks.add(asyncio.ensure_future(fetch()))
+            first_error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    first_error = first_error or error
+            raise first_error  # type: ignore[misc]
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def _get_listings(
         self,
         query: str,
@@ -106,9 +350,10 @@ class SearchService:
         condition: str | None,
         page: int = 1,
         limit: int = 200,
-    ) -> list[dict]:
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> list[ListingRecord]:
         params = self._build_search_params(query, min_price, max_price, category, condition, page, limit)
-        raw_items = await self._ebay_client.fetch_listings(params)
+        raw_items = await self._ebay_client.fetch_listings(params, priority=priority, quota_reserved=True)
         return self._format_listings(raw_items)
 
     def _build_search_params(
@@ -163,62 +408,24 @@ class SearchService:
             return None
 
     @classmethod
-    def _format_listings(cls, items: list[dict]) -> list[dict]:
-        formatted: list[dict] = []
-        for item in items:
-            categories = item.get("categories") or []
-            raw_price = item.get("price", {}).get("value", "0")
-            try:
-                item_price = float(raw_price)
-            except (TypeError, ValueError):
-                item_price = 0.0
-            shipping = cls._extract_shipping(item)
-            formatted.append(
-                {
-                    "itemId": item.get("itemId"),
-                    "title": item.get("title"),
-                    "itemPrice": f"{item_price:.2f}",
-                    "shippingCost": shipping,
-                    "shippingEstimated": False,
-                    # Filled in _apply_shipping_totals
-                    "price": f"{item_price:.2f}",
-                    "condition": item.get("condition"),
-                    "itemWebUrl": item.get("itemWebUrl"),
-                    "username": item.get("seller", {}).get("username"),
-                    "feedbackPercentage": item.get("seller", {}).get("feedbackPercentage"),
-                    "categoryName": categories[0].get("categoryName") if categories else None,
-                    "imageUrl": item.get("image", {}).get("imageUrl"),
-                    "itemCreationDate": item.get("itemCreationDate"),
-                }
-            )
-        return formatted
+    def _format_listings(cls, items: list[dict]) -> list[ListingRecord]:
+        return [ListingRecord.from_browse_item(item, cls._extract_shipping(item)) for item in items]
 
     @staticmethod
-    def _apply_shipping_totals(items: list[dict]) -> list[dict]:
+    def _apply_shipping_totals(items: list[ListingRecord]) -> list[ListingRecord]:
         """Set price = item + shipping; impute missing shipping from cohort median."""
-        known = [
-            float(item["shippingCost"])
-            for item in items
-            if item.get("shippingCost") is not None
-        ]
+        known = [item.shipping_cost for item in items if item.shipping_cost is not None]
         median_ship = float(statistics.median(known)) if known else 0.0
 
         for item in items:
-            try:
-                item_price = float(item.get("itemPrice") or 0)
-            except (TypeError, ValueError):
-                item_price = 0.0
-
-            if item.get("shippingCost") is not None:
-                shipping = float(item["shippingCost"])
-                estimated = False
+            if item.shipping_cost is not None:
+                shipping = item.shipping_cost
+                item.shipping_estimated = False
             else:
                 shipping = median_ship
-                estimated = True
-
-            item["shippingCost"] = round(shipping, 2)
-            item["shippingEstimated"] = estimated
-            item["price"] = f"{(item_price + shipping):.2f}"
+                item.shipping_estimated = True
+            item.shipping_cost = round(shipping, 2)
+            item.price = round(item.item_price + shipping, 2)
 
         if known:
             logger.info(
@@ -230,37 +437,32 @@ class SearchService:
         return items
 
     @staticmethod
-    def _dedupe_listings(items: list[dict]) -> list[dict]:
+    def _dedupe_listings(items: list[ListingRecord]) -> list[ListingRecord]:
         seen: set[str] = set()
-        unique: list[dict] = []
+        unique: list[ListingRecord] = []
         for item in items:
             key = (
-                item.get("itemId")
-                or item.get("itemWebUrl")
-                or f"{item.get('title')}|{item.get('price')}|{item.get('username')}"
+                item.item_id
+                or item.item_web_url
+                or f"{item.title}|{item.price:.2f}|{item.username}"
             )
             if not key or key in seen:
                 continue
             seen.add(key)
-            cleaned = {k: v for k, v in item.items() if k != "itemId"}
-            unique.append(cleaned)
+            unique.append(item)
         return unique
 
     @staticmethod
-    def _filter_by_quality(items: list[dict]) -> list[ItemSummary]:
-        if not items:
-            return []
-
-        def is_valid(item: dict) -> bool:
+    def _filter_by_quality(items: list[ListingRecord]) -> list[ListingRecord]:
+        def is_valid(item: ListingRecord) -> bool:
             try:
-                score = float(item["feedbackPercentage"])
-                title_words = item.get("title", "").split()
-                contains_keyword = any(word.lower() in EXCLUDE_KEYWORDS for word in title_words)
-                return score > 95 and not contains_keyword
-            except (ValueError, TypeError, KeyError):
+                score = float(item.feedback_percentage)  # type: ignore[arg-type]
+            except (ValueError, TypeError):
                 return False
+            title_words = (item.title or "").split()
+            contains_keyword = any(word.lower() in EXCLUDE_KEYWORDS for word in title_words)
+            return score > 95 and not contains_keyword
 
         filtered = [item for item in items if is_valid(item)]
-        filtered.sort(key=lambda i: float(i.get("price", 0) or 0))
-
-        return [ItemSummary.model_validate(item) for item in filtered]
+        filtered.sort(key=lambda i: i.price)
+        return filtered
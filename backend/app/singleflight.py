@@ -0,0 +1,69 @@
+"""In-process request coalescing ("single-flight").
+
+Concurrent callers asking for the same key share one in-flight task instead of
+each doing the same upstream work. Scope is a single process / event loop; use a
+Redis lock on top (see ``redis_client.acquire_lock``) to coalesce across instances.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self._waiters: dict[asyncio.Task[Any], int] = {}
+        self._abandonable: set[asyncio.Task[Any]] = set()
+
+    def inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        cancel_abandoned: bool = False,
+    ) -> Any:
+        """Run ``fn`` once per key; concurrent callers await the same result.
+
+        The shared task is shielded so a caller that gives up (client disconnect)
+        does not cancel the work other callers are still waiting on. With
+        ``cancel_abandoned`` (set by whoever starts the task), the work is
+        cancelled once the last waiting caller has been cancelled.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            if cancel_abandoned:
+                self._abandonable.add(task)
+            task.add_done_callback(lambda done, k=key: self._forget(k, done))
+        else:
+            logger.info("Coalesced concurrent request for key=%s", key)
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task in self._abandonable and self._waiters.get(task) == 1 and not task.done():
+                logger.info("Cancelling abandoned request for key=%s", key)
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self._waiters.pop(task, None)
+        self._abandonable.discard(task)
+        # Mark the exception as retrieved when every waiter has gone away.
+        if not task.cancelled():
+            task.exception()
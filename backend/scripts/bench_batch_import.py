@@ -0,0 +1,83 @@
+"""Benchmark importing tracked listings one POST at a time vs through the batch endpoint.
+
+Run from ``backend/`` against a running API::
+
+    python -m scripts.bench_batch_import --base-url http://localhost:8000 --rows 10000
+
+Times ``--singles`` sequential ``POST /api/tracked-listings`` calls and
+extrapolates to ``--rows``; then imports ``--rows`` listings through
+``POST /api/tracked-listings/batch``, re-imports them (every row an update), and
+creates as many saved searches through their batch endpoint. Each run uses
+fresh account ids.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+
+import httpx
+
+BATCH_SIZE = 5000
+
+
+def listings(count: int, prefix: str) -> list[dict]:
+    return [
+        {
+            "title": f"Imported listing {index}",
+            "itemWebUrl": f"https://www.ebay.com/itm/{prefix}{index:06d}",
+            "lastSeenPrice": 10 + index % 90,
+        }
+        for index in range(count)
+    ]
+
+
+def post_batches(client: httpx.Client, path: str, key: str, rows: list[dict], user: str) -> list:
+    results = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        resp = client.post(
+            path, json={key: rows[start : start + BATCH_SIZE]}, headers={"X-User-Id": user}
+        )
+        resp.raise_for_status()
+        results.extend(resp.json()[key])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--singles", type=int, default=500)
+    args = parser.parse_args()
+    run = uuid.uuid4().hex[:8]
+
+    with httpx.Client(base_url=args.base_url, timeout=300) as client:
+        headers = {"X-User-Id": f"import-single-{run}"}
+        start = time.perf_counter()
+        for row in listings(args.singles, "1"):
+            client.post("/api/tracked-listings", json=row, headers=headers).raise_for_status()
+        single = time.perf_counter() - start
+        estimate = single / args.singles * args.rows
+        print(f"single POSTs: {args.singles} rows in {single:.1f}s, {args.rows} rows ~{estimate:.0f}s")
+
+        user = f"import-batch-{run}"
+        rows = listings(args.rows, "2")
+        start = time.perf_counter()
+        post_batches(client, "/api/tracked-listings/batch", "upsert", rows, user)
+        print(f"batch import: {args.rows} rows in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        results = post_batches(client, "/api/tracked-listings/batch", "upsert", rows, user)
+        if any(result["status"] != "updated" for result in results):
+            raise SystemExit("Re-import created rows instead of updating them")
+        print(f"batch re-import (all updates): {time.perf_counter() - start:.2f}s")
+
+        searches = [{"query": f"import query {index}"} for index in range(args.rows)]
+        start = time.perf_counter()
+        post_batches(client, "/api/saved-searches/batch", "create", searches, f"import-ss-{run}")
+        print(f"saved-search batch create: {args.rows} rows in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark decoding a Browse search page: ``resp.json()`` vs the client's path.
+
+Run from ``backend/``::
+
+    python -m scripts.bench_browse_decode
+
+Serves a 200-item ``app.dev.fake_ebay`` page through an ``httpx.MockTransport``
+and compares the stdlib decode of the whole document with what
+``EbayClient.fetch_listings`` does (orjson, when installed, then projection onto
+the fields the app reads). Reports median time per page and the memory retained by
+the decoded items.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from app.clients import ebay_client
+from app.dev.fake_ebay import search_page
+
+PAGE_SIZE = 200
+
+
+async def measure(decode: Callable[[], Awaitable[list]], repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await decode()
+        timings.append(time.perf_counter() - start)
+    # Median: single runs that hit a GC pass skew the mean.
+    elapsed_ms = statistics.median(timings) * 1e3
+    tracemalloc.start()
+    items = await decode()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return elapsed_ms, retained
+
+
+async def run(query: str, repeat: int) -> None:
+    body = json.dumps(search_page(query, PAGE_SIZE, 0)).encode("utf-8")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    async with httpx.AsyncClient(transport=transport) as client:
+
+        async def stdlib() -> list:
+            resp = await client.get("https://api.ebay.test/search")
+            return resp.json().get("itemSummaries") or []
+
+        async def projected() -> list:
+            resp = await client.get("https://api.ebay.test/search")
+            items = ebay_client._loads(resp.content).get("itemSummaries") or []
+            return [ebay_client._project_item(item) for item in items]
+
+        print(f"{PAGE_SIZE} items, {len(body) / 1024:.0f}KiB page, {repeat} runs")
+        for name, decode in (("resp.json()", stdlib), ("client", projected)):
+            elapsed_ms, retained = await measure(decode, repeat)
+            print(f"{name:>12}  {elapsed_ms:5.2f}ms  retained {retained / 1024:5.0f}KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--query", default="pokemon card")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.query, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
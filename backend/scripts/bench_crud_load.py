@@ -0,0 +1,103 @@
+"""Load-test the saved-search routes with concurrent simulated users.
+
+Run from ``backend/`` against a running API (ideally with its database behind
+``scripts.latency_proxy`` so queries pay a realistic round trip)::
+
+    python -m scripts.bench_crud_load --base-url http://localhost:8000 --users 1 16 64
+
+Each simulated user loops for ``--seconds``: 80% list their saved searches,
+20% rename one. The first run creates three saved searches for each of the
+``--accounts`` accounts. Prints throughput, p50/p99 latency and error count per
+concurrency level.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+SEARCHES_PER_ACCOUNT = 3
+
+
+def headers(account: int) -> dict[str, str]:
+    return {"X-User-Id": f"load-user{account}"}
+
+
+async def seed(client: httpx.AsyncClient, accounts: int) -> dict[int, list[str]]:
+    ids: dict[int, list[str]] = {}
+    for account in range(accounts):
+        resp = await client.get("/api/saved-searches", headers=headers(account))
+        resp.raise_for_status()
+        ids[account] = [row["id"] for row in resp.json()]
+        while len(ids[account]) < SEARCHES_PER_ACCOUNT:
+            resp = await client.post(
+                "/api/saved-searches",
+                json={"query": f"load test {account}-{len(ids[account])}"},
+                headers=headers(account),
+            )
+            resp.raise_for_status()
+            ids[account].append(resp.json()["id"])
+    return ids
+
+
+async def run_level(
+    client: httpx.AsyncClient, ids: dict[int, list[str]], users: int, seconds: float
+) -> None:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def user() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            account = random.choice(list(ids))
+            start = time.perf_counter()
+            if random.random() < 0.2:
+                resp = await client.patch(
+                    f"/api/saved-searches/{random.choice(ids[account])}",
+                    json={"name": f"renamed {random.random():.6f}"},
+                    headers=headers(account),
+                )
+            else:
+                resp = await client.get("/api/saved-searches", headers=headers(account))
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e3
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+    print(
+        f"users={users:>4}  requests={len(latencies):>6}  rps={len(latencies) / elapsed:>6.0f}  "
+        f"p50={p50:>6.1f}ms  p99={p99:>6.1f}ms  errors={errors}"
+    )
+
+
+async def run(base_url: str, levels: list[int], seconds: float, accounts: int) -> None:
+    connections = max(levels) + 10
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        ids = await seed(client, accounts)
+        for users in levels:
+            await run_level(client, ids, users, seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--accounts", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.users, args.seconds, args.accounts))
+
+
+if __name__ == "__main__":
+    main()
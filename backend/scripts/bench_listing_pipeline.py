@@ -0,0 +1,111 @@
+"""Benchmark listing normalization: format, dedupe, shipping totals, quality filter.
+
+Run from ``backend/``::
+
+    python -m scripts.bench_listing_pipeline
+    python -m scripts.bench_listing_pipeline --baseline-ref 1da7006~1
+
+Feeds a full 400-listing cohort from ``app.dev.fake_ebay`` through the
+``SearchService`` steps and reports CPU time and peak traced allocation. With
+``--baseline-ref``, the same steps from ``search_service.py`` at that git ref
+(e.g. the dict-copy pipeline before slotted records) run alongside, and the
+resulting summaries must match.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+from collections.abc import Callable
+from pathlib import Path
+
+from app.dev.fake_ebay import TOTAL_RESULTS, search_page
+from app.services.search_service import SearchService
+
+PAGE_SIZE = 200
+SERVICE_PATH = "backend/app/services/search_service.py"
+
+
+def load_items(query: str) -> list[dict]:
+    items: list[dict] = []
+    for offset in range(0, TOTAL_RESULTS, PAGE_SIZE):
+        items.extend(search_page(query, PAGE_SIZE, offset)["itemSummaries"])
+    return items
+
+
+def load_service_at(ref: str) -> type:
+    repo = Path(__file__).resolve().parents[2]
+    source = subprocess.run(
+        ["git", "show", f"{ref}:{SERVICE_PATH}"],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    module = types.ModuleType("baseline_search_service")
+    # Dataclass creation looks the module up by name.
+    sys.modules[module.__name__] = module
+    exec(compile(source, f"{ref}:{SERVICE_PATH}", "exec"), module.__dict__)
+    return module.SearchService
+
+
+def current_pipeline(items: list[dict]) -> list:
+    service = SearchService
+    records = service._format_listings(items)
+    records = service._apply_shipping_totals(service._dedupe_listings(records))
+    return [record.to_summary() for record in service._filter_by_quality(records)]
+
+
+def baseline_pipeline(service: type) -> Callable[[list[dict]], list]:
+    def run(items: list[dict]) -> list:
+        listings = service._format_listings(items)
+        listings = service._apply_shipping_totals(service._dedupe_listings(listings))
+        return service._filter_by_quality(listings)
+
+    return run
+
+
+def measure(run: Callable[[list[dict]], list], items: list[dict], repeat: int) -> tuple[float, int]:
+    run(items)
+    start = time.process_time()
+    for _ in range(repeat):
+        run(items)
+    cpu_ms = (time.process_time() - start) / repeat * 1e3
+    tracemalloc.start()
+    run(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--query", default="pokemon card")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--baseline-ref", help="git ref whose search_service.py to compare")
+    args = parser.parse_args()
+    # The quality filter logs per search.
+    logging.disable(logging.INFO)
+
+    items = load_items(args.query)
+    pipelines = {"current": current_pipeline}
+    if args.baseline_ref:
+        pipelines[args.baseline_ref] = baseline_pipeline(load_service_at(args.baseline_ref))
+        expected = [summary.model_dump() for summary in current_pipeline(items)]
+        actual = [summary.model_dump() for summary in pipelines[args.baseline_ref](items)]
+        if actual != expected:
+            raise SystemExit(f"{args.baseline_ref} and current summaries differ")
+
+    print(f"{len(items)} listings, {args.repeat} runs")
+    for name, run in pipelines.items():
+        cpu_ms, peak = measure(run, items, args.repeat)
+        print(f"{name:>12}  {cpu_ms:6.2f}ms CPU  peak {peak / 1024:6.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark keyset pagination depth on the tracked-listings list.
+
+Run from ``backend/`` against a running API::
+
+    python -m scripts.bench_pagination --base-url http://localhost:8000 --rows 100000
+
+Seeds ``--rows`` tracked listings for one account through the batch endpoint
+(skipped when the account already has rows), walks every page of
+``MAX_PAGE_SIZE``, then times a 50-row page fetched at the start, middle and end
+of the list. With keyset cursors the last page should cost what the first does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import httpx
+
+from app.api.pagination import MAX_PAGE_SIZE
+
+BATCH_SIZE = 5000
+SAMPLE_PAGE_SIZE = 50
+
+
+def seed(client: httpx.Client, headers: dict[str, str], rows: int) -> None:
+    first = client.get("/api/tracked-listings", params={"limit": 1}, headers=headers)
+    first.raise_for_status()
+    if first.json():
+        return
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = [
+            {
+                "title": f"Benchmark listing {index}",
+                "itemWebUrl": f"https://www.ebay.com/itm/9{index:011d}",
+                "lastSeenPrice": 10 + index % 90,
+            }
+            for index in range(offset, min(offset + BATCH_SIZE, rows))
+        ]
+        resp = client.post("/api/tracked-listings/batch", json={"upsert": batch}, headers=headers)
+        resp.raise_for_status()
+    print(f"seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+
+def fetch(client: httpx.Client, headers: dict[str, str], limit: int, cursor: str | None):
+    params: dict[str, str | int] = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    resp = client.get("/api/tracked-listings", params=params, headers=headers)
+    resp.raise_for_status()
+    return resp
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--user", default="bench-pagination")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    headers = {"X-User-Id": args.user}
+
+    with httpx.Client(base_url=args.base_url, timeout=120) as client:
+        seed(client, headers, args.rows)
+
+        cursors: list[str | None] = [None]
+        start = time.perf_counter()
+        while True:
+            cursor = fetch(client, headers, MAX_PAGE_SIZE, cursors[-1]).headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            cursors.append(cursor)
+        walk = time.perf_counter() - start
+        pages = len(cursors)
+        print(f"walked {pages} pages of {MAX_PAGE_SIZE} in {walk:.1f}s ({walk / pages * 1e3:.1f}ms/page)")
+
+        for label, index in (("first", 0), ("middle", pages // 2), ("last", pages - 1)):
+            timings = []
+            for _ in range(args.repeat):
+                request_start = time.perf_counter()
+                fetch(client, headers, SAMPLE_PAGE_SIZE, cursors[index])
+                timings.append(time.perf_counter() - request_start)
+            depth = index * MAX_PAGE_SIZE
+            print(f"{label:>6} (row {depth:>7}): median {statistics.median(timings) * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark the pure-Python and NumPy price analysis paths.
+
+Run from ``backend/``::
+
+    python -m scripts.bench_price_analysis
+
+Times ``apply_iqr`` + ``extract_prices`` + ``suggest_price_cluster`` (and the
+cluster step alone) on synthetic three-mode price cohorts, forcing each
+implementation in turn, and checks that both return identical results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+
+from app.services import price_analysis
+
+ALPHA = 6
+SIZES = (400, 10_000, 100_000)
+
+
+def make_items(count: int, rng: random.Random) -> list[dict]:
+    # Mostly cheap listings, a band of mid-priced ones and a few outliers.
+    items = []
+    for _ in range(count):
+        mode = rng.random()
+        base = 20 if mode < 0.6 else 150 if mode < 0.9 else 900
+        items.append({"price": f"{rng.lognormvariate(0, 0.3) * base:.2f}"})
+    return items
+
+
+@contextmanager
+def pure_python():
+    saved = price_analysis.price_analysis_np
+    price_analysis.price_analysis_np = None
+    try:
+        yield
+    finally:
+        price_analysis.price_analysis_np = saved
+
+
+def analyze(items: list[dict]):
+    prices = price_analysis.extract_prices(price_analysis.apply_iqr(items))
+    return prices, price_analysis.suggest_price_cluster(prices, ALPHA)
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if price_analysis.price_analysis_np is None:
+        raise SystemExit("NumPy is not installed; only the pure-Python path is available")
+
+    rng = random.Random(args.seed)
+    print(f"{'prices':>8}  {'full py':>9}  {'full np':>9}  {'cluster py':>10}  {'cluster np':>10}")
+    for size in SIZES:
+        items = make_items(size, rng)
+        with pure_python():
+            prices, expected = analyze(items)
+            full_py = best_of(lambda: analyze(items), args.repeat)
+            cluster_py = best_of(
+                lambda: price_analysis.suggest_price_cluster(prices, ALPHA), args.repeat
+            )
+        _, actual = analyze(items)
+        if actual != expected:
+            raise SystemExit(f"Mismatch at {size} prices: {actual} != {expected}")
+        full_np = best_of(lambda: analyze(items), args.repeat)
+        cluster_np = best_of(
+            lambda: price_analysis.suggest_price_cluster(prices, ALPHA), args.repeat
+        )
+        print(
+            f"{size:>8}  {full_py:>7.2f}ms  {full_np:>7.2f}ms  "
+            f"{cluster_py:>8.2f}ms  {cluster_np:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark serving a search cache hit: model round trip vs pre-serialized bytes.
+
+Run from ``backend/``::
+
+    python -m scripts.bench_search_hit
+
+Builds a full search response from an ``app.dev.fake_ebay`` cohort, then times
+one hit three ways: the old path (``json.loads`` the cached value,
+``SearchResponse.model_validate``, set the band for ``filterStrength`` and
+re-serialize), an L1 hit that renders ``SearchPayload`` bytes, and an L2 hit
+that also decodes the ``llc3`` entry first. Reports CPU time, hits per second
+on one core and peak traced allocation, and checks all three bodies match.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from app.cache_codec import decode_entry, encode_entry
+from app.dev.fake_ebay import search_page
+from app.models.search import PriceSuggestion, SearchResponse
+from app.redis_client import CacheEntry
+from app.services.search_payload import SCHEMA_TAG, SearchPayload
+from app.services.search_service import SearchService
+
+FILTER_STRENGTH = 6
+
+
+class FixtureBrowse:
+    """``EbayClient.fetch_listings`` stand-in serving fake_ebay pages in-process."""
+
+    async def fetch_listings(self, params: dict[str, str], **_: object) -> list[dict]:
+        return search_page(params["q"], int(params["limit"]), int(params["offset"]))["itemSummaries"]
+
+
+def build_response(query: str) -> SearchResponse:
+    service = SearchService(ebay_client=FixtureBrowse())
+    result = asyncio.run(service.process_search(query, "", "", None, None))
+    return SearchResponse(
+        itemSummaries=result.items,
+        appliedMinPrice=result.applied_min_price,
+        appliedMaxPrice=result.applied_max_price,
+        suggestions=[
+            PriceSuggestion(filterStrength=strength, minPrice=lo, maxPrice=hi, coverage=coverage)
+            for strength, (lo, hi, coverage) in sorted(result.suggestions.items())
+        ],
+    )
+
+
+def model_hit(stored: str) -> Callable[[], bytes]:
+    """The hit path before pre-serialized bodies."""
+
+    def run() -> bytes:
+        response = SearchResponse.model_validate(json.loads(stored))
+        band = next(
+            s for s in response.suggestions or [] if s.filter_strength == FILTER_STRENGTH
+        )
+        response = response.model_copy(
+            update={
+                "suggested_min_price": band.min_price,
+                "suggested_max_price": band.max_price,
+                "suggested_coverage": band.coverage,
+            }
+        )
+        return response.model_dump_json(by_alias=True).encode("utf-8")
+
+    return run
+
+
+def l1_hit(entry: CacheEntry) -> Callable[[], bytes]:
+    return lambda: SearchPayload.from_entry(entry).render(FILTER_STRENGTH)
+
+
+def l2_hit(raw: str) -> Callable[[], bytes]:
+    def run() -> bytes:
+        header, body, _ = decode_entry(raw)
+        return SearchPayload.from_entry(CacheEntry(body=body, header=header)).render(FILTER_STRENGTH)
+
+    return run
+
+
+def measure(run: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    run()
+    start = time.process_time()
+    for _ in range(repeat):
+        run()
+    cpu_ms = (time.process_time() - start) / repeat * 1e3
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--query", default="pokemon card")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    # The quality filter and price analysis log per search.
+    logging.disable(logging.INFO)
+
+    response = build_response(args.query)
+    payload = SearchPayload.from_response(response)
+    header = {**payload.header(), "schema": SCHEMA_TAG, "softExpiresAt": 0}
+    paths = {
+        "model": model_hit(response.model_dump_json(by_alias=True)),
+        "payload L1": l1_hit(CacheEntry(body=payload.core, header=header)),
+        "payload L2": l2_hit(encode_entry(header, payload.core)),
+    }
+    bodies = [json.loads(run()) for run in paths.values()]
+    if any(body != bodies[0] for body in bodies):
+        raise SystemExit("Hit paths rendered different bodies")
+
+    listings = len(response.item_summaries)
+    print(f"{listings} listings, {len(payload.core) / 1024:.0f}KiB body, {args.repeat} runs")
+    for name, run in paths.items():
+        cpu_ms, peak = measure(run, args.repeat)
+        print(
+            f"{name:>12}  {cpu_ms:7.3f}ms CPU  {1e3 / cpu_ms:8.0f} hits/s  peak {peak / 1024:6.0f}KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""TCP proxy that delays every chunk, to stand in for a remote Postgres locally.
+
+Run from ``backend/``::
+
+    python -m scripts.latency_proxy --upstream /tmp/pgdata/.s.PGSQL.5432 --delay 0.01
+    DATABASE_URL=postgresql://postgres@127.0.0.1:6543/postgres uvicorn app.main:app
+
+``--upstream`` is a Unix socket path or ``host:port``. Each direction waits
+``--delay`` seconds per chunk, so a round trip costs about twice that, which is
+roughly what a serverless function sees talking to Neon.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+
+async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float) -> None:
+    try:
+        while data := await reader.read(65536):
+            await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def open_upstream(upstream: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    if upstream.startswith("/"):
+        return await asyncio.open_unix_connection(upstream)
+    host, _, port = upstream.rpartition(":")
+    return await asyncio.open_connection(host, int(port))
+
+
+async def serve(listen_port: int, upstream: str, delay: float) -> None:
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        upstream_reader, upstream_writer = await open_upstream(upstream)
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer, delay),
+            pipe(upstream_reader, client_writer, delay),
+        )
+
+    server = await asyncio.start_server(handle, "127.0.0.1", listen_port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--upstream", required=True, help="Unix socket path or host:port")
+    parser.add_argument("--port", type=int, default=6543)
+    parser.add_argument("--delay", type=float, default=0.01, help="seconds per direction")
+    args = parser.parse_args()
+    asyncio.run(serve(args.port, args.upstream, args.delay))
+
+
+if __name__ == "__main__":
+    main()
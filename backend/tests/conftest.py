@@ -0,0 +1,136 @@
+"""Shared fixtures: an in-memory stand-in for the Upstash async client."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from app import rate_limit, redis_client
+from app.clients import quota
+from app.clients.quota import QuotaGovernor
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def incrby(self, key: str, increment: int) -> FakePipeline:
+        self._commands.append(("incrby", (key, increment), {}))
+        return self
+
+    def expire(self, key: str, seconds: int, nx: bool = False) -> FakePipeline:
+        self._commands.append(("expire", (key, seconds), {"nx": nx}))
+        return self
+
+    def get(self, key: str) -> FakePipeline:
+        self._commands.append(("get", (key,), {}))
+        return self
+
+    def ttl(self, key: str) -> FakePipeline:
+        self._commands.append(("ttl", (key,), {}))
+        return self
+
+    async def exec(self) -> list[Any]:
+        self._redis.pipelines += 1
+        if self._redis.fail_pipelines:
+            raise ConnectionError("pipeline failed")
+        return [
+            await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._commands
+        ]
+
+
+class FakeRedis:
+    """The subset of ``upstash_redis.asyncio.Redis`` the app uses; TTLs are recorded, not applied."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        self.ttls: dict[str, int] = {}
+        self.pipelines = 0
+        self.fail_pipelines = False
+
+    def pipeline(self) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def get(self, key: str) -> Any:
+        return self.data.get(key)
+
+    async def mget(self, *keys: str) -> list[Any]:
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ex: int | None = None, nx: bool = False) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def ttl(self, key: str) -> int:
+        if key not in self.data:
+            return -2
+        return self.ttls.get(key, -1)
+
+    async def incrby(self, key: str, increment: int) -> int:
+        self.data[key] = int(self.data.get(key, 0)) + increment
+        return self.data[key]
+
+    async def expire(self, key: str, seconds: int, nx: bool = False) -> int:
+        if nx and key in self.ttls:
+            return 0
+        self.ttls[key] = seconds
+        return 1
+
+    async def hset(self, key: str, values: dict[str, Any]) -> int:
+        fields = self.data.setdefault(key, {})
+        added = sum(field not in fields for field in values)
+        fields.update({field: str(value) for field, value in values.items()})
+        return added
+
+    async def hmget(self, key: str, *fields: str) -> list[Any]:
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    async def hkeys(self, key: str) -> list[str]:
+        return list(self.data.get(key, {}))
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        return sum(self.data.get(key, {}).pop(field, None) is not None for field in fields)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Route tests share one client IP; give each test a full search budget."""
+    for limiter in (rate_limit.search_rate_limiter, rate_limit.search_batch_rate_limiter):
+        monkeypatch.setattr(limiter, "_buckets", {})
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_client, "_redis", fake)
+    monkeypatch.setattr(redis_client, "_redis_checked", True)
+    return fake
+
+
+@pytest.fixture
+def no_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(redis_client, "_redis", None)
+    monkeypatch.setattr(redis_client, "_redis_checked", True)
+
+
+@pytest.fixture
+def quota_budget(monkeypatch: pytest.MonkeyPatch) -> QuotaGovernor:
+    """A fresh Browse call budget: degrades past 900 of 1000 calls."""
+    governor = QuotaGovernor(daily_limit=1000, background_share=0.5, degrade_share=0.9)
+    monkeypatch.setattr(quota, "quota_governor", governor)
+    monkeypatch.setattr("app.services.search_service.quota_governor", governor)
+    return governor
@@ -0,0 +1,38 @@
+"""Test doubles shared across test modules."""
+
+from __future__ import annotations
+
+import asyncio
+
+from app.dev.fake_ebay import search_page
+
+HANG = "hang"
+FAIL = "fail"
+
+
+class FakeBrowse:
+    """``EbayClient.fetch_listings`` stand-in serving fake_ebay pages.
+
+    ``behaviour[(page, attempt)]`` makes that call hang until cancelled or fail;
+    unlisted calls answer immediately.
+    """
+
+    def __init__(self, behaviour: dict[tuple[int, int], str] | None = None) -> None:
+        self.behaviour = behaviour or {}
+        self.attempts: dict[int, int] = {}
+        self.cancelled: list[int] = []
+
+    async def fetch_listings(self, params: dict[str, str], **_: object) -> list[dict]:
+        limit, offset = int(params["limit"]), int(params["offset"])
+        page = offset // limit + 1
+        attempt = self.attempts[page] = self.attempts.get(page, 0) + 1
+        action = self.behaviour.get((page, attempt))
+        if action == HANG:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled.append(page)
+                raise
+        if action == FAIL:
+            raise ConnectionError(f"page {page} failed")
+        return search_page(params["q"], limit, offset)["itemSummaries"]
@@ -0,0 +1,118 @@
+"""llc3 round trips, llc2 reads, and legacy llc1 / plain-JSON entries served stale during rollout."""
+
+from __future__ import annotations
+
+import base64
+import json
+import zlib
+
+import httpx
+import pytest
+
+from app import redis_client
+from app.cache_codec import decode_entry, encode_entry
+from app.main import app
+from app.redis_client import LocalLRUCache, search_cache_key
+from app.services import search_cache
+from app.services.search_payload import SCHEMA_TAG, SearchPayload
+from app.services.search_service import SearchService
+from tests.fakes import FakeBrowse
+
+LEGACY_RESPONSE = {
+    "itemSummaries": [
+        {"title": "Camera A", "price": "120.00", "itemWebUrl": "https://www.ebay.com/itm/1"},
+        {"title": "Camera B", "price": "135.50", "itemWebUrl": "https://www.ebay.com/itm/2"},
+    ],
+    "appliedMinPrice": None,
+    "appliedMaxPrice": None,
+    "suggestedMinPrice": 100.0,
+    "suggestedMaxPrice": 150.0,
+    "suggestedCoverage": 1.0,
+    "suggestions": [
+        {"filterStrength": 6, "minPrice": 100.0, "maxPrice": 150.0, "coverage": 1.0},
+    ],
+}
+
+
+def llc1(value: dict) -> str:
+    """What the columnar codec wrote: record lists as one value list per field."""
+
+    def pack(node):
+        if isinstance(node, list) and node and all(isinstance(v, dict) for v in node):
+            fields = list(dict.fromkeys(k for record in node for k in record))
+            return {
+                "__columns__": fields,
+                "__values__": [[pack(record.get(f)) for record in node] for f in fields],
+            }
+        if isinstance(node, dict):
+            return {k: pack(v) for k, v in node.items()}
+        return node
+
+    packed = json.dumps(pack(value)).encode("utf-8")
+    return "llc1:" + base64.b64encode(zlib.compress(packed)).decode("ascii")
+
+
+def test_round_trip_with_sections():
+    header = {"schema": "abc", "bands": [[6, 1.0, 2.0, 0.5]]}
+    body = b'{"itemSummaries":[]}'
+    sections = {"gzip": b"\x1f\x8b compressed", "br": b"\x0b\x01 compressed"}
+
+    assert decode_entry(encode_entry(header, body)) == (header, body, {})
+    assert decode_entry(encode_entry(header, body, compress=False)) == (header, body, {})
+    raw = encode_entry(header, body, sections=sections)
+    assert raw.startswith("llc3:")
+    assert decode_entry(raw) == (header, body, sections)
+
+
+def test_llc2_entries_still_decode():
+    header = {"schema": "abc", "bands": []}
+    body = b'{"itemSummaries":[]}'
+    packed = json.dumps(header).encode("utf-8") + b"\n" + body
+    raw = "llc2:" + base64.b64encode(zlib.compress(packed)).decode("ascii")
+
+    assert decode_entry(raw) == (header, body, {})
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        llc1({"softExpiresAt": 1.0, "value": LEGACY_RESPONSE}),
+        json.dumps({"softExpiresAt": 1.0, "value": LEGACY_RESPONSE}),
+        json.dumps(LEGACY_RESPONSE),
+    ],
+    ids=["llc1", "plain-envelope", "plain-bare"],
+)
+def test_legacy_entries_decode_as_stale_payloads(raw):
+    header, body, sections = decode_entry(raw)
+
+    assert sections == {}
+    assert header["legacy"] and header["softExpiresAt"] == 0
+    entry = redis_client.CacheEntry(body=body, header=header)
+    rendered = json.loads(SearchPayload.from_entry(entry).render(6))
+    assert rendered["itemSummaries"] == LEGACY_RESPONSE["itemSummaries"]
+    assert rendered["suggestedMinPrice"] == 100.0
+    assert entry.stale
+
+
+@pytest.mark.parametrize("raw", ["not json", json.dumps([1, 2]), json.dumps({"a": 1})])
+def test_foreign_values_decode_to_none(raw):
+    assert decode_entry(raw) is None
+
+
+@pytest.mark.anyio
+async def test_legacy_entry_is_served_stale_then_rewritten(fake_redis, quota_budget, monkeypatch):
+    monkeypatch.setattr(redis_client, "search_l1_cache", LocalLRUCache(1_000_000, 60))
+    monkeypatch.setattr(search_cache, "search_service", SearchService(ebay_client=FakeBrowse()))
+    key = search_cache_key("camera", "", "", None, None)
+    fake_redis.data[key] = llc1({"softExpiresAt": 1.0, "value": LEGACY_RESPONSE})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/search", params={"query": "camera"})
+
+    assert resp.status_code == 200
+    assert resp.headers["X-Cache"] == "STALE"
+    assert resp.json()["itemSummaries"] == LEGACY_RESPONSE["itemSummaries"]
+    # The background revalidation replaced it with a current entry.
+    header, _, _ = decode_entry(fake_redis.data[key])
+    assert header["schema"] == SCHEMA_TAG
@@ -0,0 +1,81 @@
+"""ETag matching across content codings, and the middleware's tags."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi import FastAPI, Header, Response
+
+from app.api.conditional import ETAG_HEADER, etag_matches, not_modified
+from app.compression import BROTLI, GZIP, CompressionMiddleware, encoded_etag
+
+pytestmark = pytest.mark.anyio
+
+TAG = '"abc123-6"'
+
+
+def test_encoded_etag_stays_strong_per_encoding():
+    assert encoded_etag(TAG, GZIP) == '"abc123-6-gzip"'
+    assert encoded_etag(TAG, BROTLI) == '"abc123-6-br"'
+    assert encoded_etag(f"W/{TAG}", GZIP) == 'W/"abc123-6-gzip"'
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "etag", "matches"),
+    [
+        (TAG, TAG, True),
+        ('"abc123-6-gzip"', TAG, True),
+        (TAG, '"abc123-6-br"', True),
+        ('"abc123-6-br"', '"abc123-6-gzip"', True),
+        ('W/"abc123-6-gzip"', '"abc123-6-gzip"', True),
+        ('"other", "abc123-6-gzip"', TAG, True),
+        ("*", TAG, True),
+        ('"abc123-7-gzip"', TAG, False),
+        ('"abc123-6-deflate"', TAG, False),
+        (None, TAG, False),
+    ],
+)
+def test_etag_matches_any_encoding_of_the_same_body(if_none_match, etag, matches):
+    assert etag_matches(if_none_match, etag) is matches
+
+
+@pytest.fixture
+def list_app() -> FastAPI:
+    """A polled endpoint behind the middleware, like the paginated lists."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=64)
+
+    @app.get("/rows")
+    async def rows(if_none_match: str | None = Header(default=None)) -> Response:
+        if etag_matches(if_none_match, TAG):
+            return not_modified(TAG, "no-cache")
+        return Response(
+            content=b"[" + b'{"id": 1},' * 50 + b"{}]",
+            media_type="application/json",
+            headers={ETAG_HEADER: TAG},
+        )
+
+    return app
+
+
+async def test_middleware_tags_compressed_body_and_repeats_it_on_304(list_app):
+    transport = httpx.ASGITransport(app=list_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        full = await client.get("/rows", headers={"Accept-Encoding": "gzip"})
+        again = await client.get(
+            "/rows",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": full.headers["ETag"]},
+        )
+        identity = await client.get(
+            "/rows",
+            headers={"Accept-Encoding": "identity", "If-None-Match": full.headers["ETag"]},
+        )
+
+    assert full.headers["Content-Encoding"] == "gzip"
+    assert full.headers["ETag"] == '"abc123-6-gzip"'
+    assert again.status_code == 304
+    assert again.headers["ETag"] == '"abc123-6-gzip"'
+    assert "Accept-Encoding" in again.headers["Vary"]
+    # Without a negotiated encoding the 304 names the identity body.
+    assert identity.status_code == 304
+    assert identity.headers["ETag"] == TAG
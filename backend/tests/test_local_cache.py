@@ -0,0 +1,31 @@
+"""LocalLRUCache byte accounting, eviction and replacement."""
+
+from __future__ import annotations
+
+from app.redis_client import CacheEntry, LocalLRUCache
+
+
+def entry(size: int) -> CacheEntry:
+    return CacheEntry(body=b"x" * size, header={})
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LocalLRUCache(max_bytes=250, ttl_seconds=60)
+    cache.set("a", entry(100))
+    cache.set("b", entry(100))
+    assert cache.get("a") is not None
+    cache.set("c", entry(100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["bytes"] == 200
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversized_replacement_drops_the_old_entry():
+    cache = LocalLRUCache(max_bytes=250, ttl_seconds=60)
+    cache.set("a", entry(100))
+    cache.set("a", entry(300))
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,146 @@
+"""TokenManager: cold-start fetches, ahead-of-expiry refresh and adopting a peer's token."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.clients.oauth import TOKEN_LOCK_KEY, TOKEN_REDIS_KEY, TokenManager
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeEbay:
+    """Token endpoint stand-in: numbered tokens valid for ``ttl`` seconds."""
+
+    def __init__(self, ttl: int = 7200) -> None:
+        self.ttl = ttl
+        self.calls = 0
+        self.fail = False
+        self.release: asyncio.Event | None = None
+
+    async def fetch(self) -> tuple[str, int]:
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise ConnectionError("token endpoint down")
+        return f"token-{self.calls}", self.ttl
+
+
+def make_manager(ebay: FakeEbay, clock: FakeClock) -> TokenManager:
+    return TokenManager(ebay.fetch, refresh_ahead_seconds=300, retry_seconds=15, clock=clock)
+
+
+async def settle(manager: TokenManager) -> None:
+    if manager._background is not None:
+        await manager._background
+
+
+async def test_cold_start_callers_share_one_fetch(no_redis):
+    ebay = FakeEbay()
+    ebay.release = asyncio.Event()
+    manager = make_manager(ebay, FakeClock())
+
+    callers = [asyncio.ensure_future(manager.get()) for _ in range(3)]
+    await asyncio.sleep(0)
+    ebay.release.set()
+
+    assert await asyncio.gather(*callers) == ["token-1"] * 3
+    assert ebay.calls == 1
+    assert manager.stats()["blockingRefreshes"] == 3
+
+
+async def test_valid_token_is_served_without_refreshing(no_redis):
+    ebay = FakeEbay()
+    clock = FakeClock()
+    manager = make_manager(ebay, clock)
+    await manager.get()
+
+    clock.advance(7200 - 301)
+    assert await manager.get() == "token-1"
+    assert ebay.calls == 1
+
+
+async def test_due_token_is_served_while_refreshing_in_background(no_redis):
+    ebay = FakeEbay()
+    clock = FakeClock()
+    manager = make_manager(ebay, clock)
+    await manager.get()
+
+    clock.advance(7200 - 200)  # Inside the refresh-ahead window, still valid.
+    assert await manager.get() == "token-1"
+    await settle(manager)
+
+    assert await manager.get() == "token-2"
+    assert manager.stats()["blockingRefreshes"] == 1
+    assert manager.stats()["lastRefreshLagSeconds"] == 100
+
+
+async def test_failed_background_refresh_backs_off(no_redis):
+    ebay = FakeEbay()
+    clock = FakeClock()
+    manager = make_manager(ebay, clock)
+    await manager.get()
+    clock.advance(7200 - 200)
+    ebay.fail = True
+
+    assert await manager.get() == "token-1"
+    await settle(manager)
+    assert manager.stats()["failures"] == 1
+
+    clock.advance(5)  # Within retry_seconds: no new attempt.
+    assert await manager.get() == "token-1"
+    assert ebay.calls == 2
+
+    clock.advance(15)
+    ebay.fail = False
+    await manager.get()
+    await settle(manager)
+    assert await manager.get() == "token-3"
+
+
+async def test_adopts_a_token_a_peer_already_stored(fake_redis):
+    fake_redis.data[TOKEN_REDIS_KEY] = "peer-token"
+    fake_redis.ttls[TOKEN_REDIS_KEY] = 3600
+    ebay = FakeEbay()
+    manager = make_manager(ebay, FakeClock())
+
+    assert await manager.get() == "peer-token"
+    assert ebay.calls == 0
+    assert manager.stats()["adopted"] == 1
+    assert manager.stats()["expiresInSeconds"] == 3600
+
+
+async def test_lock_holder_fetches_and_shares_the_token(fake_redis):
+    ebay = FakeEbay()
+    manager = make_manager(ebay, FakeClock())
+
+    assert await manager.get() == "token-1"
+    assert fake_redis.data[TOKEN_REDIS_KEY] == "token-1"
+    assert fake_redis.ttls[TOKEN_REDIS_KEY] == 7200
+    assert TOKEN_LOCK_KEY not in fake_redis.data
+
+
+async def test_keeps_the_shared_token_while_a_peer_renews_it(fake_redis):
+    # Shared token is due for renewal and a peer holds the lock.
+    fake_redis.data[TOKEN_REDIS_KEY] = "peer-token"
+    fake_redis.ttls[TOKEN_REDIS_KEY] = 100
+    fake_redis.data[TOKEN_LOCK_KEY] = "1"
+    ebay = FakeEbay()
+    manager = make_manager(ebay, FakeClock())
+
+    assert await manager.get() == "peer-token"
+    assert ebay.calls == 0
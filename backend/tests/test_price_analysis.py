@@ -0,0 +1,73 @@
+"""The NumPy and pure-Python price analysis paths agree, on both sides of the switch."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.services import price_analysis
+from app.services.price_analysis import (
+    ARRAY_MIN_PRICES,
+    FILTER_STRENGTHS,
+    apply_iqr,
+    extract_prices,
+    suggest_price_cluster,
+    suggest_price_clusters,
+)
+
+SIZES = [5, 15, ARRAY_MIN_PRICES - 1, ARRAY_MIN_PRICES, ARRAY_MIN_PRICES + 1, 2000]
+
+
+def make_items(count: int, seed: int) -> list[dict]:
+    # Three price modes plus a few unusable entries.
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        mode = rng.random()
+        base = 20 if mode < 0.6 else 150 if mode < 0.9 else 900
+        items.append({"price": f"{rng.lognormvariate(0, 0.3) * base:.2f}"})
+    items[0] = {"price": None}
+    return items
+
+
+def analyze(items: list[dict]):
+    kept = apply_iqr(items)
+    prices = extract_prices(kept)
+    return kept, {alpha: suggest_price_cluster(prices, alpha) for alpha in (1, 3, 6, 10, 20)}
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("count", SIZES)
+def test_numpy_path_matches_pure_python(count, seed, monkeypatch):
+    pytest.importorskip("numpy")
+    items = make_items(count, seed)
+    expected_kept, expected_bands = analyze(items)
+    with monkeypatch.context() as patch:
+        patch.setattr(price_analysis, "price_analysis_np", None)
+        kept, bands = analyze(items)
+
+    assert kept == expected_kept
+    assert bands.keys() == expected_bands.keys()
+    for alpha, band in bands.items():
+        if band is None:
+            assert expected_bands[alpha] is None
+        else:
+            assert expected_bands[alpha] == pytest.approx(band)
+
+@pytest.mark.parametrize("numpy_enabled", [True, False])
+@pytest.mark.parametrize("count", SIZES)
+def test_one_pass_table_matches_per_strength_clusters(count, numpy_enabled, monkeypatch):
+    if not numpy_enabled:
+        monkeypatch.setattr(price_analysis, "price_analysis_np", None)
+    prices = extract_prices(apply_iqr(make_items(count, seed=4)))
+
+    table = suggest_price_clusters(prices, FILTER_STRENGTHS)
+
+    assert list(table) == list(FILTER_STRENGTHS)
+    for alpha in FILTER_STRENGTHS:
+        expected = suggest_price_cluster(prices, alpha)
+        if expected is None:
+            assert table[alpha] is None
+        else:
+            assert table[alpha] == pytest.approx(expected)
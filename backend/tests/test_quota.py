@@ -0,0 +1,102 @@
+"""QuotaGovernor priorities, degrade/shed thresholds and the shared 429 cooldown."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.clients.quota import COOLDOWN_KEY, Priority, QuotaGovernor
+
+pytestmark = pytest.mark.anyio
+
+START = 1_767_225_600.0  # 2026-01-01T00:00:00Z
+QUOTA_KEY = "listinglab:ebay:quota:20260101"
+
+
+class FakeClock:
+    def __init__(self, now: float = START) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_governor(clock: FakeClock) -> QuotaGovernor:
+    # Background work stops at 50 calls; interactive degrades past 80.
+    return QuotaGovernor(daily_limit=100, background_share=0.5, degrade_share=0.8, clock=clock)
+
+
+async def test_interactive_degrades_to_one_page_then_stops(no_redis):
+    governor = make_governor(FakeClock())
+
+    assert await governor.acquire(78) == 78
+    assert await governor.acquire(2) == 2
+    # Past the 80-call degrade line: one page per search until the limit.
+    for _ in range(20):
+        assert await governor.acquire(5) == 1
+    assert await governor.acquire(5) == 0
+    assert governor.stats()["degraded"] == 20
+    assert governor.stats()["shed"] == 1
+
+
+async def test_background_is_shed_at_its_share(no_redis):
+    governor = make_governor(FakeClock())
+
+    assert await governor.acquire(45, Priority.BACKGROUND) == 45
+    assert await governor.acquire(10, Priority.BACKGROUND) == 0
+    # Interactive searches still have the rest of the budget.
+    assert await governor.acquire(10) == 10
+
+
+async def test_local_budget_resets_each_utc_day(no_redis):
+    clock = FakeClock()
+    governor = make_governor(clock)
+    assert await governor.acquire(80) == 80
+    assert await governor.acquire(10) == 1
+
+    clock.advance(86400)
+    assert await governor.acquire(10) == 10
+
+
+async def test_cooldown_sheds_background_and_degrades_interactive(no_redis):
+    clock = FakeClock()
+    governor = make_governor(clock)
+    await governor.note_throttled(30)
+
+    assert await governor.acquire(5, Priority.BACKGROUND) == 0
+    assert await governor.acquire(5) == 1
+
+    clock.advance(31)
+    assert await governor.acquire(5) == 5
+
+
+async def test_shared_counter_returns_ungranted_calls(fake_redis):
+    governor = make_governor(FakeClock())
+
+    assert await governor.acquire(60) == 60
+    assert await governor.acquire(30) == 1
+    assert fake_redis.data[QUOTA_KEY] == 61
+    assert fake_redis.ttls[QUOTA_KEY] == 2 * 86400
+
+
+async def test_cooldown_is_shared_across_instances(fake_redis):
+    clock = FakeClock()
+    throttled = make_governor(clock)
+    other = make_governor(clock)
+
+    await throttled.note_throttled(10)
+
+    assert fake_redis.data[COOLDOWN_KEY] == "1"
+    assert fake_redis.ttls[COOLDOWN_KEY] == 10
+    assert await other.acquire(5, Priority.BACKGROUND) == 0
+    assert await other.acquire(5) == 1
+
+
+async def test_redis_failure_falls_back_to_the_local_budget(fake_redis):
+    fake_redis.fail_pipelines = True
+    governor = make_governor(FakeClock())
+
+    assert await governor.acquire(90) == 1
+    assert governor.stats()["localUsed"] == 1
@@ -0,0 +1,198 @@
+import pytest
+
+from app.rate_limit import TokenBucketLimiter
+
+pytestmark = pytest.mark.anyio
+
+START = 6000.0  # Start of a 60 s window, so window boundaries are predictable.
+
+
+class FakeClock:
+    def __init__(self, now: float = START) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_limiter(clock: FakeClock, capacity: int = 3, sync_interval: float = 2.0) -> TokenBucketLimiter:
+    return TokenBucketLimiter(
+        name="test",
+        capacity=capacity,
+        window_seconds=60,
+        sync_interval_seconds=sync_interval,
+        clock=clock,
+    )
+
+
+async def admitted(limiter: TokenBucketLimiter, key: str, attempts: int) -> int:
+    return sum([await limiter.allow(key) for _ in range(attempts)])
+
+
+async def test_burst_up_to_capacity_then_rejects(no_redis):
+    limiter = make_limiter(FakeClock())
+
+    assert await admitted(limiter, "1.2.3.4", 5) == 3
+    assert limiter.stats()["allowed"] == 3
+    assert limiter.stats()["rejected"] == 2
+
+
+async def test_buckets_are_per_key(no_redis):
+    limiter = make_limiter(FakeClock())
+
+    assert await admitted(limiter, "a", 3) == 3
+    assert await admitted(limiter, "b", 3) == 3
+    assert not await limiter.allow("a")
+
+
+async def test_cost_is_charged_in_full(no_redis):
+    limiter = make_limiter(FakeClock(), capacity=5)
+
+    assert await limiter.allow("a", cost=4)
+    assert not await limiter.allow("a", cost=2)
+    assert await limiter.allow("a", cost=1)
+
+
+async def test_refills_evenly_over_the_window(no_redis):
+    clock = FakeClock()
+    limiter = make_limiter(clock)  # 3 per 60 s: one token every 20 s.
+    assert await admitted(limiter, "a", 3) == 3
+
+    clock.advance(19)
+    assert not await limiter.allow("a")
+    clock.advance(1)
+    assert await limiter.allow("a")
+    assert not await limiter.allow("a")
+
+    # Refill stops at capacity, however long the key was idle.
+    clock.advance(3600)
+    assert await admitted(limiter, "a", 5) == 3
+
+
+async def test_no_double_burst_at_window_boundary(no_redis):
+    clock = FakeClock(START + 59)
+    limiter = make_limiter(clock)
+    assert await admitted(limiter, "a", 3) == 3
+
+    clock.advance(2)  # Into the next window: only the refill is available.
+    assert await admitted(limiter, "a", 3) == 0
+
+
+async def test_first_sighting_syncs_immediately(fake_redis):
+    limiter = make_limiter(FakeClock(), sync_interval=60)
+
+    assert await limiter.allow("a")
+    assert fake_redis.pipelines == 1
+    assert fake_redis.data == {"listinglab:ratelimit:test:a:100": 1}
+    assert fake_redis.ttls == {"listinglab:ratelimit:test:a:100": 120}
+
+    # Known key, sync interval not reached: admitted locally.
+    assert await limiter.allow("a")
+    assert fake_redis.pipelines == 1
+
+
+async def test_first_sighting_sees_usage_from_other_instances(fake_redis):
+    fake_redis.data["listinglab:ratelimit:test:a:100"] = 3
+    limiter = make_limiter(FakeClock())
+
+    assert not await limiter.allow("a")
+    assert limiter.stats()["allowed"] == 0
+    assert limiter.stats()["rejected"] == 1
+
+
+async def test_periodic_sync_pushes_pending_in_one_pipeline(fake_redis):
+    clock = FakeClock()
+    limiter = make_limiter(clock, capacity=10)
+    await limiter.allow("a")
+    await limiter.allow("b")
+    assert fake_redis.pipelines == 2
+
+    await admitted(limiter, "a", 2)
+    await admitted(limiter, "b", 3)
+    assert fake_redis.pipelines == 2
+
+    clock.advance(2)
+    await limiter.allow("a")
+    assert fake_redis.pipelines == 3
+    assert fake_redis.data["listinglab:ratelimit:test:a:100"] == 4
+    assert fake_redis.data["listinglab:ratelimit:test:b:100"] == 4
+
+
+async def test_charges_back_usage_from_other_instances_on_sync(fake_redis):
+    clock = FakeClock()
+    first = make_limiter(clock, capacity=6)
+    second = make_limiter(clock, capacity=6)
+
+    assert await first.allow("a")
+    assert await second.allow("a")
+    assert await admitted(first, "a", 3) == 3
+
+    # second hasn't synced since first's extra requests, so it admits locally.
+    assert await second.allow("a")
+
+    clock.advance(2)
+    assert await first.allow("a")  # first pushes: 5 of 6 in Redis.
+    # second's sync charges first's 4 unseen requests back: nothing left.
+    assert not await second.allow("a")
+    assert not await first.allow("a")
+
+    # first's refunded request was already pushed, so it stays counted: the
+    # shared counter may run one over what was admitted, never under.
+    clock.advance(2)
+    await second.sync()
+    assert fake_redis.data["listinglab:ratelimit:test:a:100"] == 8
+    assert first.stats()["allowed"] + second.stats()["allowed"] == 7
+
+
+async def test_rejected_after_sync_gives_the_token_back(fake_redis):
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    assert await limiter.allow("a")
+    fake_redis.data["listinglab:ratelimit:test:a:100"] += 5  # Another instance.
+
+    clock.advance(2)
+    assert not await limiter.allow("a")
+    assert limiter.stats()["allowed"] == 1
+    assert limiter.stats()["rejected"] == 1
+
+    # The rejected request was pushed before its refund; nothing is taken back.
+    clock.advance(2)
+    await limiter.sync()
+    assert fake_redis.data["listinglab:ratelimit:test:a:100"] == 7
+
+
+async def test_refund_after_sync_never_pushes_a_negative_count(fake_redis):
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    assert await limiter.allow("a")
+    fake_redis.data["listinglab:ratelimit:test:a:100"] += 5  # Another instance.
+
+    clock.advance(2)
+    assert not await limiter.allow("a")
+
+    # Next window: the refund must not credit it with extra allowance.
+    clock.advance(60)
+    await limiter.sync()
+    assert fake_redis.data.get("listinglab:ratelimit:test:a:101", 0) >= 0
+    assert all(value >= 0 for value in fake_redis.data.values())
+    assert limiter._buckets["a"].pending == 0
+
+
+async def test_sync_failure_fails_open_to_local_limits(fake_redis):
+    fake_redis.fail_pipelines = True
+    limiter = make_limiter(FakeClock())
+
+    assert await admitted(limiter, "a", 5) == 3
+
+
+async def test_idle_buckets_are_pruned_on_sync(fake_redis):
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    await limiter.allow("a")
+
+    clock.advance(61)
+    await limiter.sync()
+    assert limiter.stats()["buckets"] == 0
@@ -0,0 +1,62 @@
+"""Saved-search refresh job: which outcomes count as a run."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.jobs import refresh_saved_searches as job
+from app.redis_client import CacheEntry, search_cache_key
+from app.services.search_payload import SearchPayload
+
+pytestmark = pytest.mark.anyio
+
+COMPLETE = search_cache_key("pokemon card", "", "", None, None)
+PARTIAL = search_cache_key("lego set", "", "", None, None)
+
+
+def group(query: str, cache_key: str) -> job.SavedSearchGroup:
+    return job.SavedSearchGroup(
+        cache_key=cache_key,
+        search_args={
+            "query": query,
+            "min_price": "",
+            "max_price": "",
+            "category": None,
+            "condition": None,
+        },
+        popularity=1,
+    )
+
+
+@pytest.fixture
+def groups(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        job, "load_groups", lambda: [group("pokemon card", COMPLETE), group("lego set", PARTIAL)]
+    )
+    monkeypatch.setattr(job, "_local_last_run", {})
+
+
+async def test_partial_refresh_counts_as_failed_and_stays_due(fake_redis, groups, monkeypatch):
+    async def fill_search(cache_key: str, search_args: dict, **_: object) -> SearchPayload:
+        core = b'{"itemSummaries":[]}'
+        if cache_key == PARTIAL:
+            # fill_search serves a partial result without caching it.
+            return SearchPayload(core=core, bands={}, digest="partial")
+        entry = CacheEntry(body=core, header={})
+        return SearchPayload(core=core, bands={}, digest="complete", entry=entry)
+
+    monkeypatch.setattr(job, "fill_search", fill_search)
+
+    report = await job.refresh_saved_searches()
+
+    assert report.refreshed == 1
+    assert report.failed == 1
+    last_runs = fake_redis.data[job.LAST_RUN_KEY]
+    assert COMPLETE in last_runs
+    assert PARTIAL not in last_runs
+    assert PARTIAL not in job._local_last_run
+
+    # Only the partial search is still due on the next pass.
+    second = await job.refresh_saved_searches()
+    assert second.due == 1
+    assert second.failed == 1
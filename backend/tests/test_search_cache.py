@@ -0,0 +1,195 @@
+"""Search cache miss and hit paths against the fake Upstash client."""
+
+from __future__ import annotations
+
+import gzip
+
+import httpx
+import pytest
+
+from app import compression, redis_client
+from app.cache_codec import decode_entry, encode_entry
+from app.config import settings
+from app.main import app
+from app.models.search import ItemSummary
+from app.redis_client import LocalLRUCache, cache_get_entry, search_cache_key
+from app.services import search_cache
+from app.services.search_payload import SCHEMA_TAG, SearchPayload
+from app.services.search_service import SearchResult
+
+pytestmark = pytest.mark.anyio
+
+SEARCH_ARGS = {
+    "query": "pokemon card",
+    "min_price": "",
+    "max_price": "",
+    "category": None,
+    "condition": None,
+}
+CACHE_KEY = search_cache_key("pokemon card", "", "", None, None)
+
+
+def install_l1(monkeypatch: pytest.MonkeyPatch) -> LocalLRUCache:
+    """A fresh in-process tier, as another instance would have."""
+    cache = LocalLRUCache(max_bytes=1_000_000, ttl_seconds=60)
+    monkeypatch.setattr(redis_client, "search_l1_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def l1_cache(monkeypatch: pytest.MonkeyPatch) -> LocalLRUCache:
+    return install_l1(monkeypatch)
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    calls: list[dict] = []
+
+    async def process_search(**kwargs) -> SearchResult:
+        calls.append(kwargs)
+        items = [
+            ItemSummary(
+                title=f"Pokemon card {index}",
+                price=f"{10 + index}.00",
+                itemWebUrl=f"https://www.ebay.com/itm/{index}",
+            )
+            for index in range(30)
+        ]
+        return SearchResult(
+            items=items,
+            applied_min_price=None,
+            applied_max_price=None,
+            suggestions={6: (8.0, 45.0, 0.9)},
+        )
+
+    monkeypatch.setattr(search_cache.search_service, "process_search", process_search)
+    return calls
+
+
+async def test_fill_writes_redis_and_returns_payload(fake_redis, upstream_calls, monkeypatch):
+    payload = await search_cache.fill_search(CACHE_KEY, SEARCH_ARGS)
+
+    assert payload is not None
+    assert payload.render(6).startswith(b'{"itemSummaries":')
+    assert fake_redis.ttls[CACHE_KEY] == settings.search_cache_ttl_seconds
+
+    install_l1(monkeypatch)
+    cached = await cache_get_entry(CACHE_KEY, SCHEMA_TAG)
+    assert cached is not None
+    assert cached.body == payload.core
+
+
+async def test_search_miss_then_hit(fake_redis, upstream_calls):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        miss = await client.get(
+            "/api/search", params={"query": "pokemon card"}, headers={"Accept-Encoding": "gzip"}
+        )
+        hit = await client.get(
+            "/api/search", params={"query": "pokemon card"}, headers={"Accept-Encoding": "gzip"}
+        )
+        identity = await client.get(
+            "/api/search", params={"query": "pokemon card"}, headers={"Accept-Encoding": "identity"}
+        )
+
+    assert miss.status_code == 200
+    assert miss.headers["X-Cache"] == "MISS"
+    assert miss.headers["Content-Encoding"] == "gzip"
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.content == miss.content == identity.content
+    assert miss.json()["suggestedMinPrice"] == 8.0
+    assert len(upstream_calls) == 1
+    assert CACHE_KEY in fake_redis.data
+
+
+async def test_compressed_search_has_strong_per_encoding_etag(fake_redis, upstream_calls):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        params = {"query": "pokemon card"}
+        gzipped = await client.get(
+            "/api/search", params=params, headers={"Accept-Encoding": "gzip"}
+        )
+        etag = gzipped.headers["ETag"]
+        revalidated = await client.get(
+            "/api/search", params=params, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        identity = await client.get(
+            "/api/search",
+            params=params,
+            headers={"Accept-Encoding": "identity", "If-None-Match": etag},
+        )
+
+    assert not etag.startswith("W/")
+    assert etag.endswith('-gzip"')
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    # The identity body is the same JSON, so the gzip tag still validates it.
+    assert identity.status_code == 304
+    assert identity.headers["ETag"] == etag.removesuffix('-gzip"') + '"'
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == compression.GZIP:
+        return gzip.decompress(body)
+    return compression.brotli.decompress(body)
+
+
+async def test_fill_stores_compressed_cores_for_other_instances(
+    fake_redis, upstream_calls, monkeypatch
+):
+    await search_cache.fill_search(CACHE_KEY, SEARCH_ARGS)
+    l1 = install_l1(monkeypatch)
+
+    entry = await cache_get_entry(CACHE_KEY, SCHEMA_TAG)
+    assert entry is not None
+    assert set(entry.compressed) == set(compression.SUPPORTED_ENCODINGS)
+    assert "cores" not in entry.header
+
+    def no_compression(body: bytes, encoding: str):
+        raise AssertionError("hit compressed the body again")
+
+    monkeypatch.setattr(redis_client, "open_object", no_compression)
+    payload = SearchPayload.from_entry(entry)
+    for encoding in compression.SUPPORTED_ENCODINGS:
+        rendered = payload.render_compressed(6, encoding)
+        assert decompress(rendered, encoding) == payload.render(6)
+
+    # Counted once, body plus each core, from insertion on.
+    counted = len(entry.body) + sum(len(core.data) for core in entry.compressed.values())
+    assert l1.stats()["bytes"] == counted
+    assert await cache_get_entry(CACHE_KEY, SCHEMA_TAG) is entry
+    assert l1.stats()["bytes"] == counted
+
+
+async def test_entries_without_cores_compress_once_per_encoding(
+    fake_redis, upstream_calls, monkeypatch
+):
+    await search_cache.fill_search(CACHE_KEY, SEARCH_ARGS)
+    # As written before cores were stored with the entry.
+    header, body, _ = decode_entry(fake_redis.data[CACHE_KEY])
+    header.pop("cores")
+    fake_redis.data[CACHE_KEY] = encode_entry(header, body)
+    l1 = install_l1(monkeypatch)
+
+    entry = await cache_get_entry(CACHE_KEY, SCHEMA_TAG)
+    assert entry is not None
+    assert entry.compressed == {}
+
+    payload = SearchPayload.from_entry(entry)
+    assert gzip.decompress(payload.render_compressed(6, compression.GZIP)) == payload.render(6)
+    opened = entry.compressed[compression.GZIP]
+    assert gzip.decompress(payload.render_compressed(7, compression.GZIP)) == payload.render(7)
+    assert entry.compressed[compression.GZIP] is opened
+
+    # The L1 tier counts the compressed core from the entry's next lookup.
+    assert l1.stats()["bytes"] == len(entry.body)
+    assert await cache_get_entry(CACHE_KEY, SCHEMA_TAG) is entry
+    assert l1.stats()["bytes"] == len(entry.body) + len(opened.data)
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+async def test_brotli_core_round_trips(fake_redis, upstream_calls):
+    payload = await search_cache.fill_search(CACHE_KEY, SEARCH_ARGS)
+
+    body = payload.render_compressed(6, compression.BROTLI)
+    assert compression.brotli.decompress(body) == payload.render(6)
@@ -0,0 +1,86 @@
+"""Search page fetches: the latency deadline, partial results and hedged requests."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.clients.quota import QuotaGovernor
+from app.config import settings
+from app.services.search_service import SearchService
+from tests.fakes import FAIL, HANG, FakeBrowse
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch: pytest.MonkeyPatch, no_redis, quota_budget) -> None:
+    monkeypatch.setattr(settings, "search_deadline_seconds", 0.2)
+    monkeypatch.setattr(settings, "search_hedge_after_seconds", 0.0)
+
+
+async def search(browse: FakeBrowse):
+    try:
+        return await SearchService(ebay_client=browse).process_search(
+            "camera", "", "", None, None
+        )
+    finally:
+        # Let cancelled fetches run their handlers.
+        await asyncio.sleep(0)
+
+
+async def test_complete_search_is_not_partial():
+    result = await search(FakeBrowse())
+
+    assert not result.partial
+    assert len(result.items) > 200
+
+
+async def test_late_page_is_cancelled_at_the_deadline():
+    browse = FakeBrowse({(2, 1): HANG})
+
+    result = await search(browse)
+
+    assert result.partial
+    assert 0 < len(result.items) <= 200
+    assert browse.cancelled == [2]
+
+
+async def test_failed_page_gives_a_partial_result():
+    result = await search(FakeBrowse({(1, 1): FAIL}))
+
+    assert result.partial
+    assert 0 < len(result.items) <= 200
+
+
+async def test_no_page_by_the_deadline_raises():
+    with pytest.raises(TimeoutError):
+        await search(FakeBrowse({(1, 1): HANG, (2, 1): HANG}))
+
+
+async def test_every_page_failing_raises_the_error():
+    with pytest.raises(ConnectionError):
+        await search(FakeBrowse({(1, 1): FAIL, (2, 1): FAIL}))
+
+
+async def test_slow_page_is_hedged_and_the_duplicate_wins(monkeypatch, quota_budget):
+    monkeypatch.setattr(settings, "search_hedge_after_seconds", 0.02)
+    browse = FakeBrowse({(1, 1): HANG})
+
+    result = await search(browse)
+
+    assert not result.partial
+    assert browse.attempts == {1: 2, 2: 1}
+    assert browse.cancelled == [1]
+    assert quota_budget.granted == 3  # Two pages plus the hedge.
+
+
+async def test_hedge_is_skipped_when_the_budget_is_tight(monkeypatch, quota_budget: QuotaGovernor):
+    monkeypatch.setattr(settings, "search_hedge_after_seconds", 0.02)
+    await quota_budget.acquire(899)  # Past the degrade line: one page, no hedging.
+    browse = FakeBrowse({(1, 1): HANG})
+
+    with pytest.raises(TimeoutError):
+        await search(browse)
+    assert browse.attempts == {1: 1}
@@ -0,0 +1,79 @@
+"""NDJSON search streaming: page lines, the final result, and disconnect cancellation."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app import redis_client
+from app.api.routes import search as search_routes
+from app.main import app
+from app.redis_client import LocalLRUCache, search_cache_key
+from app.services import search_cache
+from app.services.search_service import SearchService
+from tests.fakes import HANG, FakeBrowse
+
+pytestmark = pytest.mark.anyio
+
+SEARCH_ARGS = {
+    "query": "camera",
+    "min_price": "",
+    "max_price": "",
+    "category": None,
+    "condition": None,
+}
+CACHE_KEY = search_cache_key("camera", "", "", None, None)
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch: pytest.MonkeyPatch, fake_redis, quota_budget) -> None:
+    monkeypatch.setattr(redis_client, "search_l1_cache", LocalLRUCache(1_000_000, 60))
+
+
+def use_browse(monkeypatch: pytest.MonkeyPatch, browse: FakeBrowse) -> None:
+    monkeypatch.setattr(search_cache, "search_service", SearchService(ebay_client=browse))
+
+
+async def stream(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.get("/api/search/stream", params={"query": "camera"})
+
+
+async def test_streams_pages_then_result_then_serves_hits(monkeypatch):
+    use_browse(monkeypatch, FakeBrowse())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        miss = await stream(client)
+        hit = await stream(client)
+
+    events = [json.loads(line) for line in miss.text.splitlines()]
+    assert miss.headers["X-Cache"] == "MISS"
+    assert sorted(event["page"] for event in events[:-1]) == [1, 2]
+    assert all(event["type"] == "page" and event["items"] for event in events[:-1])
+    assert events[-1]["type"] == "result"
+    assert events[-1]["cache"] == "MISS"
+
+    [cached] = [json.loads(line) for line in hit.text.splitlines()]
+    assert hit.headers["X-Cache"] == "HIT"
+    assert cached["response"] == events[-1]["response"]
+
+
+async def test_disconnect_cancels_the_upstream_fill(monkeypatch):
+    browse = FakeBrowse({(2, 1): HANG})
+    use_browse(monkeypatch, browse)
+
+    lines = search_routes._stream_search(CACHE_KEY, dict(SEARCH_ARGS), 6)
+    first = json.loads(await lines.__anext__())
+    assert first == {**first, "type": "page", "page": 1}
+    assert search_routes.search_flight.inflight(CACHE_KEY)
+
+    # What Starlette does when the client goes away mid-stream.
+    await lines.aclose()
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert browse.cancelled == [2]
+    assert not search_routes.search_flight.inflight(CACHE_KEY)
+    assert await redis_client.cache_get_entry(CACHE_KEY, "any") is None
@@ -0,0 +1,110 @@
+"""SingleFlight sharing, error propagation and abandoned-work cancellation."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    waiters = [asyncio.ensure_future(flight.do("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.inflight("key")
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert calls == 1
+    assert not flight.inflight("key")
+
+
+async def test_errors_reach_every_caller_and_the_key_is_retried():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing() -> None:
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    waiters = [asyncio.ensure_future(flight.do("key", failing)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeeding() -> str:
+        return "fresh"
+
+    assert await flight.do("key", succeeding) == "fresh"
+
+
+async def test_one_caller_giving_up_does_not_cancel_the_shared_work():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work() -> str:
+        await release.wait()
+        return "result"
+
+    leaving = asyncio.ensure_future(flight.do("key", work, cancel_abandoned=True))
+    staying = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await staying == "result"
+    assert leaving.cancelled()
+
+
+async def test_last_caller_leaving_cancels_abandonable_work():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work() -> None:
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.ensure_future(flight.do("key", work, cancel_abandoned=True))
+    await started.wait()
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert not flight.inflight("key")
+
+
+async def test_work_without_cancel_abandoned_outlives_its_callers():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    finished = asyncio.Event()
+
+    async def work() -> None:
+        await release.wait()
+        finished.set()
+
+    caller = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.sleep(0)
+    assert flight.inflight("key")
+    release.set()
+    await asyncio.wait_for(finished.wait(), timeout=1)
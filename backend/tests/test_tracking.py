@@ -0,0 +1,46 @@
+"""Tracked-listing update validation and constraint-error mapping."""
+
+from __future__ import annotations
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from app.api.routes import tracking
+from app.models.persistence import TrackedListingBatchUpdate, TrackedListingUpdate
+
+
+@pytest.mark.parametrize("field", ["title", "itemWebUrl"])
+def test_update_rejects_explicit_null(field):
+    with pytest.raises(ValidationError):
+        TrackedListingUpdate.model_validate({field: None})
+    with pytest.raises(ValidationError):
+        TrackedListingBatchUpdate.model_validate({"id": str(uuid.uuid4()), field: None})
+
+
+def test_update_omitted_fields_stay_unset():
+    body = TrackedListingUpdate.model_validate({"notes": None})
+    assert tracking._changes(body) == {"notes": None}
+
+
+def integrity_error(sqlstate: str, constraint: str | None) -> IntegrityError:
+    orig = SimpleNamespace(sqlstate=sqlstate, diag=SimpleNamespace(constraint_name=constraint))
+    return IntegrityError("UPDATE tracked_listings ...", {}, orig)
+
+
+@pytest.mark.parametrize(
+    ("sqlstate", "constraint", "duplicate"),
+    [
+        ("23505", tracking.USER_URL_INDEX, True),
+        ("23505", "tracked_listings_pkey", False),
+        # not_null_violation
+        ("23502", None, False),
+        # foreign_key_violation
+        ("23503", "tracked_listings_user_id_fkey", False),
+    ],
+)
+def test_only_the_user_url_index_maps_to_conflict(sqlstate, constraint, duplicate):
+    assert tracking._is_duplicate_url(integrity_error(sqlstate, constraint)) is duplicate
@@ -39,3 +39,6 @@ export const HISTORY_KEY = 'ebaySearchHistory';
 export const MAX_HISTORY = 20;
 
 export const API_BASE_URL = '/api';
+
+/** Response header carrying the cursor for the next page of a list endpoint. */
+export const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
@@ -36,6 +36,8 @@ export interface TrackedListing {
   userId: string;
   title: string;
   itemWebUrl: string;
+  /** Browse item id parsed from itemWebUrl; null when the URL isn't a listing. */
+  ebayItemId: string | null;
   imageUrl: string | null;
   condition: string | null;
   sellerUsername: string | null;
@@ -70,3 +72,25 @@ export interface TrackedListingUpdate {
   targetMaxPrice?: number | null;
   notes?: string | null;
 }
+
+/** One price-history point: a refresh run (bucketSeconds 0) or a daily bucket. */
+export interface PricePoint {
+  bucketStart: string;
+  bucketSeconds: number;
+  runs: number;
+  count: number;
+  minPrice: number | null;
+  q1Price: number | null;
+  medianPrice: number | null;
+  q3Price: number | null;
+  maxPrice: number | null;
+  suggestedMinPrice: number | null;
+  suggestedMaxPrice: number | null;
+  suggestedCoverage: number | null;
+}
+
+/** One page of a keyset-paginated list; pass nextCursor back to get the next page. */
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
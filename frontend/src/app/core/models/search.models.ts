@@ -24,6 +24,14 @@ export interface SearchRequest {
   filterStrength: number;
 }
 
+export interface PriceSuggestion {
+  filterStrength: number;
+  minPrice: number;
+  maxPrice: number;
+  /** Fraction of listings inside the band, 0–1. */
+  coverage: number;
+}
+
 export interface SearchResponse {
   itemSummaries: ItemSummary[];
   appliedMinPrice?: number | null;
@@ -32,6 +40,10 @@ export interface SearchResponse {
   suggestedMaxPrice?: number | null;
   /** Fraction of listings in the suggested cluster, 0–1. */
   suggestedCoverage?: number | null;
+  /** Suggested band for every filter strength (auto mode only). */
+  suggestions?: PriceSuggestion[] | null;
+  /** Some eBay pages missed the server's latency budget; results are incomplete. */
+  partial?: boolean;
 }
 
 /** @deprecated Prefer auto vs refined via presence of maxPrice */
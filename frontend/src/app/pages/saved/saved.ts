@@ -24,6 +24,8 @@ export class SavedComponent implements OnInit {
   readonly loading = signal(true);
   readonly error = signal<string | null>(null);
   readonly busyId = signal<string | null>(null);
+  readonly nextCursor = signal<string | null>(null);
+  readonly loadingMore = signal(false);
 
   ngOnInit(): void {
     this.reload();
@@ -33,12 +35,14 @@ export class SavedComponent implements OnInit {
     this.loading.set(true);
     this.error.set(null);
     this.savedService.list().subscribe({
-      next: (rows) => {
-        this.items.set(rows);
+      next: (page) => {
+        this.items.set(page.items);
+        this.nextCursor.set(page.nextCursor);
         this.loading.set(false);
       },
       error: (err: Error) => {
         this.items.set([]);
+        this.nextCursor.set(null);
         const message = err.message || 'Failed to load saved searches';
         this.error.set(message);
         this.toast.error(message);
@@ -47,6 +51,23 @@ export class SavedComponent implements OnInit {
     });
   }
 
+  loadMore(): void {
+    const cursor = this.nextCursor();
+    if (!cursor || this.loadingMore()) return;
+    this.loadingMore.set(true);
+    this.savedService.list(cursor).subscribe({
+      next: (page) => {
+        this.items.update((rows) => [...rows, ...page.items]);
+        this.nextCursor.set(page.nextCursor);
+        this.loadingMore.set(false);
+      },
+      error: (err: Error) => {
+        this.toast.error(err.message || 'Failed to load more saved searches');
+        this.loadingMore.set(false);
+      },
+    });
+  }
+
   categoryLabel(categoryId: string | null): string {
     if (!categoryId) return 'Any category';
     return CATEGORY_OPTIONS.find((c) => c.id === categoryId)?.name || categoryId;
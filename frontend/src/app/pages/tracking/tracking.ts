@@ -20,6 +20,8 @@ export class TrackingComponent implements OnInit {
   readonly loading = signal(true);
   readonly error = signal<string | null>(null);
   readonly busyId = signal<string | null>(null);
+  readonly nextCursor = signal<string | null>(null);
+  readonly loadingMore = signal(false);
   readonly saving = signal(false);
   readonly editingNotesId = signal<string | null>(null);
   readonly notesDraft = signal('');
@@ -38,12 +40,14 @@ export class TrackingComponent implements OnInit {
     this.loading.set(true);
     this.error.set(null);
     this.trackingService.list().subscribe({
-      next: (rows) => {
-        this.items.set(rows);
+      next: (page) => {
+        this.items.set(page.items);
+        this.nextCursor.set(page.nextCursor);
         this.loading.set(false);
       },
       error: (err: Error) => {
         this.items.set([]);
+        this.nextCursor.set(null);
         const message = err.message || 'Failed to load tracked listings';
         this.error.set(message);
         this.toast.error(message);
@@ -52,6 +56,23 @@ export class TrackingComponent implements OnInit {
     });
   }
 
+  loadMore(): void {
+    const cursor = this.nextCursor();
+    if (!cursor || this.loadingMore()) return;
+    this.loadingMore.set(true);
+    this.trackingService.list(cursor).subscribe({
+      next: (page) => {
+        this.items.update((rows) => [...rows, ...page.items]);
+        this.nextCursor.set(page.nextCursor);
+        this.loadingMore.set(false);
+      },
+      error: (err: Error) => {
+        this.toast.error(err.message || 'Failed to load more tracked listings');
+        this.loadingMore.set(false);
+      },
+    });
+  }
+
   formatPrice(value: number | null | undefined): string {
     if (value == null || Number.isNaN(value)) return '—';
     return `$${value.toFixed(2)}`;
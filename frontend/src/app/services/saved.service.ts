@@ -1,10 +1,11 @@
 import { Injectable, inject } from '@angular/core';
-import { HttpClient, HttpErrorResponse } from '@angular/common/http';
+import { HttpClient, HttpErrorResponse, HttpParams } from '@angular/common/http';
 import { Observable, throwError } from 'rxjs';
-import { catchError } from 'rxjs/operators';
+import { catchError, map } from 'rxjs/operators';
 
-import { API_BASE_URL } from '../core/constants/app.constants';
+import { API_BASE_URL, NEXT_CURSOR_HEADER } from '../core/constants/app.constants';
 import {
+  Page,
   SavedSearch,
   SavedSearchCreate,
   SavedSearchUpdate,
@@ -14,10 +15,18 @@ import {
 export class SavedService {
   private readonly http = inject(HttpClient);
 
-  list(): Observable<SavedSearch[]> {
+  /** One page, most recently updated first; pass the returned nextCursor for more. */
+  list(cursor?: string | null): Observable<Page<SavedSearch>> {
+    const params = cursor ? new HttpParams().set('cursor', cursor) : undefined;
     return this.http
-      .get<SavedSearch[]>(`${API_BASE_URL}/saved-searches`)
-      .pipe(catchError(this.handleError));
+      .get<SavedSearch[]>(`${API_BASE_URL}/saved-searches`, { params, observe: 'response' })
+      .pipe(
+        map((res) => ({
+          items: res.body ?? [],
+          nextCursor: res.headers.get(NEXT_CURSOR_HEADER),
+        })),
+        catchError(this.handleError),
+      );
   }
 
   create(body: SavedSearchCreate): Observable<SavedSearch> {
@@ -1,10 +1,11 @@
 import { Injectable, inject } from '@angular/core';
-import { HttpClient, HttpErrorResponse } from '@angular/common/http';
+import { HttpClient, HttpErrorResponse, HttpParams } from '@angular/common/http';
 import { Observable, throwError } from 'rxjs';
-import { catchError } from 'rxjs/operators';
+import { catchError, map } from 'rxjs/operators';
 
-import { API_BASE_URL } from '../core/constants/app.constants';
+import { API_BASE_URL, NEXT_CURSOR_HEADER } from '../core/constants/app.constants';
 import {
+  Page,
   TrackedListing,
   TrackedListingCreate,
   TrackedListingUpdate,
@@ -14,10 +15,18 @@ import {
 export class TrackingService {
   private readonly http = inject(HttpClient);
 
-  list(): Observable<TrackedListing[]> {
+  /** One page, most recently updated first; pass the returned nextCursor for more. */
+  list(cursor?: string | null): Observable<Page<TrackedListing>> {
+    const params = cursor ? new HttpParams().set('cursor', cursor) : undefined;
     return this.http
-      .get<TrackedListing[]>(`${API_BASE_URL}/tracked-listings`)
-      .pipe(catchError(this.handleError));
+      .get<TrackedListing[]>(`${API_BASE_URL}/tracked-listings`, { params, observe: 'response' })
+      .pipe(
+        map((res) => ({
+          items: res.body ?? [],
+          nextCursor: res.headers.get(NEXT_CURSOR_HEADER),
+        })),
+        catchError(this.handleError),
+      );
   }
 
   create(body: TrackedListingCreate): Observable<TrackedListing> {